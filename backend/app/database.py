@@ -26,4 +26,14 @@ participants_collection = db["participants"]
 books_collection = db["books"]
 users_collection = db["users"]
 event_analytics_collection = db["event_analytics"]
+quiz_qa_jobs_collection = db["quiz_qa_jobs"]
+translation_memo_collection = db["translation_memo"]
+embedding_cache_collection = db["embedding_cache"]
+translation_samples_collection = db["translation_samples"]
+taxonomy_collection = db["taxonomy"]
+facets_collection = db["catalog_facets"]
+facet_members_collection = db["catalog_facet_members"]
+language_availability_collection = db["language_availability"]
+contest_leaderboard_collection = db["contest_leaderboard"]
+contest_leaderboard_stats_collection = db["contest_leaderboard_stats"]
 
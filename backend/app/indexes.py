@@ -0,0 +1,270 @@
+"""
+Declarative index registry for every collection in app.database.
+
+INDEXES lists the indexes each collection should have and which queries they back;
+QUERY_PROBES lists representative router/service queries with the index expected to
+serve them. apply_indexes() creates missing indexes idempotently (at startup, from
+services that own a collection, or via app.scripts.ensure_indexes), and explain_probes()
+checks with explain() which index the planner actually picks.
+
+The Atlas vector search index (translations_vector_index) is a search index managed in
+Atlas, not here.
+"""
+
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+INDEX_PROVISIONING_ON_STARTUP = os.getenv("INDEX_PROVISIONING_ON_STARTUP", "true").lower() == "true"
+# Finished and failed quiz_qa_jobs are kept this long, which also suppresses re-enqueueing them
+QUIZ_QA_JOB_RETENTION_SECONDS = int(os.getenv("QUIZ_QA_JOB_RETENTION_SECONDS", 24 * 3600))
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    name: str
+    keys: Tuple[Tuple[str, int], ...]
+    used_by: Tuple[str, ...] = ()
+    options: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class QueryProbe:
+    route: str
+    collection: str
+    filter: dict
+    expected: str
+    sort: Optional[Tuple[Tuple[str, int], ...]] = None
+
+
+def _index(collection: str, name: str, keys, used_by=(), **options) -> IndexSpec:
+    return IndexSpec(collection, name, tuple(keys), tuple(used_by), options)
+
+
+INDEXES: List[IndexSpec] = [
+    # --- objects ---
+    _index("objects", "image_hash_status_org_idx",
+           [("image_hash", ASCENDING), ("image_status", ASCENDING), ("org_id", ASCENDING)],
+           ["GET /images/{image_hash}", "curriculum pages (pagedetails)", "pool recommendations"]),
+    _index("objects", "org_status_idx", [("org_id", ASCENDING), ("image_status", ASCENDING)],
+           ["GET /active/object-categories-FOS (objects fallback)"]),
+
+    # --- translations ---
+    _index("translations", "org_language_status_taxonomy_idx",
+           [("org_id", ASCENDING), ("requested_language", ASCENDING), ("translation_status", ASCENDING), ("taxonomy_ids", ASCENDING)],
+           ["GET /pictures/random (category / field of study)", "GET /event-analytics/mastery (coverage count)",
+            "language availability recounts", "facet rebuilds"]),
+    _index("translations", "org_language_status_name_idx",
+           [("org_id", ASCENDING), ("requested_language", ASCENDING), ("translation_status", ASCENDING), ("object_name", ASCENDING)],
+           ["GET /pictures/random (default $group by object_name)", "random sampling rebuilds / re-election"]),
+    _index("translations", "object_language_status_org_idx",
+           [("object_id", ASCENDING), ("requested_language", ASCENDING), ("translation_status", ASCENDING), ("org_id", ASCENDING)],
+           ["curriculum pages (pagedetails)", "pool recommendations", "contest play (assigned objects)",
+            "taxonomy sync by object_id"]),
+
+    # --- voting ---
+    _index("voting", "translation_ip_idx", [("translation_id", ASCENDING), ("ip_hash", ASCENDING)], ["POST /vote"]),
+
+    # --- translation_sets ---
+    _index("translation_sets", "user_language_idx", [("user_id", ASCENDING), ("language", ASCENDING)],
+           ["GET /TS/get_TS_list"]),
+    _index("translation_sets", "set_id_idx", [("set_id", ASCENDING)],
+           ["GET /TS/get_TS_preview/{set_id}", "GET /pictures/random (translation set cards)"]),
+
+    # --- organisations ---
+    _index("organisations", "org_id_idx", [("org_id", ASCENDING)], ["org cache (every org-scoped request)"]),
+    _index("organisations", "org_code_idx", [("org_code", ASCENDING)], ["org cache by org code"]),
+
+    # --- contests ---
+    _index("contests", "org_id_idx", [("org_id", ASCENDING)], ["GET /contest/list/{org_id}"]),
+
+    # --- contest_analytics ---
+    _index("contest_analytics", "user_contest_idx", [("user_id", ASCENDING), ("contest_id", ASCENDING)],
+           ["GET /analytics/contest/{contest_id}/user/{user_id}"]),
+    _index("contest_analytics", "contest_timestamp_idx", [("contest_id", ASCENDING), ("started_at", DESCENDING)],
+           ["GET /analytics/contest/{contest_id}/summary"]),
+    _index("contest_analytics", "attempt_id_unique_idx", [("attempt_id", ASCENDING)],
+           ["POST /analytics/contest-attempt"], unique=True),
+    _index("contest_analytics", "round_status_idx", [("round_status", ASCENDING)]),
+    _index("contest_analytics", "contest_language_idx", [("contest_id", ASCENDING), ("language_name", ASCENDING)]),
+
+    # --- participants ---
+    _index("participants", "username_idx", [("username", ASCENDING)],
+           ["contest check-participant / authenticate / register / login / enter / log-progress", "contest play"]),
+    _index("participants", "participations_contest_idx", [("participations.contest_id", ASCENDING)],
+           ["contest registration count", "leaderboard rebuilds"]),
+
+    # --- contest_leaderboard ---
+    _index("contest_leaderboard", "contest_rank_idx",
+           [("contest_id", ASCENDING), ("total_score", DESCENDING), ("tie_break_1", ASCENDING),
+            ("tie_break_2", ASCENDING), ("tie_break_3", ASCENDING), ("username", ASCENDING)],
+           ["GET /contest/{contest_id}/leaderboard"]),
+
+    # --- books ---
+    _index("books", "org_language_idx", [("org_id", ASCENDING), ("language", ASCENDING)],
+           ["GET /curriculum/books/external-search"]),
+
+    # --- users ---
+    _index("users", "username_idx", [("username", ASCENDING)], ["POST /auth/register", "POST /contest/register"]),
+
+    # --- event_analytics ---
+    _index("event_analytics", "user_language_timestamp_idx",
+           [("envelope.user_id", ASCENDING), ("envelope.language", ASCENDING), ("envelope.timestamp_iso", ASCENDING)],
+           ["GET /event-analytics/mastery/{language_code}"]),
+
+    # --- quiz_qa_jobs ---
+    _index("quiz_qa_jobs", "status_next_attempt_idx", [("status", ASCENDING), ("next_attempt_at", ASCENDING)],
+           ["quiz QA worker claims"]),
+    _index("quiz_qa_jobs", "finished_at_ttl_idx", [("finished_at", ASCENDING)],
+           ["quiz QA job retention"], expireAfterSeconds=QUIZ_QA_JOB_RETENTION_SECONDS),
+
+    # --- translation_memo / embedding_cache ---
+    _index("translation_memo", "expires_at_ttl_idx", [("expires_at", ASCENDING)], ["memo expiry"], expireAfterSeconds=0),
+    _index("translation_memo", "lang_updated_idx", [("lang_code", ASCENDING), ("updated_at", DESCENDING)],
+           ["translation memo preload"]),
+    _index("embedding_cache", "expires_at_ttl_idx", [("expires_at", ASCENDING)], ["embedding expiry"], expireAfterSeconds=0),
+
+    # --- translation_samples ---
+    _index("translation_samples", "org_language_name_unique_idx",
+           [("org_key", ASCENDING), ("language", ASCENDING), ("object_name", ASCENDING)],
+           ["random sampling maintenance"], unique=True),
+    _index("translation_samples", "org_language_random_key_idx",
+           [("org_key", ASCENDING), ("language", ASCENDING), ("random_key", ASCENDING)],
+           ["GET /pictures/random (RANDOM_SAMPLING_ENGINE=random_key)"]),
+    _index("translation_samples", "translation_id_idx", [("translation_id", ASCENDING)], ["random sampling maintenance"]),
+
+    # --- taxonomy / facets / language availability ---
+    _index("taxonomy", "kind_idx", [("kind", ASCENDING)], ["taxonomy refresh"]),
+    _index("catalog_facets", "org_language_idx", [("org_key", ASCENDING), ("language", ASCENDING)],
+           ["GET /active/object-categories-FOS/{language_name}"]),
+    _index("catalog_facet_members", "org_language_idx", [("org_key", ASCENDING), ("language", ASCENDING)],
+           ["facet rebuilds"]),
+    _index("language_availability", "org_language_unique_idx", [("org_key", ASCENDING), ("language", ASCENDING)],
+           ["language availability recounts"], unique=True),
+]
+
+# Collections that need nothing beyond _id: languages is loaded whole by the language
+# registry, counters and contest_leaderboard_stats are only read by _id
+UNINDEXED_COLLECTIONS = ("languages", "counters", "contest_leaderboard_stats")
+
+QUERY_PROBES: List[QueryProbe] = [
+    QueryProbe("GET /images/{image_hash}", "objects", {"image_hash": "h"}, "image_hash_status_org_idx"),
+    QueryProbe("curriculum pages: object by hash", "objects",
+               {"image_hash": "h", "image_status": "Approved", "org_id": "o"}, "image_hash_status_org_idx"),
+    QueryProbe("GET /active/object-categories-FOS (objects fallback)", "objects",
+               {"image_status": "Approved", "org_id": "o"}, "org_status_idx"),
+    QueryProbe("GET /pictures/random (default)", "translations",
+               {"translation_status": "Approved", "requested_language": "Hindi", "org_id": "o"}, "org_language_status_name_idx"),
+    QueryProbe("GET /pictures/random (category)", "translations",
+               {"translation_status": "Approved", "requested_language": "Hindi", "org_id": "o", "taxonomy_ids": "category:fruits"},
+               "org_language_status_taxonomy_idx"),
+    QueryProbe("curriculum pages: translation of object", "translations",
+               {"translation_status": "Approved", "requested_language": "Hindi", "org_id": "o", "object_id": "x"},
+               "object_language_status_org_idx"),
+    QueryProbe("POST /vote", "voting", {"translation_id": "t", "ip_hash": "h"}, "translation_ip_idx"),
+    QueryProbe("GET /TS/get_TS_list", "translation_sets", {"language": "Hindi", "user_id": "u"}, "user_language_idx"),
+    QueryProbe("GET /TS/get_TS_preview/{set_id}", "translation_sets", {"set_id": "TS.o.u.0001"}, "set_id_idx"),
+    QueryProbe("org cache by id", "organisations", {"org_id": "o"}, "org_id_idx"),
+    QueryProbe("org cache by code", "organisations", {"org_code": "c"}, "org_code_idx"),
+    QueryProbe("GET /contest/list/{org_id}", "contests", {"org_id": "o"}, "org_id_idx"),
+    QueryProbe("GET /analytics/contest/{contest_id}/user/{user_id}", "contest_analytics",
+               {"contest_id": "c", "user_id": "u"}, "user_contest_idx", (("started_at", DESCENDING),)),
+    QueryProbe("contest participant by username", "participants", {"username": "u"}, "username_idx"),
+    QueryProbe("GET /contest/{contest_id}/leaderboard", "contest_leaderboard", {"contest_id": "c"}, "contest_rank_idx",
+               (("total_score", DESCENDING), ("tie_break_1", ASCENDING), ("tie_break_2", ASCENDING),
+                ("tie_break_3", ASCENDING), ("username", ASCENDING))),
+    QueryProbe("contest registration count", "participants", {"participations.contest_id": "c"}, "participations_contest_idx"),
+    QueryProbe("GET /curriculum/books/external-search", "books", {"org_id": "o", "language": "Hindi"}, "org_language_idx"),
+    QueryProbe("POST /auth/register", "users", {"username": "u"}, "username_idx"),
+    QueryProbe("GET /event-analytics/mastery/{language_code}", "event_analytics",
+               {"envelope.user_id": "u", "envelope.language": "Hindi", "envelope.timestamp_iso": {"$lt": "2100-01-01"}},
+               "user_language_timestamp_idx"),
+    QueryProbe("GET /active/object-categories-FOS/{language_name}", "catalog_facets",
+               {"org_key": "o", "language": "Hindi"}, "org_language_idx"),
+    QueryProbe("GET /pictures/random (random_key)", "translation_samples",
+               {"org_key": "o", "language": "Hindi", "random_key": {"$gte": 0.5}}, "org_language_random_key_idx",
+               (("random_key", ASCENDING),)),
+]
+
+
+def specs_for(*collections: str) -> List[IndexSpec]:
+    return [spec for spec in INDEXES if not collections or spec.collection in collections]
+
+
+async def apply_indexes(*collections: str) -> List[dict]:
+    """
+    Creates the registry's indexes (all, or those of the given collections). Existing
+    identical indexes are a no-op; an index whose name or options conflict with an existing
+    one is reported as "conflict" and left for an operator to resolve.
+    """
+    results = []
+    for spec in specs_for(*collections):
+        try:
+            await db[spec.collection].create_index(list(spec.keys), name=spec.name, **spec.options)
+            status = "ok"
+        except OperationFailure as e:
+            # 85 IndexOptionsConflict / 86 IndexKeySpecsConflict: same keys or name, different definition
+            if e.code not in (85, 86):
+                raise
+            status = "conflict"
+            logger.warning(f"Index {spec.collection}.{spec.name} conflicts with an existing index: {e}")
+        results.append({"collection": spec.collection, "index": spec.name, "status": status})
+    return results
+
+
+def _plan_indexes(plan: dict) -> List[str]:
+    """Index names used by a (winning) query plan, or ["COLLSCAN"]."""
+    names = []
+    stack = [plan]
+    while stack:
+        stage = stack.pop()
+        if stage.get("stage") == "COLLSCAN":
+            names.append("COLLSCAN")
+        if stage.get("indexName"):
+            names.append(stage["indexName"])
+        if "queryPlan" in stage:
+            stack.append(stage["queryPlan"])
+        if "inputStage" in stage:
+            stack.append(stage["inputStage"])
+        stack.extend(stage.get("inputStages", []))
+    return names
+
+
+async def explain_probes(probes: Optional[List[QueryProbe]] = None) -> List[dict]:
+    """Runs explain() for each probe and reports the index the planner chose."""
+    report = []
+    for probe in probes or QUERY_PROBES:
+        cursor = db[probe.collection].find(probe.filter)
+        if probe.sort:
+            cursor = cursor.sort(list(probe.sort))
+        try:
+            explain = await cursor.explain()
+            used = _plan_indexes(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        except Exception as e:
+            used = [f"error: {e}"]
+        report.append({
+            "route": probe.route,
+            "collection": probe.collection,
+            "expected": probe.expected,
+            "used": used,
+            "status": "ok" if probe.expected in used else "mismatch",
+        })
+    return report
+
+
+def index_report() -> Dict[str, List[str]]:
+    """Route/query -> "collection.index" list, from the registry's used_by entries."""
+    report: Dict[str, List[str]] = {}
+    for spec in INDEXES:
+        for route in spec.used_by:
+            report.setdefault(route, []).append(f"{spec.collection}.{spec.name}")
+    return report
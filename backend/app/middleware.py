@@ -1,67 +1,116 @@
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 import jwt
-from app.database import organisations_collection
+from app.services.org_cache import org_cache
 import os
 from dotenv import load_dotenv
 
 
 load_dotenv()
 # You might want to move this to .env
-SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-key") 
+SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-key")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Skip auth for public endpoints if needed, or handle within the logic
-        # For now, we apply logic if headers are present as requested
-        
-        auth_header = request.headers.get("Authorization")
-        org_id = request.headers.get("X-Org-ID")
-        
-        user_info = None
-        
+# Routes that never look at the caller skip auth entirely. Entries ending in "/" match as prefixes.
+AUTH_PUBLIC_PATHS = os.getenv("AUTH_PUBLIC_PATHS", "/,/health,/docs,/docs/oauth2-redirect,/redoc,/openapi.json,/images/")
+
+
+def _parse_public_paths(value: str) -> Tuple[frozenset, Tuple[str, ...]]:
+    exact, prefixes = set(), []
+    for path in (p.strip() for p in value.split(",")):
+        if not path:
+            continue
+        exact.add(path.rstrip("/") or "/")
+        if path != "/" and path.endswith("/"):
+            prefixes.append(path)
+    return frozenset(exact), tuple(prefixes)
+
+
+class _AuthState(dict):
+    """
+    scope["state"] for authenticated requests. `user` and `org` are only built when a
+    handler first reads them from request.state; reading them on a request without the
+    corresponding header still raises AttributeError, as before.
+    """
+
+    def __init__(self, initial: Optional[dict], claims: Optional[dict], org: Optional[dict]):
+        super().__init__(initial or {})
+        self._claims = claims
+        self._org = org
+
+    def __missing__(self, key):
+        if key == "user" and self._claims is not None:
+            value = self["user"] = dict(self._claims)
+            return value
+        if key == "org" and self._org is not None:
+            value = self["org"] = self._org
+            return value
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return super().__contains__(key) or (key == "user" and self._claims is not None) \
+            or (key == "org" and self._org is not None)
+
+
+class AuthMiddleware:
+    """
+    Pure ASGI authentication middleware.
+
+    Requests to AUTH_PUBLIC_PATHS pass straight through. For everything else, a Bearer
+    token and X-Org-ID header, when present, are verified before the route runs, so an
+    invalid token or unknown org still gets a 401 (the frontend clears the session on it);
+    the decoded claims and org document are exposed as request.state.user / .org.
+    Response bodies are passed through untouched, so streaming responses stay streamed.
+    """
+
+    def __init__(self, app: ASGIApp, public_paths: str = AUTH_PUBLIC_PATHS):
+        self.app = app
+        self.public_exact, self.public_prefixes = _parse_public_paths(public_paths)
+
+    def is_public(self, path: str) -> bool:
+        return (path.rstrip("/") or "/") in self.public_exact or path.startswith(self.public_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.is_public(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        auth_header = headers.get("Authorization")
+        org_id = headers.get("X-Org-ID")
+        if not auth_header and not org_id:
+            await self.app(scope, receive, send)
+            return
+
+        claims = None
         if auth_header:
             try:
                 scheme, token = auth_header.split()
                 if scheme.lower() != "bearer":
-                    return JSONResponse(status_code=401, content={"detail": "Invalid authentication scheme"})
-                
-                # Validate token
-                # NOTE: Since we don't have the external service's secret key, 
-                # we can't verify the signature unless we know it. 
-                # For this POC, we might just decode unverified or assume the secret is shared.
-                # If the external service is ours, we should have the key.
-                # I will assume we can decode it. If not, we might need to call an introspection endpoint.
-                
-                # options={"verify_signature": False} # Use this if you don't have the secret
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_signature": True}) 
-                user_info = payload
-                
-                # print(f"\n\n=== DEBUG: Middleware Token Decode ===")
-                # print(f"Decoded payload: {payload}")
-                # print(f"org_id in payload: {payload.get('org_id')}")
-                # print(f"organisation_id in payload: {payload.get('organisation_id')}")
-                # print(f"===\n\n")
-                
-                request.state.user = user_info
-                
+                    await self._reject("Invalid authentication scheme", scope, receive, send)
+                    return
+                claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_signature": True})
             except (ValueError, jwt.DecodeError):
-                return JSONResponse(status_code=401, content={"detail": "Invalid token"})
+                await self._reject("Invalid token", scope, receive, send)
+                return
             except Exception as e:
-                return JSONResponse(status_code=401, content={"detail": f"Authentication error: {str(e)}"})
+                await self._reject(f"Authentication error: {str(e)}", scope, receive, send)
+                return
 
+        org = None
         if org_id:
-            # Validate Org ID
-            org = await organisations_collection.find_one({"org_id": org_id})
+            # Served from the in-process org cache; only a cold entry costs a query
+            org = await org_cache.get_by_id(org_id)
             if not org:
-                 return JSONResponse(status_code=401, content={"detail": "Invalid Organization ID"})
-            
-            # Optional: Check if user belongs to this org (if user info is available)
-            # if user_info and user_info.get("org_id") != org_id:
-            #     return JSONResponse(status_code=403, content={"detail": "User does not belong to this organization"})
-            
-            request.state.org = org
-
-        response = await call_next(request)
-        return response
+                await self._reject("Invalid Organization ID", scope, receive, send)
+                return
+
+        scope["state"] = _AuthState(scope.get("state"), claims, org)
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(detail: str, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(status_code=401, content={"detail": detail})
+        await response(scope, receive, send)
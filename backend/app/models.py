@@ -45,7 +45,9 @@ class PyObjectId(ObjectId):
 
 class ResultObject(BaseModel):
     object_id: str
-    image_base64: str
+    image_base64: Optional[str] = None  # set when images are delivered inline
+    image_url: Optional[str] = None  # set when images are delivered as presigned/CDN URLs
+    image_url_expires_at: Optional[datetime] = None  # None for non-expiring (CDN) URLs
     image_hash: str
     object_category: str
  
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, HTTPException, Form, Query
 from pydantic import BaseModel
-import requests
+import httpx
 from typing import Optional, List, Dict, Any
-from app.database import organisations_collection, participants_collection, contests_collection, users_collection
+from app.database import participants_collection, contests_collection, users_collection
 from app.contest_config import Contest
 from app.contest_participant import Participant, ParticipantCreate, ParticipantLogin, Contestant, ContestParticipation, ContestParticipantCreate, ContestParticipantUpdate, ContestScoreSubmission, RoundScore
 from bson import ObjectId
 from datetime import datetime, timezone
 from app.services.validateContest import validate_contest_for_login
+from app.services.org_cache import org_cache
+from app.services.external_auth import external_login, external_create_user
 router = APIRouter()
 import hashlib
 from fastapi import Depends, Request
@@ -28,8 +30,6 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-EXTERNAL_LOGIN_URL = os.getenv("EXTERNAL_LOGIN_URL", "http://localhost:8000/auth/login")
-EXTERNAL_CREATE_USER_URL = os.getenv("EXTERNAL_CREATE_USER_URL", "http://localhost:8000/auth/create-user")
 
 class CreateUserRequest(BaseModel):
     username: str
@@ -73,7 +73,7 @@ class LoginResponse(BaseModel):
     dob: Optional[str] = None
 
 async def validate_org(org_code: str, response: dict):
-    org_coll = await organisations_collection.find_one({"org_code": org_code})
+    org_coll = await org_cache.get_by_code(org_code)
     print(f"\n\nOrg_code: {org_code}, Org Coll: {org_coll.get("org_type")}, Org_id: {org_coll.get("org_id")}, Languages Allowed: {org_coll.get("settings").get("language_allowed")}\n\n")
     
     if org_coll is None:
@@ -123,7 +123,7 @@ async def anonymous_login(org_code: str = Form(...)):
     """
     try:
         # Find organization by org_code
-        org = await organisations_collection.find_one({"org_code": org_code})
+        org = await org_cache.get_by_code(org_code)
         
         if not org:
             raise HTTPException(status_code=404, detail="Organization not found")
@@ -146,7 +146,7 @@ async def anonymous_login(org_code: str = Form(...)):
             "org_code": org_code
         }
         
-        response = requests.post(EXTERNAL_LOGIN_URL, data=payload)
+        response = await external_login(payload)
         
         if response.status_code != 200:
             try:
@@ -177,7 +177,7 @@ async def anonymous_login(org_code: str = Form(...)):
             username=anonymous_userid
         )
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=503, detail=f"External authentication service unavailable: {str(e)}")
 
 @router.post("/auth/register")
@@ -205,7 +205,7 @@ async def register_global_user(data: GlobalUserRegister):
             "address": data.address
         }
 
-        response = requests.post(EXTERNAL_CREATE_USER_URL, json=external_payload)
+        response = await external_create_user(external_payload)
         
         if response.status_code not in [200, 201]:
             raise HTTPException(status_code=400, detail=f"User creation failed: {response.text}")
@@ -213,7 +213,7 @@ async def register_global_user(data: GlobalUserRegister):
         resp_data = response.json()
         external_user_id = resp_data.get("user_id")
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error calling external create-user: {str(e)}")
         raise HTTPException(status_code=503, detail="External user service unavailable")
 
@@ -245,7 +245,7 @@ async def login(
         print(f"\n\nparam2: {param2}, param3: {param3}, org_code: {org_code}, timezone: {timezone}, payload:{payload}\n")
 
         # The external service expects application/x-www-form-urlencoded
-        response = requests.post(EXTERNAL_LOGIN_URL, data=payload)
+        response = await external_login(payload)
         if response.status_code == 200:
             response_data = response.json()
             
@@ -311,7 +311,7 @@ async def login(
             
             raise HTTPException(status_code=response.status_code, detail=error_detail)
             
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=503, detail=f"Login service unavailable: {str(e)}")
 
 @router.post("/auth/revalidate", response_model=LoginResponse)
@@ -332,7 +332,7 @@ async def revalidate(
 
     try:
         # Find organization by org_code
-        org = await organisations_collection.find_one({"org_code": org_code})
+        org = await org_cache.get_by_code(org_code)
         if not org:
             raise HTTPException(status_code=404, detail="Organization not found")
 
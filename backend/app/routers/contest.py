@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-import requests
+import httpx
 from typing import Optional, List, Dict, Any
 from app.database import organisations_collection, participants_collection, contests_collection, users_collection
 from app.contest_config import Contest
@@ -8,6 +8,8 @@ from app.contest_participant import Participant, ParticipantCreate, ParticipantL
 from bson import ObjectId
 from datetime import datetime, timezone
 from app.services.validateContest import validate_contest_for_login, validate_contest_registration, check_eligibility
+from app.services.contest_leaderboard import contest_leaderboards
+from app.services.external_auth import EXTERNAL_CREATE_USER_URL, external_login, external_create_user
 import hashlib
 import os
 import json
@@ -19,8 +21,6 @@ router = APIRouter()
 
 load_dotenv()
 
-EXTERNAL_LOGIN_URL = os.getenv("EXTERNAL_LOGIN_URL", "http://localhost:8000/auth/login")
-EXTERNAL_CREATE_USER_URL = os.getenv("EXTERNAL_CREATE_USER_URL", "http://localhost:8000/auth/create-user")
 SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-key") 
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
@@ -105,7 +105,7 @@ async def authenticate_participant(data: ParticipantAuthRequest):
             "password": data.password
         }
         print(f"[DEBUG-Auth] Authenticating participant: {data.username}")
-        response = requests.post(EXTERNAL_LOGIN_URL, data=login_payload)
+        response = await external_login(login_payload)
         print(f"[DEBUG-Auth] External Login Response Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -184,7 +184,7 @@ async def authenticate_participant(data: ParticipantAuthRequest):
                  # User does not exist, proceed to registration
                  return json_serializable({"found": False, "message": "Authentication failed"})
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=503, detail="External authentication service unavailable")
 
 @router.post("/contest/register")
@@ -223,12 +223,12 @@ async def register_contest_participant(data: ContestParticipantCreate, user_time
                 "password": data.password
             }
             # Add param2/param3 if needed by external login? Auth service usually just needs user/pass
-            login_response = requests.post(EXTERNAL_LOGIN_URL, data=login_payload)
+            login_response = await external_login(login_payload)
             print(f"[DEBUG-Register] External Login Response Status: {login_response.status_code}")
             
             if login_response.status_code != 200:
                  raise HTTPException(status_code=401, detail="Incorrect password for existing username. Please verify your credentials.")
-        except requests.RequestException:
+        except httpx.HTTPError:
              # Fallback: If external service is down, we cannot authenticate properly.
              # Security Decision: Do not fallback to local password as we shouldn't be storing it.
              raise HTTPException(status_code=503, detail="Authentication service unavailable")
@@ -265,6 +265,7 @@ async def register_contest_participant(data: ContestParticipantCreate, user_time
                 "$set": update_fields
             }
         )
+        await contest_leaderboards.add_participant(data.contest_id, data.username)
         # Existing user, so external_user_id is in their profile
         return json_serializable({"message": "Registration successful", "id": str(contestant["_id"]), "external_user_id": contestant.get("user_id")})
         
@@ -284,7 +285,7 @@ async def register_contest_participant(data: ContestParticipantCreate, user_time
                     "username": data.username,
                     "password": data.password
                 }
-                login_response = requests.post(EXTERNAL_LOGIN_URL, data=login_payload)
+                login_response = await external_login(login_payload)
                 print(f"[DEBUG-Register] External Login Response Status: {login_response.status_code}")
                 
                 if login_response.status_code != 200:
@@ -294,7 +295,7 @@ async def register_contest_participant(data: ContestParticipantCreate, user_time
                 ext_user = login_response.json()
                 external_user_id = ext_user.get("user_id") or user_in_central.get("user_id") or user_in_central.get("_id")
                 print(f"[DEBUG-Register] External User ID: {external_user_id}")
-            except requests.RequestException:
+            except httpx.HTTPError:
                 raise HTTPException(status_code=503, detail="Authentication service unavailable")
         else:
             # Scenario 3: New User (Not found in participants or users)
@@ -314,7 +315,7 @@ async def register_contest_participant(data: ContestParticipantCreate, user_time
                 }
                 print(f"[DEBUG-Register] Registration Payload: {external_payload}")
                 print(f"[DEBUG-Register] Calling External Create User URL: {EXTERNAL_CREATE_USER_URL}")
-                response = requests.post(EXTERNAL_CREATE_USER_URL, json=external_payload)
+                response = await external_create_user(external_payload)
                 print(f"[DEBUG-Register] External Create User Response Status: {response.status_code}")
                 
                 if response.status_code == 200 or response.status_code == 201:
@@ -329,7 +330,7 @@ async def register_contest_participant(data: ContestParticipantCreate, user_time
                             "username": data.username,
                             "password": data.password
                         }
-                        login_response = requests.post(EXTERNAL_LOGIN_URL, data=login_payload)
+                        login_response = await external_login(login_payload)
                         print(f"[DEBUG-Register] Fallback Login Response Status: {login_response.status_code}")
                         
                         if login_response.status_code == 200:
@@ -341,10 +342,10 @@ async def register_contest_participant(data: ContestParticipantCreate, user_time
                             print(f"User creation failed ({response.status_code}) and fallback login failed: {login_response.text}")
                             raise HTTPException(status_code=400, detail=f"User registration failed. {response.text}")
 
-                    except requests.RequestException:
+                    except httpx.HTTPError:
                         raise HTTPException(status_code=400, detail=f"User creation failed: {response.text}")
 
-            except requests.RequestException as e:
+            except httpx.HTTPError as e:
                 print(f"Error calling external create-user: {str(e)}")
                 raise HTTPException(status_code=503, detail="External user service unavailable")
 
@@ -373,6 +374,7 @@ async def register_contest_participant(data: ContestParticipantCreate, user_time
         }
         
         result = await participants_collection.insert_one(contestant_dict)
+        await contest_leaderboards.add_participant(data.contest_id, data.username)
     return json_serializable({"message": "Registration successful", "id": str(result.inserted_id), "external_user_id": external_user_id})
 
 @router.post("/contest/login", response_model=LoginResponse)
@@ -387,7 +389,7 @@ async def login_contest_participant(data: ParticipantLogin, user_timezone: Optio
             "param3": data.contest_id
         }
         
-        response = requests.post(EXTERNAL_LOGIN_URL, data=payload)
+        response = await external_login(payload)
         
         if response.status_code != 200:
             try:
@@ -399,7 +401,7 @@ async def login_contest_participant(data: ParticipantLogin, user_timezone: Optio
             
         external_data = response.json()
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"External login service error: {str(e)}")
         raise HTTPException(status_code=503, detail="Authentication service unavailable")
 
@@ -541,6 +543,10 @@ async def submit_contest_scores(data: ContestScoreSubmission):
     
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to update participant scores")
+
+    await contest_leaderboards.replace_scores(
+        data.contest_id, data.username, {"round_scores": round_scores, "total_score": total_score}, data.is_final
+    )
     
     return json_serializable({
         "message": "Scores submitted successfully",
@@ -563,61 +569,20 @@ async def get_contest_leaderboard(
     if not contest:
         raise HTTPException(status_code=404, detail="Contest not found")
     
-    # 1. Pipeline for entries
-    pipeline = [
-        {"$unwind": "$participations"},
-        {"$match": {"participations.contest_id": contest_id}},
-        {"$project": {
-            "username": 1,
-            "total_score": "$participations.total_score",
-            "round_scores": "$participations.round_scores"
-        }},
-        {"$sort": {"total_score": -1}},
-        {"$limit": limit}
-    ]
-    
-    cursor = participants_collection.aggregate(pipeline)
-    results = await cursor.to_list(length=limit)
-    
-    # 2. Pipeline for global average time (only from completed participations)
-    avg_pipeline = [
-        {"$unwind": "$participations"},
-        {"$match": {
-            "participations.contest_id": contest_id,
-            "participations.contest_completed": True
-        }},
-        {"$unwind": "$participations.round_scores"},
-        {"$group": {
-            "_id": "$_id",
-            "total_participant_time": {"$sum": "$participations.round_scores.time_taken"}
-        }},
-        {"$group": {
-            "_id": None,
-            "global_avg_time": {"$avg": "$total_participant_time"}
-        }}
-    ]
-    
-    avg_result = await participants_collection.aggregate(avg_pipeline).to_list(length=1)
-    global_avg_time = avg_result[0].get("global_avg_time", 0) if avg_result else 0
+    # Materialized leaderboard: the top entries in rank order (score, then the contest's
+    # tie-breaker rules) and the running average time of completed participations
+    tie_breaker_rules = (contest.get("scoring_config") or {}).get("tie_breaker_rules")
+    results, global_avg_time = await contest_leaderboards.top(contest_id, tie_breaker_rules, limit)
 
     # Build leaderboard with ranks and language split
     leaderboard = []
     for idx, entry in enumerate(results):
-        # Aggregate scores and times by language for this participant
-        language_scores = {}
-        language_times = {}
-        for rs in entry.get("round_scores", []):
-            lang = rs.get("language")
-            if lang:
-                language_scores[lang] = language_scores.get(lang, 0) + rs.get("score", 0)
-                language_times[lang] = language_times.get(lang, 0) + rs.get("time_taken", 0)
-
         leaderboard.append(LeaderboardEntry(
             rank=idx + 1,
             username=entry["username"],
             total_score=entry["total_score"],
-            language_scores=language_scores,
-            language_times=language_times,
+            language_scores=entry.get("language_scores", {}),
+            language_times=entry.get("language_times", {}),
             is_current_user=(entry["username"] == current_username if current_username else False)
         ))
     
@@ -861,6 +826,11 @@ async def log_contest_progress(data: ContestProgressLog):
             "$set": update_data
         }
     )
+
+    await contest_leaderboards.record_round(
+        data.contest_id, data.username, data.language, data.score, data.time_taken,
+        contest_completed, contest_obj.scoring_config.tie_breaker_rules
+    )
     
     return {"status": "progress_logged"}
 
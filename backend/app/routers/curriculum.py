@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query, Depends, Request
 from typing import List, Optional
 from pydantic import BaseModel, Field
-import requests
+import httpx
 import os
 import logging
 import re
@@ -10,6 +10,7 @@ from app.models import PyObjectId, Book, Chapter, Page
 from bson import ObjectId
 from datetime import datetime, timezone
 from app.routers.auth import get_current_user, get_current_user_optional
+from app.utils.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -67,13 +68,13 @@ async def search_books(
         logger.info(f"Calling external curriculum API: {url} with params: {params}")
             
         # Call external API
-        response = requests.get(url, params=params, headers=headers)
+        response = await get_http_client("curriculum").get(url, params=params, headers=headers)
         
         if response.status_code == 200:
             return response.json()
         else:
             raise HTTPException(status_code=response.status_code, detail=f"External API error: {response.text}")
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Failed to connect to external curriculum API: {str(e)}")
         raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
 
@@ -94,7 +95,7 @@ async def get_book_chapters(
         if auth_header:
              print(f"DEBUG: Auth Header Length: {len(auth_header)}")
              
-        response = requests.get(f"{EXTERNAL_API_URL}/books/{book_id}/chapters", headers=headers)
+        response = await get_http_client("curriculum").get(f"{EXTERNAL_API_URL}/books/{book_id}/chapters", headers=headers)
         
         print(f"DEBUG: External API URL: {EXTERNAL_API_URL}/books/{book_id}/chapters")
         print(f"DEBUG: Status Code: {response.status_code}")
@@ -110,7 +111,7 @@ async def get_book_chapters(
             return data.get("chapters", [])
         else:
             raise HTTPException(status_code=response.status_code, detail=f"External API error: {response.text}")
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
 
 @router.get("/curriculum/books/{book_id}/chapters/{chapter_identifier}/pages", response_model=List[Page])
@@ -126,13 +127,13 @@ async def get_chapter_pages(
         if auth_header:
             headers["Authorization"] = auth_header
 
-        response = requests.get(f"{EXTERNAL_API_URL}/books/{book_id}/chapters/{chapter_identifier}/pages", headers=headers)
+        response = await get_http_client("curriculum").get(f"{EXTERNAL_API_URL}/books/{book_id}/chapters/{chapter_identifier}/pages", headers=headers)
         
         if response.status_code == 200:
             return response.json()
         else:
             raise HTTPException(status_code=response.status_code, detail=f"External API error: {response.text}")
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
 
 # @router.get("/curriculum/play/page/{book_id}/{chapter_id}/{page_id}")
@@ -3,14 +3,12 @@ from app.models import Organisation
 
 router = APIRouter()
 
-from app.database import organisations_collection
-
-import re
+from app.services.org_cache import org_cache
 
 @router.post("/determine_org", response_model=Organisation)
 async def determine_org(path_segment: str):
     # Case-insensitive search
-    org = await organisations_collection.find_one({"org_code": {"$regex": f"^{re.escape(path_segment)}$", "$options": "i"}})
+    org = await org_cache.get_by_code(path_segment, case_insensitive=True)
     # print(f"\n\nOrg data for {path_segment}: {org}\n\n")
     if org:
         # Extract logo_url from settings if it exists
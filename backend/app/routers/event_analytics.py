@@ -3,6 +3,7 @@ from typing import Optional
 from datetime import datetime, timedelta
 from app.event_analytics_models import GameEvent
 from app.database import event_analytics_collection, translation_collection
+from app.services.language_registry import get_language_registry
 
 router = APIRouter(prefix="/event-analytics", tags=["event analytics"])
 
@@ -73,16 +74,11 @@ async def get_mastery_score(
         user_id = user_info.get("username") or user_info.get("sub") or user_info.get("user_id")
         
         # Resolve language name if a code was passed
-        from app.database import languages_collection
-        lang_doc = await languages_collection.find_one({
-            "$or": [
-                {"isoCode": language_code},
-                {"language_name": {"$regex": f"^{language_code}$", "$options": "i"}}
-            ]
-        })
+        registry = await get_language_registry()
+        lang = registry.by_iso.get(language_code.strip().casefold()) or registry.by_language_name(language_code)
         
         # Search language name or isoCode
-        search_language = lang_doc.get("language_name") if lang_doc else language_code
+        search_language = lang.name if lang else language_code
         
         # Extract org_id from request state (set by AuthMiddleware)
         org = getattr(request.state, "org", None)
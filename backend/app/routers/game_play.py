@@ -8,6 +8,8 @@ from app.contest_participant import Contestant
 from bson import ObjectId
 import logging
 from app.utils.external_api import trigger_embeddings_update
+from app.storage.imagestore import resolve_delivery_mode
+from app.storage.renditions import resolve_rendition_size
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +27,8 @@ async def get_level_round_content(
     language: str = Query(..., description="Language for the content"),
     category: Optional[str] = Query(None, description="Object category filter"),
     field_of_study: Optional[str] = Query(None, description="Field of study filter"),
+    image_delivery: Optional[str] = Query(None, description="Image delivery mode: 'base64', 'presigned' or 'cdn'. Defaults to the deployment setting"),
+    size: Optional[int] = Query(None, description="Image rendition size in px (e.g. 256 or 512). Omit for the original upload"),
     token_user: Dict = Depends(get_current_user)
 ):
     """
@@ -33,6 +37,9 @@ async def get_level_round_content(
     Ensures consistency of objects across levels for the same user.
     """
     
+    delivery_mode = resolve_delivery_mode(image_delivery)
+    size = resolve_rendition_size(size)
+
     # Fetch full Contestant object from DB using token info
     username = token_user.get("username")
     if not username:
@@ -105,7 +112,9 @@ async def get_level_round_content(
             category=category,
             field_of_study=field_of_study,
             assigned_object_ids=None,
-            areas_of_interest= areas_of_interest
+            areas_of_interest= areas_of_interest,
+            image_delivery=delivery_mode,
+            image_size=size
         )
         
         # 5. Add No-Cache headers to ensure browser fetches fresh random content every time
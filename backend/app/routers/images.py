@@ -0,0 +1,159 @@
+import re
+import base64
+import logging
+import mimetypes
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.database import objects_collection
+from app.storage.backends import get_storage_backend, StorageNotFoundError, StorageError
+from app.storage.imagecache import image_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+# Content under a hash never changes, so clients and proxies may cache it for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_HASH_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,128}$")
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag(image_hash: str) -> str:
+    return f'"{image_hash}"'
+
+
+def _etag_matches(header_value: Optional[str], etag: str) -> bool:
+    if not header_value:
+        return False
+    candidates = [c.strip() for c in header_value.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _sniff_content_type(data: bytes) -> Optional[str]:
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single-range "bytes=" header into an inclusive (start, end) pair.
+    Returns None when the whole entity should be served (no header, or multiple ranges).
+    Raises HTTPException 416 when the range cannot be satisfied.
+    """
+    if not range_header or "," in range_header:
+        return None
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        start, end = max(0, size - length), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+@router.api_route("/{image_hash}", methods=["GET", "HEAD"])
+async def get_image(image_hash: str, request: Request):
+    """
+    Streams the stored image for image_hash.
+    Responses are immutable: a strong ETag (the hash) and a one-year Cache-Control.
+    Supports conditional GET (If-None-Match), single byte ranges (Range / If-Range) and HEAD.
+    """
+    if not _HASH_PATTERN.match(image_hash):
+        raise HTTPException(status_code=400, detail="Invalid image hash")
+
+    etag = _etag(image_hash)
+    base_headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    # The hash identifies the content, so a matching validator needs no lookup at all
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=base_headers)
+
+    obj = await objects_collection.find_one(
+        {"image_hash": image_hash},
+        {"image_store": 1, "image_base64": 1}
+    )
+    if not obj:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    image_store = obj.get("image_store") or {}
+    object_key = image_store.get("object_key")
+
+    # Served from memory: cached bytes, or legacy objects that only have inline base64
+    data = await image_cache.get(image_hash)
+    if data is None and not object_key and obj.get("image_base64"):
+        data = base64.b64decode(obj["image_base64"])
+
+    backend = None
+    if data is not None:
+        size = len(data)
+        content_type = _sniff_content_type(data)
+    elif object_key:
+        try:
+            backend = get_storage_backend(image_store.get("storage_provider"))
+            info = await backend.stat(object_key)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Unsupported storage provider: {image_store.get('storage_provider')}")
+        except StorageNotFoundError:
+            raise HTTPException(status_code=404, detail="Image not found in storage")
+        except StorageError as e:
+            raise HTTPException(status_code=504, detail=f"Storage unavailable: {str(e)}")
+        size = info["size"]
+        content_type = info.get("content_type")
+    else:
+        raise HTTPException(status_code=404, detail="Image has no stored content")
+
+    if not content_type or content_type == "application/octet-stream":
+        content_type = (mimetypes.guess_type(object_key)[0] if object_key else None) or "application/octet-stream"
+
+    # If-Range: only honour Range when the client's validator still matches
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range.strip() == etag:
+        byte_range = _parse_range(request.headers.get("range"), size)
+
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers = {**base_headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+    else:
+        start, end = 0, size - 1
+        status_code = 200
+        headers = dict(base_headers)
+    length = end - start + 1 if size else 0
+    headers["Content-Length"] = str(length)
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=content_type)
+
+    if data is not None:
+        return Response(content=data[start:end + 1], status_code=status_code, headers=headers, media_type=content_type)
+
+    return StreamingResponse(
+        backend.iter_bytes(object_key, start, length),
+        status_code=status_code,
+        headers=headers,
+        media_type=content_type,
+    )
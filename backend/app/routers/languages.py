@@ -1,20 +1,35 @@
 from fastapi import HTTPException, APIRouter, Request
-from fastapi.responses import JSONResponse
-from app.database import translation_collection, languages_collection, objects_collection
+from fastapi.responses import JSONResponse, Response
+from app.database import translation_collection, objects_collection
 from bson import ObjectId
 # from googletrans import Translator
 # from deep_translator import GoogleTranslator
 from app.database import organisations_collection
 import json
 import os
+import hashlib
 from app.redis_connection import redis_client, TTS_CACHE_TTL  # ✅ reuse TTL for cache
 import logging
 from googleapiclient.discovery import build
-from starlette.concurrency import run_in_threadpool
+from app.services.translation_memo import translation_memo
+from app.services.language_registry import get_language_registry
+from app.services.taxonomy import taxonomy_index
+from app.services.facets import catalog_facets
+from app.services.language_availability import language_availability
+import asyncio
+import threading
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
 
 
 logger = logging.getLogger(__name__)
 
+# Google Translate v2 accepts at most 128 strings per request
+TRANSLATE_BATCH_SIZE = 128
+TRANSLATE_MAX_WORKERS = int(os.getenv("TRANSLATE_MAX_WORKERS", 4))
+translate_executor = ThreadPoolExecutor(max_workers=TRANSLATE_MAX_WORKERS, thread_name_prefix="translate")
+_translate_local = threading.local()
+
 # ---------- Initialize FastAPI ----------
 router = APIRouter(prefix="/active", tags=["Language, Objects category and Field of Study Services"])
 # translator = Translator()
@@ -24,11 +39,11 @@ async def get_language_code(language_name: str) -> str:
     if not language_name:
         return "en"
     
-    clean_name = language_name.strip().title() # DB uses Title Case (e.g., "Hindi")
     try:
-        lang_doc = await languages_collection.find_one({"language_name": clean_name})
-        if lang_doc and lang_doc.get("isoCode"):
-            return lang_doc["isoCode"]
+        # Names, isoCodes and bcp47 tags all resolve, case-insensitively, from the in-memory registry
+        lang = (await get_language_registry()).lookup(language_name)
+        if lang and lang.iso_code:
+            return lang.iso_code
         
         # Fallback to first 2 letters if not found in DB
         return language_name.strip().lower()[:2]
@@ -36,37 +51,91 @@ async def get_language_code(language_name: str) -> str:
         logger.warning(f"⚠️ Error fetching language code for {language_name}: {e}")
         return language_name.strip().lower()[:2]
 
-async def translate_text(text: str, target_language: str) -> str:
-    """Translate text to target language using Google Translate API."""
-    if not text or not target_language:
-        return text
-    
+def _get_translate_service(api_key: str):
+    """
+    Translate v2 service for the current pool thread. Building it parses the discovery
+    document, so it is built once per thread (the underlying http object is not thread-safe).
+    """
+    service = getattr(_translate_local, "service", None)
+    if service is None or _translate_local.api_key != api_key:
+        service = build('translate', 'v2', developerKey=api_key, cache_discovery=False)
+        _translate_local.service = service
+        _translate_local.api_key = api_key
+    return service
+
+
+def _translate_batch(texts: List[str], target_code: str, api_key: str) -> List[str]:
+    """Blocking: translates up to TRANSLATE_BATCH_SIZE strings in one upstream call."""
+    result = _get_translate_service(api_key).translations().list(q=texts, target=target_code).execute()
+    return [item['translatedText'] for item in result.get('translations', [])]
+
+
+async def translate_texts(texts: List[str], target_language: str) -> List[str]:
+    """
+    Translate many strings to target_language. Returns a list aligned with texts;
+    any string that could not be translated is returned unchanged.
+    Memoised strings are served from the translation memo; the rest are sent to Google
+    in batches of TRANSLATE_BATCH_SIZE, on the bounded translate pool.
+    """
+    if not texts or not target_language:
+        return list(texts or [])
+
+    api_key = os.getenv("GOOGLE_API_KEY") # Use the same key as others
+    if not api_key:
+        logger.error("❌ GOOGLE_API_KEY not found in environment.")
+        return list(texts)
+
     try:
-        api_key = os.getenv("GOOGLE_API_KEY") # Use the same key as others
-        if not api_key:
-            logger.error("❌ GOOGLE_API_KEY not found in environment.")
-            return text
-            
-        service = build('translate', 'v2', developerKey=api_key,cache_discovery=False)
-        
         target_code = await get_language_code(target_language)
-        
-        result = await run_in_threadpool(
-            service.translations().list(
-                q=[text],
-                target=target_code
-            ).execute
-        )
-        
-        if result and 'translations' in result:
-            return result['translations'][0]['translatedText']
-        
-        return text
+        unique_texts = list(dict.fromkeys(t for t in texts if t))
+        translated = await translation_memo.get_many(unique_texts, target_code)
+
+        misses = [t for t in unique_texts if t not in translated]
+        if misses:
+            loop = asyncio.get_running_loop()
+            batches = [misses[i:i + TRANSLATE_BATCH_SIZE] for i in range(0, len(misses), TRANSLATE_BATCH_SIZE)]
+            results = await asyncio.gather(*(
+                loop.run_in_executor(translate_executor, _translate_batch, batch, target_code, api_key)
+                for batch in batches
+            ), return_exceptions=True)
+
+            fresh = {}
+            for batch, result in zip(batches, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"⚠️ Google Translation failed for {len(batch)} text(s) to {target_language}: {result}")
+                    continue
+                fresh.update(zip(batch, result))
+            if fresh:
+                await translation_memo.put_many(fresh, target_code)
+                translated.update(fresh)
+
+        return [translated.get(t, t) if t else t for t in texts]
     except Exception as e:
-        logger.warning(f"⚠️ Google Translation failed for '{text}' to {target_language}: {e}")
+        logger.warning(f"⚠️ Google Translation failed for {len(texts)} text(s) to {target_language}: {e}")
+        return list(texts)
+
+
+async def translate_text(text: str, target_language: str) -> str:
+    """Translate text to target language using Google Translate API."""
+    if not text or not target_language:
         return text
+    return (await translate_texts([text], target_language))[0]
 
 # ---------- API endpoint ----------
+def _conditional_json(content, request: Request) -> Response:
+    """
+    JSON response with an ETag over its body; a matching If-None-Match gets a 304.
+    The list depends on the caller's org and token, so caches must revalidate it.
+    """
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    candidates = [c.strip() for c in (request.headers.get("if-none-match") or "").split(",")]
+    if etag in candidates or f"W/{etag}" in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/languages")
 async def get_languages(request: Request):
     try:
@@ -90,11 +159,8 @@ async def get_languages(request: Request):
 
             print(f"\nFor Org id: {org_id} | Org allowed languages: {org_allowed}")
             
-            # Find languages in translations where org_id matches and status is Approved
-            available_in_db = await translation_collection.distinct(
-                "requested_language",
-                {"org_id": org_id, "translation_status": "Approved"}
-            )
+            # Languages with approved translations for the org, from the in-memory availability table
+            available_in_db = await language_availability.languages(org_id)
             
             # Intersect Org Allowed (if defined) with Available in DB
             if org_allowed is not None:
@@ -129,63 +195,81 @@ async def get_languages(request: Request):
                 
         else:
             # Step 3: No Org
-            # Select distinct languages where org_id is null or not present
-            final_languages = await translation_collection.distinct(
-                "requested_language",
-                {
-                    "translation_status": "Approved",
-                    "$or": [{"org_id": {"$exists": False}}, {"org_id": None}]
-                }
-            )
-            final_languages = set(final_languages)
+            # Languages with approved public translations (org_id null or not present)
+            final_languages = await language_availability.languages(None)
 
         distinct_lang_texts = list(final_languages)
 
         # print("\nDistinct languages found:", distinct_lang_texts)
         if not distinct_lang_texts:
-            return JSONResponse(content=[])
-
-        # 2️⃣ Query languages collection for matching details
-        cursor = languages_collection.find(
-            {"language_name": {"$in": distinct_lang_texts}},
-            {"_id": 0, "language_name": 1, "isoCode": 1, "bcp47": 1, "imageURL": 1}
-        )
-
-        raw_languages = await cursor.to_list(length=None)
-        # print("\n⏰⏰⏰Raw languages fetched:", raw_languages)
+            return _conditional_json([], request)
+
+        # 2️⃣ Resolve language details from the in-memory registry
+        registry = await get_language_registry()
+        matched_languages = {
+            lang.name: lang
+            for lang in (registry.by_language_name(name) for name in distinct_lang_texts)
+            if lang
+        }
         # Normalize field names for frontend
         languages = [
             {
-                "name": lang.get("language_name"),
-                "code": lang.get("isoCode"),
-                "bcp47": lang.get("bcp47"),
-                "imageURL": lang.get("imageURL")
+                "name": lang.name,
+                "code": lang.iso_code,
+                "bcp47": lang.bcp47,
+                "imageURL": lang.image_url
             }
-            for lang in raw_languages
+            for lang in matched_languages.values()
         ]
 
         # print("\nLanguages details fetched:", languages)
         # Sort languages alphabetically by name
         sorted_languages = sorted(languages, key=lambda x: x['name'] if x['name'] else "")
-        return JSONResponse(content=sorted_languages)
+        return _conditional_json(sorted_languages, request)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch languages: {str(e)}")
 
+async def _facet_response(facets: dict, language_name: str, lang_code: str) -> dict:
+    """Facet counts as the endpoint's {"en", "translated", "count"} lists, using precomputed taxonomy labels."""
+    code = lang_code.lower()
+    terms = {term["_id"]: term for term in await taxonomy_index.terms()}
+    sections = {}
+    for section, kind in (("object_categories", "category"), ("fields_of_study", "field_of_study")):
+        items = []
+        for facet in facets.get(kind, []):
+            term = terms.get(facet["taxonomy_id"]) or {}
+            name = term.get("name") or facet["taxonomy_id"].split(":", 1)[1]
+            label = name if code in ("en", "eng") else (term.get("labels") or {}).get(code)
+            items.append({"en": name, "translated": label, "count": facet["count"]})
+        sections[section] = sorted(items, key=lambda item: item["en"])
+
+    # Terms not localized yet (see app.scripts.build_taxonomy) take one batched call
+    missing = [item for items in sections.values() for item in items if item["translated"] is None]
+    if missing:
+        translated = await translate_texts([item["en"] for item in missing], language_name)
+        for item, text in zip(missing, translated):
+            item["translated"] = text
+    return sections
+
+
 @router.get("/object-categories-FOS/{language_name}") #FOS - field of study
 async def get_object_categories_FOS(language_name: str, request: Request, refresh: bool = False):
     try:
         # 1️⃣ Get ISO code for the requested language
-        language_doc = await languages_collection.find_one(
-            {"language_name": {"$regex": f"^{language_name}$", "$options": "i"}},
-            {"_id": 0, "isoCode": 1}
-        )
-        lang_code = language_doc.get("isoCode", "en") if language_doc else "en"
+        language = (await get_language_registry()).by_language_name(language_name)
+        lang_code = (language.iso_code or "en") if language else "en"
 
         # Get Org ID
         org = getattr(request.state, "org", None)
         org_id = org.get("org_id") if org else None
         
+        # Built facet partitions answer with one indexed read, counts included; empty ones
+        # keep the objects-based fallback below
+        facets = await catalog_facets.read(org_id, language_name.title())
+        if facets:
+            return JSONResponse(content=await _facet_response(facets, language_name, lang_code))
+
         # ✅ Create Redis cache key (include org_id to separate caches)
         org_suffix = f"org:{org_id}" if org_id else "public"
         cache_key = f"categories_fos:{lang_code.lower()}:{org_suffix}"
@@ -267,13 +351,16 @@ async def get_object_categories_FOS(language_name: str, request: Request, refres
             translated_object_categories = [{"en": cat, "translated": cat} for cat in object_categories]
             translated_fields_of_study = [{"en": field, "translated": field} for field in fields_of_study]
         else:
-            for cat in object_categories:
-                translated_text = await translate_text(cat, language_name)
-                translated_object_categories.append({"en": cat, "translated": translated_text})
-
-            for field in fields_of_study:
-                translated_text = await translate_text(field, language_name)
-                translated_fields_of_study.append({"en": field, "translated": translated_text})
+            # One batched call for all categories and fields of study
+            translated = await translate_texts(object_categories + fields_of_study, language_name)
+            translated_object_categories = [
+                {"en": cat, "translated": text}
+                for cat, text in zip(object_categories, translated[:len(object_categories)])
+            ]
+            translated_fields_of_study = [
+                {"en": field, "translated": text}
+                for field, text in zip(fields_of_study, translated[len(object_categories):])
+            ]
 
         response_data = {
             "object_categories": translated_object_categories,
@@ -0,0 +1,60 @@
+from fastapi import APIRouter
+from app.storage.imagecache import image_cache
+from app.services.external_auth import auth_circuit
+from app.services.translation_memo import translation_memo
+from app.services.org_cache import org_cache
+from app.services.embeddings import query_embeddings
+from app.services.vector_index import vector_index
+from app.services.candidate_pools import candidate_pools
+from app.services.random_sampling import random_sampler
+from app.services.catalog import translation_catalog
+from app.services.taxonomy import taxonomy_index
+from app.services.facets import catalog_facets
+from app.services.language_availability import language_availability
+from app.services.contest_leaderboard import contest_leaderboards
+from app.indexes import index_report, explain_probes
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/caches")
+async def get_cache_metrics():
+    """
+    Hit/miss/eviction counters for the in-process caches of this worker.
+    """
+    return {
+        "image_cache": image_cache.stats(),
+        "translation_memo": translation_memo.stats(),
+        "org_cache": org_cache.stats(),
+        "query_embeddings": query_embeddings.stats(),
+        "vector_index": vector_index.stats(),
+        "candidate_pools": candidate_pools.stats(),
+        "random_sampler": random_sampler.stats(),
+        "translation_catalog": translation_catalog.stats(),
+        "taxonomy": taxonomy_index.stats(),
+        "catalog_facets": catalog_facets.stats(),
+        "language_availability": language_availability.stats(),
+        "contest_leaderboards": contest_leaderboards.stats(),
+    }
+
+
+@router.get("/circuits")
+async def get_circuit_metrics():
+    """
+    State of the circuit breakers guarding upstream services in this worker.
+    """
+    return {
+        "external_auth": auth_circuit.stats(),
+    }
+
+
+@router.get("/indexes")
+async def get_index_metrics(explain: bool = False):
+    """
+    Which registry indexes back which routes; with explain=true, also the index the
+    query planner actually picks for each probe query.
+    """
+    report = {"routes": index_report()}
+    if explain:
+        report["plans"] = await explain_probes()
+    return report
@@ -1,21 +1,21 @@
 import random
 import logging
 from fastapi import APIRouter, Query, Request, BackgroundTasks
-from typing import List, Optional
-from app.database import objects_collection, translation_set_collection, translation_collection, contests_collection
+from typing import List, Optional, Dict
+from app.database import objects_collection, translation_set_collection, contests_collection
 from app.models import ApiPicture, ResultObject, ResultTranslation, ResultVoting
 from app.contest_config import Contest
 from bson import ObjectId
 from datetime import datetime, timezone
-import os
-import httpx
 from fastapi import HTTPException
-from app.storage.imagestore import retrieve_image  
+from app.storage.imagestore import deliver_images, resolve_delivery_mode
+from app.storage.renditions import resolve_rendition_size
 from app.services.TScarddetails import get_TS_card_details
 from app.services.randompicdetails import get_random_picture_details
 # from app.services.poolrecommendations import get_pool_recommendations
 from app.services.pagedetails import get_page_details
 from app.utils.external_api import trigger_embeddings_update
+from app.services.quiz_backfill import enqueue_quiz_qa_backfill, needs_quiz_qa_backfill, QUIZ_QA_MIN_QUESTIONS
 
 
 # Configure logging
@@ -25,6 +25,38 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/pictures", tags=["pictures"])
 
 
+# Only the object fields the /random response needs; the inline image_base64 is the fallback
+# for objects without an image_store
+RANDOM_OBJECT_PROJECTION = {
+    "image_store": 1,
+    "image_hash": 1,
+    "image_base64": 1,
+    "metadata.object_category": 1,
+}
+
+
+async def _fetch_objects_by_id(object_ids: List, projection: Optional[dict] = None) -> Dict[str, dict]:
+    """
+    Fetches the given objects with a single $in query.
+    Returns {str(_id): object}; ids that do not exist are simply absent.
+    """
+    lookup_ids = []
+    for oid in object_ids:
+        if oid is None:
+            continue
+        lookup_ids.append(oid)
+        if isinstance(oid, str) and ObjectId.is_valid(oid):
+            lookup_ids.append(ObjectId(oid))
+    if not lookup_ids:
+        return {}
+
+    cursor = objects_collection.find(
+        {"_id": {"$in": lookup_ids}},
+        projection or RANDOM_OBJECT_PROJECTION
+    )
+    return {str(obj["_id"]): obj async for obj in cursor}
+
+
 @router.get("/random", response_model=List[ApiPicture])
 async def get_random_pictures(
     request: Request,
@@ -40,8 +72,13 @@ async def get_random_pictures(
     org_code: Optional[str] = Query(None, description="Organization code from URL path"),
     hints_used: Optional[str] = Query(None, description="Hint type for contest mode: 'Long Hints', 'Short Hints', or 'Object Name'"),
     object_ids: Optional[str] = Query(None, description="Comma-separated set of object IDs to fetch translations for"),
+    image_delivery: Optional[str] = Query(None, description="Image delivery mode: 'base64', 'presigned' or 'cdn'. Defaults to the deployment setting"),
+    size: Optional[int] = Query(None, description="Image rendition size in px (e.g. 256 or 512). Omit for the original upload"),
     background_tasks: BackgroundTasks = None
 ):
+    delivery_mode = resolve_delivery_mode(image_delivery)
+    size = resolve_rendition_size(size)
+
     # Extract org_id from request state (set by AuthMiddleware)
     org = getattr(request.state, "org", None)
     org_id = org["org_id"] if org else None
@@ -96,39 +133,15 @@ async def get_random_pictures(
     # continue rest of the processing from here
     logger.info(f"Retrieved {len(translation_docs)} documents from DB")
 
-    # Check and update quiz_qa if needed for each translation
-    api_quiz_qa_url = os.getenv("EXTERNAL_QUIZ_QA_URL", "http://localhost:8000/translations/update_quiz_qa")
-    for doc in translation_docs:
-        translation_id = doc.get("translation_id")
-        quiz_qa = doc.get("quiz_qa", [])
-        
-        # Check if quiz_qa is missing, blank, or has fewer than 15 questions
-        needs_update = False
-        if not quiz_qa:  # None or empty list
-            needs_update = True
-            logger.info(f"Translation {translation_id} has no quiz_qa, will update")
-        elif len(quiz_qa) < 15:
-            needs_update = True
-            logger.info(f"Translation {translation_id} has only {len(quiz_qa)} questions, will update")
-        
-        if needs_update:
-            try:
-                # Call the API to populate quiz_qa
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    response = await client.post(
-                        f"{api_quiz_qa_url}",
-                        data={"translation_id_str": str(translation_id)}
-                    )
-                    if response.status_code == 200:
-                        logger.info(f"Successfully updated quiz_qa for translation {translation_id}")
-                        # Fetch the updated document to get the new quiz_qa
-                        updated_doc = await translation_collection.find_one({"_id": translation_id})
-                        if updated_doc:
-                            doc["quiz_qa"] = updated_doc.get("quiz_qa", [])
-                    else:
-                        logger.error(f"Failed to update quiz_qa for translation {translation_id}: {response.status_code}")
-            except Exception as e:
-                logger.error(f"Error updating quiz_qa for translation {translation_id}: {str(e)}")
+    # Translations with too few quiz questions are queued for the backfill worker;
+    # the request never waits for regeneration
+    short_quiz_ids = [doc.get("translation_id") for doc in translation_docs if needs_quiz_qa_backfill(doc)]
+    if short_quiz_ids:
+        logger.info(f"{len(short_quiz_ids)} translation(s) have fewer than {QUIZ_QA_MIN_QUESTIONS} quiz questions, queueing backfill")
+        if background_tasks is not None:
+            background_tasks.add_task(enqueue_quiz_qa_backfill, short_quiz_ids)
+        else:
+            await enqueue_quiz_qa_backfill(short_quiz_ids)
 
     # 🔀 Hint field mapping logic - Contest mode vs Normal mode
     if hints_used:
@@ -159,49 +172,50 @@ async def get_random_pictures(
         mapping = dict(zip(target_fields, selected_fields))
         logger.info(f"Normal mode - Hint field mapping: {mapping}")
 
-    # 4) Normalize response
-    return_result = []
+    # 4) Resolve all objects in one query, then deliver all their images concurrently
+    objects_by_id = await _fetch_objects_by_id([d.get("object_id") for d in translation_docs])
+    matched = []
     for d in translation_docs:
+        obj = objects_by_id.get(str(d.get("object_id")))
+        if obj:
+            matched.append((d, obj))
+
+    images = await deliver_images([obj for _, obj in matched], delivery_mode, size=size)
+
+    # 5) Normalize response
+    return_result = []
+    for (d, obj), image in zip(matched, images):
         object_id = d.get("object_id")
-        if object_id:
-            obj = await objects_collection.find_one({"_id": object_id})
-            if obj:
-                logger.debug(f"Found matching object for object_id={object_id}: {obj}")
-                image_store = obj.get("image_store")
-                if image_store:
-                    imagebase64 = await retrieve_image(image_store)
-                    print("\nFound Image in image_store..")
-                else:
-                    imagebase64 = obj.get("image_base64")
-
-                api_pic = ApiPicture(
-                    object=ResultObject(
-                        object_id=str(object_id),
-                        # image_base64=obj.get("image_base64"), # this has to be taken from AWS S3 
-                        image_base64 = imagebase64,
-                        image_hash=obj.get("image_hash"),
-                        object_category=obj.get("metadata", {}).get("object_category"),
-                    ),
-                    translations=ResultTranslation(
-                        translation_id=str(d.get("translation_id")),
-                        language=d.get("requested_language", ""),
-                        object_description=d.get("object_description", ""),
-                        object_hint=d.get(mapping["object_hint"], ""),          # mapped consistently
-                        object_name=d.get("object_name", ""),                  # always fixed
-                        object_short_hint=d.get(mapping["object_short_hint"], ""),
-                        quiz_qa=d.get("quiz_qa", []),
-                        story=d.get("story"),
-                        moral=d.get("moral")
-                    ),
-                    voting=ResultVoting(
-                        up_votes=d.get("up_votes", 0),
-                        down_votes=d.get("down_votes", 0)
-                    )
-                )
-
-                return_result.append(api_pic)
-
-    # 5. Trigger embeddings update in the background for each selected object
+
+        api_pic = ApiPicture(
+            object=ResultObject(
+                object_id=str(object_id),
+                image_base64=image["image_base64"],
+                image_url=image["image_url"],
+                image_url_expires_at=image["image_url_expires_at"],
+                image_hash=obj.get("image_hash"),
+                object_category=obj.get("metadata", {}).get("object_category"),
+            ),
+            translations=ResultTranslation(
+                translation_id=str(d.get("translation_id")),
+                language=d.get("requested_language", ""),
+                object_description=d.get("object_description", ""),
+                object_hint=d.get(mapping["object_hint"], ""),          # mapped consistently
+                object_name=d.get("object_name", ""),                  # always fixed
+                object_short_hint=d.get(mapping["object_short_hint"], ""),
+                quiz_qa=d.get("quiz_qa", []),
+                story=d.get("story"),
+                moral=d.get("moral")
+            ),
+            voting=ResultVoting(
+                up_votes=d.get("up_votes", 0),
+                down_votes=d.get("down_votes", 0)
+            )
+        )
+
+        return_result.append(api_pic)
+
+    # 6. Trigger embeddings update in the background for each selected object
     # if background_tasks:
     #     for pic in return_result:
     #         oid = pic.object.object_id
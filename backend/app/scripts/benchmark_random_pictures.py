@@ -0,0 +1,94 @@
+"""
+Benchmark for the object lookup + image retrieval step of /pictures/random.
+
+Compares the previous per-document lookup (one find_one and one image download per
+translation doc, in sequence) with the bulk lookup ($in query with projection, then
+concurrent image delivery) at count=6/24/100.
+
+Uses real object ids sampled from the configured database. Image downloads hit the
+configured storage provider; pass --no-images to time the database step only. The image
+cache (both tiers) is cleared before every timed run of either variant, so the bulk
+variant is measured without cache hits; don't point IMAGE_CACHE_DIR at a cache you want to keep.
+
+Usage:
+    python -m app.scripts.benchmark_random_pictures [--runs 5] [--no-images]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.database import objects_collection
+from app.routers.pictures import _fetch_objects_by_id
+from app.storage.imagecache import image_cache
+from app.storage.imagestore import retrieve_image, deliver_images
+
+COUNTS = (6, 24, 100)
+
+
+async def lookup_per_document(object_ids, with_images: bool):
+    """The previous implementation: N find_one calls and N sequential downloads."""
+    for object_id in object_ids:
+        obj = await objects_collection.find_one({"_id": object_id})
+        if obj and with_images and obj.get("image_store"):
+            try:
+                await retrieve_image(obj["image_store"])
+            except Exception:
+                pass
+
+
+async def lookup_bulk(object_ids, with_images: bool):
+    """The current implementation: one $in query, then concurrent image delivery."""
+    objects_by_id = await _fetch_objects_by_id(object_ids)
+    if with_images:
+        await deliver_images([objects_by_id[str(oid)] for oid in object_ids if str(oid) in objects_by_id])
+
+
+async def time_runs(func, object_ids, with_images: bool, runs: int):
+    timings = []
+    for _ in range(runs):
+        # Cold cache for every run, so both variants download every image
+        await image_cache.clear()
+        started = time.perf_counter()
+        await func(object_ids, with_images)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+async def run_benchmark(runs: int, with_images: bool):
+    sample = await objects_collection.aggregate([
+        {"$sample": {"size": max(COUNTS)}},
+        {"$project": {"_id": 1}}
+    ]).to_list(length=None)
+    all_ids = [doc["_id"] for doc in sample]
+    if not all_ids:
+        print("No objects found in the database; nothing to benchmark.")
+        return
+
+    print(f"{'count':>6} | {'per-document p50/max (ms)':>26} | {'bulk p50/max (ms)':>20} | {'speedup':>7}")
+    print("-" * 70)
+    for count in COUNTS:
+        object_ids = all_ids[:count]
+        # Warm up the connection pool (database only; nothing is cached)
+        await lookup_bulk(object_ids, False)
+
+        old_p50, old_max = await time_runs(lookup_per_document, object_ids, with_images, runs)
+        new_p50, new_max = await time_runs(lookup_bulk, object_ids, with_images, runs)
+        speedup = old_p50 / new_p50 if new_p50 else float("inf")
+        print(
+            f"{len(object_ids):>6} | {old_p50:>12.1f} / {old_max:>10.1f} | "
+            f"{new_p50:>9.1f} / {new_max:>8.1f} | {speedup:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /pictures/random object lookup")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per count and variant")
+    parser.add_argument("--no-images", action="store_true", help="Skip image downloads, time the database step only")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("/pictures/random lookup benchmark" + (" (database only)" if args.no_images else ""))
+    print("=" * 70)
+    asyncio.run(run_benchmark(args.runs, not args.no_images))
@@ -0,0 +1,121 @@
+"""
+Benchmark for the local vector search engine (VECTOR_SEARCH_ENGINE=local).
+
+Builds a synthetic, clustered corpus (default 100k vectors x 768 dims) and compares
+VectorPartition top-k and threshold queries with an exact float64 brute-force scan:
+recall@k, threshold-set recall and p50/p95 latency. Also times the same queries
+against one (org, language) partition when the corpus is split into --partitions
+partitions, and the memory-mapped snapshot save/load.
+
+No database is needed.
+
+Usage:
+    python -m app.scripts.benchmark_vector_index [--vectors 100000] [--dims 768] [--queries 200] [--k 100]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import os
+
+import numpy as np
+
+from app.services.vector_index import VectorPartition
+
+
+def make_corpus(n: int, dims: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dims)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((n, dims)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def brute_force(corpus64: np.ndarray, query: np.ndarray, threshold: float, k: int):
+    scores = (corpus64 @ query.astype(np.float64) + 1.0) / 2.0
+    order = np.argsort(-scores)
+    return order[:k], set(np.flatnonzero(scores >= threshold).tolist())
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_benchmark(n: int, dims: int, queries: int, k: int, threshold: float, partitions: int, seed: int):
+    rng = np.random.default_rng(seed)
+    print(f"Building corpus: {n} vectors x {dims} dims")
+    corpus = make_corpus(n, dims, clusters=max(8, n // 500), rng=rng)
+    corpus64 = corpus.astype(np.float64)
+    ids = [str(i) for i in range(n)]
+    partition = VectorPartition(dims, ids, corpus)
+
+    # Queries near existing vectors, like real searches near indexed content
+    picks = rng.integers(0, n, size=queries)
+    query_vectors = corpus[picks] + 0.4 * rng.standard_normal((queries, dims)).astype(np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+
+    brute_ms, topk_ms, threshold_ms = [], [], []
+    topk_recall, threshold_recall = [], []
+    for query in query_vectors:
+        started = time.perf_counter()
+        exact_topk, exact_set = brute_force(corpus64, query, threshold, k)
+        brute_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        hits = partition.search(query, None, k)
+        topk_ms.append((time.perf_counter() - started) * 1000)
+        topk_recall.append(len({int(doc_id) for doc_id, _ in hits} & set(exact_topk.tolist())) / k)
+
+        started = time.perf_counter()
+        hits = partition.search(query, threshold, None)
+        threshold_ms.append((time.perf_counter() - started) * 1000)
+        found = {int(doc_id) for doc_id, _ in hits}
+        threshold_recall.append(len(found & exact_set) / len(exact_set) if exact_set else 1.0)
+
+    # One (org, language) partition out of `partitions` equal ones
+    size = n // partitions
+    small = VectorPartition(dims, ids[:size], corpus[:size])
+    partition_ms = []
+    for query in query_vectors:
+        started = time.perf_counter()
+        small.search(query, threshold, 5000)
+        partition_ms.append((time.perf_counter() - started) * 1000)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench")
+        started = time.perf_counter()
+        partition.save(path)
+        save_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        loaded = VectorPartition.load(path)
+        loaded.search(query_vectors[0], threshold, k)
+        load_ms = (time.perf_counter() - started) * 1000
+
+    print(f"\nthreshold={threshold}  k={k}  queries={queries}")
+    print(f"{'query':<40} {'p50 ms':>9} {'p95 ms':>9} {'recall':>8}")
+    rows = [
+        ("brute force float64 (full sort)", brute_ms, None),
+        (f"index top-{k}", topk_ms, statistics.mean(topk_recall)),
+        ("index threshold", threshold_ms, statistics.mean(threshold_recall)),
+        (f"index threshold, 1 of {partitions} partitions", partition_ms, None),
+    ]
+    for name, timings, recall in rows:
+        recall_text = f"{recall:.4f}" if recall is not None else "-"
+        print(f"{name:<40} {statistics.median(timings):>9.2f} {percentile(timings, 95):>9.2f} {recall_text:>8}")
+    print(f"\nsnapshot save {save_ms:.0f} ms, memory-mapped load + first query {load_ms:.0f} ms "
+          f"({corpus.nbytes / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--partitions", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run_benchmark(args.vectors, args.dims, args.queries, args.k, args.threshold, args.partitions, args.seed)
@@ -0,0 +1,37 @@
+"""
+Builds the catalog_facets collection behind /active/object-categories-FOS.
+
+Creates the indexes, then (re)counts categories and fields of study for every
+(org, language) partition with approved translations, or only the given partition.
+Only translations of objects whose image is approved are counted. Counts come from
+translations' taxonomy_ids, so run app.scripts.build_taxonomy first; until its backfill
+has completed, and for partitions that are not built, the endpoint keeps using the
+translations/objects scan.
+
+Usage:
+    python -m app.scripts.build_facets                       # all partitions
+    python -m app.scripts.build_facets <language> [org_id]   # one partition
+"""
+
+import sys
+import asyncio
+
+from app.services.facets import catalog_facets
+
+
+async def build(args):
+    await catalog_facets.ensure_indexes()
+    if args:
+        language, org_id = args[0].title(), (args[1] if len(args) > 1 else "")
+        count = await catalog_facets.rebuild_partition(org_id, language)
+        print(f"✓ Built ({org_id or 'public'}, {language}) with {count} facets")
+    else:
+        partitions = await catalog_facets.rebuild_all()
+        print(f"✓ Built {partitions} partition(s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(build(sys.argv[1:]))
@@ -0,0 +1,34 @@
+"""
+Builds the translation_samples collection used by RANDOM_SAMPLING_ENGINE=random_key.
+
+Creates the indexes, then (re)generates one entry per distinct object_name for every
+(org, language) partition with approved translations, or only the given partition.
+Partitions that are not built keep using the aggregation pipeline.
+
+Usage:
+    python -m app.scripts.build_sampling_index                       # all partitions
+    python -m app.scripts.build_sampling_index <language> [org_id]   # one partition
+"""
+
+import sys
+import asyncio
+
+from app.services.random_sampling import random_sampler
+
+
+async def build(args):
+    await random_sampler.ensure_indexes()
+    if args:
+        language, org_id = args[0], (args[1] if len(args) > 1 else "")
+        count = await random_sampler.rebuild_partition(org_id, language)
+        print(f"✓ Built ({org_id or 'public'}, {language}) with {count} entries")
+    else:
+        partitions = await random_sampler.rebuild_all()
+        print(f"✓ Built {partitions} partition(s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(build(sys.argv[1:]))
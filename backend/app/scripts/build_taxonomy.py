@@ -0,0 +1,40 @@
+"""
+Builds the taxonomy layer used for category / field-of-study filtering.
+
+1. Creates the taxonomy indexes on translations.
+2. Sets taxonomy_ids on every translation from its object's metadata and registers
+   each category / field of study in the taxonomy collection. Once this completes the
+   API filters by taxonomy_ids; until then it keeps matching categories by regex.
+3. Precomputes localized labels for every language in the languages collection
+   (one batched translation call per language, only for labels still missing).
+
+Safe to re-run; later changes are picked up by the running API.
+
+Usage:
+    python -m app.scripts.build_taxonomy [--missing-only] [--skip-labels]
+"""
+
+import sys
+import asyncio
+
+from app.services.language_registry import language_registry
+from app.services.taxonomy import taxonomy_index
+
+
+async def build(missing_only: bool, skip_labels: bool):
+    await taxonomy_index.ensure_indexes()
+    changed = await taxonomy_index.backfill(only_missing=missing_only)
+    print(f"✓ taxonomy_ids updated on {changed} translation(s)")
+    if not skip_labels:
+        registry = await language_registry.refresh()
+        written = await taxonomy_index.localize((lang.name, lang.iso_code) for lang in registry.languages)
+        print(f"✓ {written} localized label(s) written")
+    print(f"✓ Terms: {taxonomy_index.stats()['terms']}")
+
+
+if __name__ == "__main__":
+    unknown = [arg for arg in sys.argv[1:] if arg not in ("--missing-only", "--skip-labels")]
+    if unknown:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(build("--missing-only" in sys.argv, "--skip-labels" in sys.argv))
@@ -0,0 +1,89 @@
+"""
+Memory footprint and pick latency of the in-memory translation catalog.
+
+Builds a synthetic catalog (default 100k approved translations in one org/language,
+~2 translations per object name, 40 categories, 15 fields of study) and reports the
+memory it takes, per 100k translations, plus the latency of random picks.
+Pass --from-db to measure the catalog loaded from the configured database instead.
+
+Usage:
+    python -m app.scripts.catalog_footprint [--translations 100000] [--from-db]
+"""
+
+import argparse
+import asyncio
+import gc
+import statistics
+import time
+import tracemalloc
+
+from bson import ObjectId
+
+from app.services.catalog import TranslationCatalog
+
+
+def build_synthetic(catalog: TranslationCatalog, translations: int) -> None:
+    object_ids = [ObjectId() for _ in range(translations // 2)]
+    for index, object_id in enumerate(object_ids):
+        catalog.apply_object(str(object_id), {
+            "object_category": f"Category {index % 40}",
+            "field_of_study": f"Field {index % 15}",
+        })
+    for index in range(translations):
+        object_id = object_ids[index % len(object_ids)]
+        catalog.apply({
+            "_id": ObjectId(),
+            "object_id": object_id,
+            "object_name": f"object name {index % len(object_ids)}",
+            "org_id": None,
+            "requested_language": "English",
+            "translation_status": "Approved",
+            "quiz_qa_count": index % 6,
+        })
+    catalog._loaded = True
+
+
+def time_picks(catalog: TranslationCatalog, runs: int = 1000):
+    partition = catalog.partition(None, "English")
+    category = catalog.code("Category 7")
+    cases = {
+        "pick 6 (unfiltered)": lambda: partition.pick_names(6),
+        "pick 6 (category)": lambda: partition.pick_names(6, category=category),
+        "pick 24 (unfiltered)": lambda: partition.pick_names(24),
+    }
+    for name, pick in cases.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            pick()
+            timings.append((time.perf_counter() - started) * 1e6)
+        print(f"{name:<24} p50 {statistics.median(timings):7.1f} µs")
+
+
+async def run(translations: int, from_db: bool):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    catalog = TranslationCatalog()
+    if from_db:
+        await catalog.reload()
+    else:
+        build_synthetic(catalog, translations)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    count = catalog.stats()["translations"]
+    print(f"{count} translations in {catalog.stats()['partitions']} partition(s): {used / 1e6:.1f} MB")
+    if count:
+        print(f"≈ {used / count:.0f} bytes per translation, {used / count * 100000 / 1e6:.1f} MB per 100k translations")
+    if not from_db:
+        time_picks(catalog)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--translations", type=int, default=100000)
+    parser.add_argument("--from-db", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.translations, args.from_db))
@@ -0,0 +1,53 @@
+"""
+Applies the index registry (app/indexes.py) and reports which indexes back which queries.
+
+Creating an index that already exists is a no-op, so this is safe to run repeatedly;
+indexes conflicting with an existing definition are reported, not replaced. The app also
+applies the registry at startup unless INDEX_PROVISIONING_ON_STARTUP=false.
+
+Usage:
+    python -m app.scripts.ensure_indexes [collection ...]   # create indexes (all collections by default)
+    python -m app.scripts.ensure_indexes --report           # route/query -> index map, no database needed
+    python -m app.scripts.ensure_indexes --explain          # create, then verify the probes with explain()
+"""
+
+import sys
+import asyncio
+
+from app.indexes import apply_indexes, explain_probes, index_report
+
+
+def print_report():
+    for route, indexes in sorted(index_report().items()):
+        print(f"{route}")
+        for index in indexes:
+            print(f"    {index}")
+
+
+async def run(collections, explain: bool) -> int:
+    results = await apply_indexes(*collections)
+    for result in results:
+        marker = "✓" if result["status"] == "ok" else "⚠"
+        print(f"{marker} {result['collection']}.{result['index']} ({result['status']})")
+    failures = sum(1 for result in results if result["status"] != "ok")
+
+    if explain:
+        print("\nQuery plans:")
+        for probe in await explain_probes():
+            marker = "✓" if probe["status"] == "ok" else "✗"
+            print(f"{marker} {probe['route']}: {probe['collection']} uses {', '.join(probe['used']) or '-'}"
+                  f" (expected {probe['expected']})")
+            failures += probe["status"] != "ok"
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--help" in args or "-h" in args:
+        print(__doc__)
+        sys.exit(0)
+    if "--report" in args:
+        print_report()
+        sys.exit(0)
+    explain = "--explain" in args
+    sys.exit(asyncio.run(run([arg for arg in args if not arg.startswith("--")], explain)))
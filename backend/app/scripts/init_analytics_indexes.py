@@ -2,6 +2,7 @@
 Database initialization script for contest analytics indexes.
 
 Run this script once to create the necessary indexes for optimal query performance.
+app.scripts.ensure_indexes applies the indexes of every collection.
 
 Usage:
     python -m app.scripts.init_analytics_indexes
@@ -9,49 +10,17 @@ Usage:
 
 import asyncio
 from app.database import contest_analytics_collection
+from app.indexes import apply_indexes
 
 
 async def create_analytics_indexes():
-    """Create indexes for contest_analytics collection"""
+    """Create indexes for contest_analytics collection (defined in app/indexes.py)"""
     
     print("Creating indexes for contest_analytics collection...")
     
     try:
-        # Index 1: Compound index for user queries (user_id + contest_id)
-        await contest_analytics_collection.create_index(
-            [("user_id", 1), ("contest_id", 1)],
-            name="user_contest_idx"
-        )
-        print("✓ Created index: user_contest_idx")
-        
-        # Index 2: Contest-wide queries with timestamp sorting
-        await contest_analytics_collection.create_index(
-            [("contest_id", 1), ("started_at", -1)],
-            name="contest_timestamp_idx"
-        )
-        print("✓ Created index: contest_timestamp_idx")
-        
-        # Index 3: Unique index for attempt_id lookup
-        await contest_analytics_collection.create_index(
-            [("attempt_id", 1)],
-            unique=True,
-            name="attempt_id_unique_idx"
-        )
-        print("✓ Created index: attempt_id_unique_idx")
-        
-        # Index 4: Index for round_status filtering
-        await contest_analytics_collection.create_index(
-            [("round_status", 1)],
-            name="round_status_idx"
-        )
-        print("✓ Created index: round_status_idx")
-        
-        # Index 5: Index for language-based analytics
-        await contest_analytics_collection.create_index(
-            [("contest_id", 1), ("language_name", 1)],
-            name="contest_language_idx"
-        )
-        print("✓ Created index: contest_language_idx")
+        for result in await apply_indexes("contest_analytics"):
+            print(f"✓ Created index: {result['index']} ({result['status']})")
         
         print("\n✅ All indexes created successfully!")
         
@@ -0,0 +1,64 @@
+"""
+Login load test: fires concurrent POST /auth/login requests at a running backend
+(e.g. one started against app.scripts.stub_auth_service) and reports throughput
+and latency percentiles.
+
+Usage:
+    python -m app.scripts.load_test_login [--url http://localhost:8081] [--requests 1000] [--concurrency 200]
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+from collections import Counter
+
+import httpx
+
+
+async def run_load_test(base_url: str, total: int, concurrency: int, org_code: str = None):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = Counter()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+
+        async def one_login(i: int):
+            form = {"username": f"loadtest_user_{i}", "password": "secret"}
+            if org_code:
+                form["org_code"] = org_code
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/auth/login", data=form)
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_login(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    print(f"Requests:     {total} at concurrency {concurrency}")
+    print(f"Elapsed:      {elapsed:.2f}s")
+    print(f"Throughput:   {total / elapsed:.1f} logins/s")
+    print(f"Latency (ms): p50={percentile(0.50):.1f} p95={percentile(0.95):.1f} p99={percentile(0.99):.1f} "
+          f"max={latencies[-1]:.1f} mean={statistics.mean(latencies):.1f}")
+    print(f"Responses:    {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the /auth/login flow")
+    parser.add_argument("--url", default="http://localhost:8081", help="Backend base URL")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--org-code", default=None, help="Optional org_code sent with each login")
+    args = parser.parse_args()
+    asyncio.run(run_load_test(args.url, args.requests, args.concurrency, args.org_code))
@@ -0,0 +1,31 @@
+"""
+Seeds the translation memo from an offline dictionary file.
+
+Seeded entries are stored as permanent "dictionary" entries and take effect for
+translate_text immediately (they also override earlier machine translations).
+
+File formats:
+    JSON: {"hi": {"Animals": "जानवर", "Fruits": "फल"}, "fr": {...}}
+    CSV:  text,lang_code,translation
+
+Usage:
+    python -m app.scripts.seed_translation_memo path/to/dictionary.json
+"""
+
+import sys
+import asyncio
+
+from app.services.translation_memo import translation_memo
+
+
+async def seed(path: str):
+    await translation_memo.ensure_indexes()
+    count = await translation_memo.seed_from_file(path)
+    print(f"✓ Seeded {count} translation(s) from {path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(seed(sys.argv[1]))
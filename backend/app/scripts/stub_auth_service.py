@@ -0,0 +1,96 @@
+"""
+Local stand-in for the external auth service, for load-testing the login flows.
+
+Implements POST /auth/login (form) and POST /auth/create-user (JSON) with the response
+shape the backend expects. Any password is accepted except "wrong", which returns 401.
+Latency and failures can be injected to exercise timeouts and the auth circuit breaker.
+
+Environment:
+    STUB_AUTH_LATENCY_MS    added delay per request (default 50)
+    STUB_AUTH_FAILURE_RATE  fraction of requests answered with 503 (default 0)
+
+Usage:
+    python -m app.scripts.stub_auth_service [--port 8000]
+
+Then point the backend at it (the defaults already do):
+    EXTERNAL_LOGIN_URL=http://localhost:8000/auth/login
+    EXTERNAL_CREATE_USER_URL=http://localhost:8000/auth/create-user
+"""
+
+import os
+import uuid
+import random
+import asyncio
+import argparse
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Form, Body
+from fastapi.responses import JSONResponse
+
+STUB_AUTH_LATENCY_MS = float(os.getenv("STUB_AUTH_LATENCY_MS", 50))
+STUB_AUTH_FAILURE_RATE = float(os.getenv("STUB_AUTH_FAILURE_RATE", 0))
+
+app = FastAPI(title="Stub external auth service")
+
+_users = {}
+
+
+async def _simulate_upstream() -> Optional[JSONResponse]:
+    await asyncio.sleep(STUB_AUTH_LATENCY_MS / 1000)
+    if STUB_AUTH_FAILURE_RATE and random.random() < STUB_AUTH_FAILURE_RATE:
+        return JSONResponse(status_code=503, content={"detail": "Injected failure"})
+    return None
+
+
+@app.post("/auth/login")
+async def login(
+    username: str = Form(...),
+    password: str = Form(...),
+    org_code: Optional[str] = Form(None),
+    param2: Optional[str] = Form(None),
+    param3: Optional[str] = Form(None),
+):
+    failure = await _simulate_upstream()
+    if failure:
+        return failure
+    if password == "wrong":
+        return JSONResponse(status_code=401, content={"detail": "Invalid credentials"})
+
+    user = _users.get(username, {})
+    return {
+        "access_token": f"stub-{uuid.uuid4().hex}",
+        "token_type": "bearer",
+        "user_id": user.get("user_id") or f"stub-{username}",
+        "username": username,
+        "org_id": user.get("organisation_id"),
+        "roles": user.get("roles", ["global_user"]),
+        "languages_allowed": user.get("languages_allowed", ["English"]),
+        "permissions": [],
+        "email_id": user.get("email_id"),
+        "phone": user.get("phone"),
+        "country": user.get("country"),
+    }
+
+
+@app.post("/auth/create-user")
+async def create_user(payload: dict = Body(...)):
+    failure = await _simulate_upstream()
+    if failure:
+        return failure
+    username = payload.get("username")
+    if not username:
+        return JSONResponse(status_code=422, content={"detail": "username is required"})
+    if username in _users:
+        return JSONResponse(status_code=400, content={"detail": "User already exists"})
+    user_id = f"stub-{uuid.uuid4().hex[:12]}"
+    _users[username] = {**payload, "user_id": user_id}
+    return {"message": "User created", "user_id": user_id}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the stub external auth service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,130 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from app.database import translation_collection
+from app.services.translation_memo import normalize_text
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_POOL_TTL_SECONDS = float(os.getenv("CANDIDATE_POOL_TTL_SECONDS", 300))
+CANDIDATE_POOL_MAX_ENTRIES = int(os.getenv("CANDIDATE_POOL_MAX_ENTRIES", 500))
+
+# (translation id, score), best first
+CandidatePool = List[Tuple[str, float]]
+PoolKey = Tuple[str, str, str, float]
+
+# Changes that can add a document to a pool. Removals need no invalidation: sampled ids are
+# hydrated with the search filter re-applied, so documents that no longer qualify drop out.
+_QUALIFYING_CHANGES = [
+    {"$match": {"$or": [
+        {"operationType": {"$in": ["insert", "replace"]}},
+        {"updateDescription.updatedFields.translation_status": {"$exists": True}},
+        {"updateDescription.updatedFields.embedding_vector": {"$exists": True}},
+        {"updateDescription.updatedFields.org_id": {"$exists": True}},
+        {"updateDescription.updatedFields.requested_language": {"$exists": True}},
+    ]}},
+    {"$project": {"fullDocument.org_id": 1, "fullDocument.requested_language": 1}},
+]
+
+
+def pool_key(search_text: str, language: Optional[str], org_id: Optional[str], threshold: float) -> PoolKey:
+    return (normalize_text(search_text or ""), language or "", str(org_id) if org_id else "", threshold)
+
+
+class CandidatePoolCache:
+    """
+    Caches the qualifying (translation id, score) pool of a vector search, keyed by
+    (search text, language, org, threshold), so repeated searches sample in-process
+    instead of paying for translation, embedding and the ANN query again.
+
+    Entries live for CANDIDATE_POOL_TTL_SECONDS. Where change streams are available, a
+    translation becoming approved (or gaining a vector) drops the pools of its org and
+    language right away; a load that started before such an invalidation is not stored.
+    """
+
+    def __init__(self, ttl: float = CANDIDATE_POOL_TTL_SECONDS, max_entries: int = CANDIDATE_POOL_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[PoolKey, Tuple[CandidatePool, float]]" = OrderedDict()
+        self._generation = 0
+        self._watch_task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key: PoolKey, load: Callable[[], Awaitable[Optional[CandidatePool]]]) -> CandidatePool:
+        """Cached pool for key, or the result of load(). A None result (search failed) is not cached."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[1] > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        generation = self._generation
+        pool = await load()
+        if pool is None:
+            return []
+        if generation == self._generation:
+            self._entries[key] = (pool, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return pool
+
+    def invalidate(self, org_id: Optional[str] = None, language: Optional[str] = None) -> None:
+        """
+        Drops the pools that may contain documents of (org_id, language): those of the
+        same org for that language or for all languages. With no org_id, drops everything.
+        """
+        self._generation += 1
+        self.invalidations += 1
+        if org_id is None:
+            self._entries.clear()
+            return
+        org = str(org_id)
+        for key in [k for k in self._entries if k[2] == org and k[1] in ("", language or "")]:
+            del self._entries[key]
+
+    async def start(self) -> None:
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_changes())
+
+    async def stop(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+
+    async def _watch_changes(self) -> None:
+        try:
+            async with translation_collection.watch(_QUALIFYING_CHANGES, full_document="updateLookup") as stream:
+                async for change in stream:
+                    doc = change.get("fullDocument")
+                    if doc is None:
+                        continue
+                    self.invalidate(doc.get("org_id") or "", doc.get("requested_language"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Candidate pool change notifications unavailable, relying on TTL expiry: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl,
+        }
+
+
+candidate_pools = CandidatePoolCache()
@@ -0,0 +1,348 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.database import translation_collection, objects_collection
+
+logger = logging.getLogger(__name__)
+
+# Read-heavy deployments can serve random picks from memory instead of $group/$sample pipelines
+TRANSLATION_CATALOG_ENABLED = os.getenv("TRANSLATION_CATALOG_ENABLED", "false").lower() == "true"
+# Without change streams, the catalog is reloaded this often instead
+TRANSLATION_CATALOG_REFRESH_SECONDS = float(os.getenv("TRANSLATION_CATALOG_REFRESH_SECONDS", 600))
+
+_TRANSLATION_PROJECTION = {
+    "_id": 1,
+    "object_id": 1,
+    "object_name": 1,
+    "org_id": 1,
+    "requested_language": 1,
+    "translation_status": 1,
+    "quiz_qa_count": {"$size": {"$ifNull": ["$quiz_qa", []]}},
+}
+_OBJECT_PROJECTION = {"_id": 1, "metadata.object_category": 1, "metadata.field_of_study": 1}
+_NO_CODE = 0
+
+
+def _org_key(org_id) -> str:
+    """Public content (org_id missing, None or "") shares the "" org."""
+    return str(org_id) if org_id else ""
+
+
+class CatalogEntry:
+    """One approved translation. Category / field of study are small integer codes."""
+
+    __slots__ = ("translation_id", "object_id", "object_name", "category", "field_of_study", "quiz_qa_count")
+
+    def __init__(self, translation_id, object_id: str, object_name: str, category: int, field_of_study: int, quiz_qa_count: int):
+        self.translation_id = translation_id
+        self.object_id = object_id
+        self.object_name = object_name
+        self.category = category
+        self.field_of_study = field_of_study
+        self.quiz_qa_count = quiz_qa_count
+
+
+class _KeyPool:
+    """Set of keys with O(1) add / discard / uniform random sampling (list + position map)."""
+
+    __slots__ = ("_keys", "_positions")
+
+    def __init__(self):
+        self._keys: List = []
+        self._positions: Dict = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key) -> None:
+        if key not in self._positions:
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+
+    def discard(self, key) -> None:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return
+        last = self._keys.pop()
+        if position < len(self._keys):
+            self._keys[position] = last
+            self._positions[last] = position
+
+    def sample(self, count: int) -> List:
+        return random.sample(self._keys, min(count, len(self._keys)))
+
+
+class CatalogPartition:
+    """
+    Approved translations of one (org, language), grouped by object_name (the dedupe key
+    of the random pickers), with name pools per category / field-of-study code.
+    """
+
+    def __init__(self):
+        self.entries: Dict = {}
+        self.groups: Dict[str, List[CatalogEntry]] = {}
+        self.by_object: Dict[str, List[CatalogEntry]] = {}
+        self.names = _KeyPool()
+        self.by_category: Dict[int, _KeyPool] = {}
+        self.by_field_of_study: Dict[int, _KeyPool] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entry: CatalogEntry) -> None:
+        self.remove(entry.translation_id)
+        self.entries[entry.translation_id] = entry
+        self.groups.setdefault(entry.object_name, []).append(entry)
+        self.by_object.setdefault(entry.object_id, []).append(entry)
+        self.names.add(entry.object_name)
+        if entry.category != _NO_CODE:
+            self.by_category.setdefault(entry.category, _KeyPool()).add(entry.object_name)
+        if entry.field_of_study != _NO_CODE:
+            self.by_field_of_study.setdefault(entry.field_of_study, _KeyPool()).add(entry.object_name)
+
+    def remove(self, translation_id) -> Optional[CatalogEntry]:
+        entry = self.entries.pop(translation_id, None)
+        if entry is None:
+            return None
+        group = self.groups[entry.object_name]
+        group.remove(entry)
+        siblings = self.by_object[entry.object_id]
+        siblings.remove(entry)
+        if not siblings:
+            del self.by_object[entry.object_id]
+        if not group:
+            del self.groups[entry.object_name]
+            self.names.discard(entry.object_name)
+        for attr, pools in (("category", self.by_category), ("field_of_study", self.by_field_of_study)):
+            code = getattr(entry, attr)
+            if code != _NO_CODE and not any(getattr(other, attr) == code for other in group):
+                pools[code].discard(entry.object_name)
+                if not pools[code]:
+                    del pools[code]
+        return entry
+
+    def pick_names(self, count: int, category: Optional[int] = None, field_of_study: Optional[int] = None) -> List[CatalogEntry]:
+        """Up to `count` random distinct object names, optionally restricted to one code."""
+        if field_of_study is not None:
+            pool, attr, code = self.by_field_of_study.get(field_of_study), "field_of_study", field_of_study
+        elif category is not None:
+            pool, attr, code = self.by_category.get(category), "category", category
+        else:
+            pool, attr, code = self.names, None, None
+        if not pool:
+            return []
+        picked = []
+        for name in pool.sample(count):
+            group = self.groups[name]
+            # Representative of the group: its first translation carrying the requested code
+            picked.append(next((e for e in group if getattr(e, attr) == code), group[0]) if attr else group[0])
+        return picked
+
+    def pick_objects(self, count: int, object_ids: Iterable[str], dedupe_by_name: bool = False) -> List[CatalogEntry]:
+        """Up to `count` random translations of the given objects, one per object (or per name)."""
+        candidates, seen = [], set()
+        for object_id in object_ids:
+            for entry in self.by_object.get(str(object_id), ()):
+                key = entry.object_name if dedupe_by_name else entry.object_id
+                if key not in seen:
+                    seen.add(key)
+                    candidates.append(entry)
+        return random.sample(candidates, min(count, len(candidates)))
+
+
+class TranslationCatalog:
+    """
+    In-process catalog of approved translations per (org_id, requested_language), holding
+    only ids, object_name, category / field-of-study codes and the quiz_qa count.
+
+    Loaded at startup and kept current from the translations and objects change streams
+    (or reloaded every TRANSLATION_CATALOG_REFRESH_SECONDS without them). Callers pick
+    translation ids here and fetch only the chosen documents.
+    """
+
+    def __init__(self):
+        self._partitions: Dict[Tuple[str, str], CatalogPartition] = {}
+        self._partition_keys: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._located: Dict = {}
+        self._object_codes: Dict[str, Tuple[int, int]] = {}
+        self._codes: Dict[str, int] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+
+        self.picks = 0
+        self.fallbacks = 0
+        self.updates = 0
+        self.loaded_at: Optional[float] = None
+
+    # --- Codes ---
+    def code(self, value: Optional[str], create: bool = False) -> Optional[int]:
+        """Integer code of a category / field of study (case-insensitive); None if unknown."""
+        key = value.strip().casefold() if value else ""
+        if not key:
+            return _NO_CODE if create else None
+        code = self._codes.get(key)
+        if code is None and create:
+            code = self._codes[key] = len(self._codes) + 1
+        return code
+
+    def _codes_for(self, metadata: Optional[dict]) -> Tuple[int, int]:
+        metadata = metadata or {}
+        return (self.code(metadata.get("object_category"), create=True),
+                self.code(metadata.get("field_of_study"), create=True))
+
+    # --- Picking ---
+    def partition(self, org_id: Optional[str], language: Optional[str]) -> Optional[CatalogPartition]:
+        """The partition to pick from, or None when the caller should use the database path."""
+        if not self._loaded or not language:
+            self.fallbacks += 1
+            return None
+        self.picks += 1
+        return self._partitions.get((_org_key(org_id), language)) or CatalogPartition()
+
+    # --- Updates ---
+    def apply(self, doc: dict) -> None:
+        """Adds, moves or drops one translation according to its current state."""
+        translation_id = doc["_id"]
+        self.discard(translation_id)
+        if doc.get("translation_status") != "Approved" or not doc.get("object_name") or not doc.get("requested_language"):
+            return
+        object_id = sys.intern(str(doc.get("object_id") or ""))
+        category, field_of_study = self._object_codes.get(object_id, (_NO_CODE, _NO_CODE))
+        quiz_qa_count = doc["quiz_qa_count"] if "quiz_qa_count" in doc else len(doc.get("quiz_qa") or [])
+        # One shared key tuple per partition, so _located doesn't hold a copy per translation
+        key = self._partition_keys.setdefault((_org_key(doc.get("org_id")), doc["requested_language"]), None)
+        if key is None:
+            key = (_org_key(doc.get("org_id")), doc["requested_language"])
+            self._partition_keys[key] = key
+            self._partitions[key] = CatalogPartition()
+        self._partitions[key].add(CatalogEntry(
+            translation_id, object_id, sys.intern(doc["object_name"]), category, field_of_study, quiz_qa_count
+        ))
+        self._located[translation_id] = key
+        self.updates += 1
+
+    def discard(self, translation_id) -> None:
+        key = self._located.pop(translation_id, None)
+        if key is not None:
+            self._partitions[key].remove(translation_id)
+            self.updates += 1
+
+    def apply_object(self, object_id: str, metadata: Optional[dict]) -> None:
+        """Re-codes the translations of one object after its metadata changed (rare; scans partitions)."""
+        object_id = sys.intern(str(object_id))
+        codes = self._codes_for(metadata) if metadata is not None else (_NO_CODE, _NO_CODE)
+        if metadata is None:
+            self._object_codes.pop(object_id, None)
+        elif self._object_codes.get(object_id) == codes:
+            return
+        else:
+            self._object_codes[object_id] = codes
+        for partition in self._partitions.values():
+            for entry in list(partition.by_object.get(object_id, ())):
+                partition.add(CatalogEntry(
+                    entry.translation_id, entry.object_id, entry.object_name, codes[0], codes[1], entry.quiz_qa_count
+                ))
+
+    # --- Loading ---
+    async def ensure_loaded(self) -> None:
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    await self.reload()
+
+    async def reload(self) -> None:
+        started = time.monotonic()
+        fresh = TranslationCatalog()
+        fresh._codes = self._codes
+        async for obj in objects_collection.find({}, _OBJECT_PROJECTION, batch_size=5000):
+            fresh._object_codes[sys.intern(str(obj["_id"]))] = fresh._codes_for(obj.get("metadata"))
+        async for doc in translation_collection.aggregate([
+            {"$match": {"translation_status": "Approved"}},
+            {"$project": _TRANSLATION_PROJECTION},
+        ], batchSize=5000):
+            fresh.apply(doc)
+        self._partitions, self._located, self._object_codes = fresh._partitions, fresh._located, fresh._object_codes
+        self._partition_keys = fresh._partition_keys
+        self._loaded = True
+        self.loaded_at = time.time()
+        logger.info(
+            f"Translation catalog loaded {len(self._located)} translations in {len(self._partitions)} partitions "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._maintain())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _maintain(self) -> None:
+        while True:
+            try:
+                # Streams are opened before loading so changes made during the load are not lost
+                async with translation_collection.watch(
+                    [{"$project": {
+                        "operationType": 1, "documentKey": 1,
+                        "fullDocument.object_id": 1, "fullDocument.object_name": 1, "fullDocument.org_id": 1,
+                        "fullDocument.requested_language": 1, "fullDocument.translation_status": 1,
+                        "fullDocument.quiz_qa": 1,
+                    }}],
+                    full_document="updateLookup"
+                ) as translations, objects_collection.watch(
+                    [{"$project": {"operationType": 1, "documentKey": 1, "fullDocument.metadata": 1}}],
+                    full_document="updateLookup"
+                ) as objects:
+                    async with self._lock:
+                        await self.reload()
+                    await asyncio.gather(self._follow(translations, self._on_translation), self._follow(objects, self._on_object))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.info(f"Translation catalog change notifications unavailable, using periodic reload: {e}")
+                try:
+                    await self.reload()
+                except Exception as load_error:
+                    logger.warning(f"Translation catalog reload failed: {load_error}")
+                await asyncio.sleep(TRANSLATION_CATALOG_REFRESH_SECONDS)
+
+    @staticmethod
+    async def _follow(stream, handler) -> None:
+        async for change in stream:
+            handler(change)
+
+    def _on_translation(self, change: dict) -> None:
+        doc = change.get("fullDocument")
+        if change["operationType"] == "delete" or doc is None:
+            self.discard(change["documentKey"]["_id"])
+        else:
+            self.apply({**doc, "_id": change["documentKey"]["_id"]})
+
+    def _on_object(self, change: dict) -> None:
+        doc = change.get("fullDocument")
+        metadata = None if change["operationType"] == "delete" or doc is None else doc.get("metadata", {})
+        self.apply_object(change["documentKey"]["_id"], metadata)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": TRANSLATION_CATALOG_ENABLED,
+            "loaded": self._loaded,
+            "translations": len(self._located),
+            "partitions": len(self._partitions),
+            "codes": len(self._codes),
+            "picks": self.picks,
+            "fallbacks": self.fallbacks,
+            "updates": self.updates,
+        }
+
+
+translation_catalog = TranslationCatalog()
@@ -0,0 +1,318 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, ReplaceOne
+
+from app.database import (
+    contests_collection,
+    participants_collection,
+    contest_leaderboard_collection,
+    contest_leaderboard_stats_collection,
+)
+
+logger = logging.getLogger(__name__)
+
+# ScoringConfig.tie_breaker_rules spellings -> tie-breaker; unknown rules are ignored
+_TIE_BREAKERS = {
+    "time": "time", "least_time": "time", "fastest": "time", "total_time": "time", "time_taken": "time",
+    "completion": "completion", "earliest_completion": "completion", "completed_at": "completion",
+    "rounds": "rounds", "most_rounds": "rounds", "rounds_completed": "rounds",
+}
+MAX_TIE_BREAKERS = 3
+_TIE_BREAK_FIELDS = [f"tie_break_{i}" for i in range(1, MAX_TIE_BREAKERS + 1)]
+# Ranking order; the contest_rank_idx index (app/indexes.py) has the same keys
+LEADERBOARD_SORT = [("total_score", DESCENDING), *((name, ASCENDING) for name in _TIE_BREAK_FIELDS), ("username", ASCENDING)]
+# Sorts after any real completion time
+_NOT_COMPLETED = float(2 ** 53)
+
+_ENTRY_PROJECTION = {"_id": 0, "username": 1, "total_score": 1, "language_scores": 1, "language_times": 1}
+
+
+def tie_breakers(rules: Optional[Iterable[str]]) -> List[str]:
+    """Normalized, de-duplicated tie-breakers from a contest's tie_breaker_rules."""
+    result = []
+    for rule in rules or []:
+        key = _TIE_BREAKERS.get(str(rule).strip().lower().replace("-", "_").replace(" ", "_"))
+        if key is None:
+            logger.warning(f"Ignoring unknown leaderboard tie-breaker rule: {rule}")
+        elif key not in result:
+            result.append(key)
+    return result[:MAX_TIE_BREAKERS]
+
+
+def _entry_id(contest_id: str, username: str) -> str:
+    return f"{contest_id}|{username}"
+
+
+def _tie_break_values(entry: dict, breakers: List[str]) -> Dict[str, float]:
+    """Tie-break fields for an entry, each "lower ranks higher"."""
+    values = []
+    for breaker in breakers:
+        if breaker == "time":
+            values.append(float(entry.get("total_time", 0)))
+        elif breaker == "completion":
+            completed_at = entry.get("completed_at")
+            if entry.get("completed") and completed_at:
+                if completed_at.tzinfo is None:
+                    completed_at = completed_at.replace(tzinfo=timezone.utc)
+                values.append(completed_at.timestamp())
+            else:
+                values.append(_NOT_COMPLETED)
+        elif breaker == "rounds":
+            values.append(-float(entry.get("rounds_completed", 0)))
+    values += [0.0] * (MAX_TIE_BREAKERS - len(values))
+    return dict(zip(_TIE_BREAK_FIELDS, values))
+
+
+def _average_contribution(entry: Optional[dict]) -> Tuple[int, float]:
+    # The average time covers completed participations that have at least one round
+    if entry and entry.get("completed") and entry.get("rounds_completed", 0) > 0:
+        return 1, float(entry.get("total_time", 0))
+    return 0, 0.0
+
+
+def _entry_from_participation(contest_id: str, username: str, participation: dict) -> dict:
+    language_scores, language_times, total_time = {}, {}, 0.0
+    round_scores = participation.get("round_scores") or []
+    for rs in round_scores:
+        total_time += rs.get("time_taken", 0)
+        lang = rs.get("language")
+        if lang:
+            language_scores[lang] = language_scores.get(lang, 0) + rs.get("score", 0)
+            language_times[lang] = language_times.get(lang, 0) + rs.get("time_taken", 0)
+    return {
+        "contest_id": contest_id,
+        "username": username,
+        "total_score": participation.get("total_score", 0),
+        "total_time": total_time,
+        "rounds_completed": len(round_scores),
+        "language_scores": language_scores,
+        "language_times": language_times,
+        "completed": bool(participation.get("contest_completed")),
+        "completed_at": participation.get("contest_completed_at"),
+    }
+
+
+class ContestLeaderboard:
+    """
+    Materialized contest leaderboards.
+
+    contest_leaderboard holds one document per (contest, participant) with the total
+    score, per-language score and time splits and the tie-break values derived from the
+    contest's ScoringConfig.tie_breaker_rules, indexed in ranking order, so the top N is
+    an index walk of N entries. contest_leaderboard_stats keeps, per contest, the running
+    count and time sum behind the average time, plus the rules the entries were ranked with.
+
+    The score endpoints update both on every write. A contest without stats (never built,
+    rules changed, or an update failed) is rebuilt from participants on its next read.
+    A rebuild stamps the stats with a generation that every score write clears, and only
+    commits its stats if the generation survived; otherwise a write may have been
+    overwritten by the rebuilt entries, and the next read rebuilds again.
+    """
+
+    def __init__(self):
+        self._rebuilds: Dict[str, asyncio.Task] = {}
+        self.reads = 0
+        self.updates = 0
+        self.rebuilds = 0
+        self.rebuilds_discarded = 0
+        self.update_failures = 0
+
+    # --- Reading ---
+    async def top(self, contest_id: str, rules: Optional[Iterable[str]], limit: int) -> Tuple[List[dict], float]:
+        """Top `limit` entries in rank order, and the average time of completed participations."""
+        breakers = tie_breakers(rules)
+        stats = await contest_leaderboard_stats_collection.find_one({"_id": contest_id})
+        if stats is None or stats.get("tie_breakers") != breakers:
+            stats = await self.rebuild(contest_id, breakers)
+        self.reads += 1
+        entries = await contest_leaderboard_collection.find(
+            {"contest_id": contest_id}, _ENTRY_PROJECTION
+        ).sort(LEADERBOARD_SORT).limit(limit).to_list(length=limit)
+        completed = stats.get("completed_count", 0)
+        average = stats.get("completed_time_sum", 0) / completed if completed else 0
+        return entries, average
+
+    # --- Writing ---
+    async def add_participant(self, contest_id: str, username: str, rules: Optional[Iterable[str]] = None) -> None:
+        """A registered participant is listed with a zero score until their first round."""
+        empty = _entry_from_participation(contest_id, username, {})
+
+        async def write():
+            before = await contest_leaderboard_collection.find_one_and_update(
+                {"_id": _entry_id(contest_id, username)},
+                {"$setOnInsert": {**empty, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            return before, before or empty
+
+        await self._update(contest_id, username, rules, write)
+
+    async def record_round(
+        self, contest_id: str, username: str, language: str, score: int, time_taken: float,
+        completed: bool, rules: Optional[Iterable[str]]
+    ) -> None:
+        """Adds one logged round (POST /contest/log-progress) to the participant's entry."""
+        now = datetime.now(timezone.utc)
+        increments = {"total_score": score, "total_time": time_taken, "rounds_completed": 1}
+        if language:
+            increments[f"language_scores.{language}"] = score
+            increments[f"language_times.{language}"] = time_taken
+        # Mirrors log-progress, which writes contest_completed on every round, False included
+        updates = {"updated_at": now, "completed": completed, "completed_at": now if completed else None}
+
+        async def write():
+            before = await contest_leaderboard_collection.find_one_and_update(
+                {"_id": _entry_id(contest_id, username)},
+                {"$inc": increments, "$set": updates, "$setOnInsert": {"contest_id": contest_id, "username": username}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            after = dict(before or {})
+            for field in ("total_score", "total_time", "rounds_completed"):
+                after[field] = after.get(field, 0) + increments[field]
+            after.update(updates)
+            return before, after
+
+        await self._update(contest_id, username, rules, write)
+
+    async def replace_scores(
+        self, contest_id: str, username: str, participation_scores: dict, is_final: bool,
+        rules: Optional[Iterable[str]] = None
+    ) -> None:
+        """Replaces the participant's entry with submitted scores (POST /contest/submit-scores)."""
+        now = datetime.now(timezone.utc)
+        fresh = _entry_from_participation(contest_id, username, participation_scores)
+        fresh["updated_at"] = now
+        if is_final:
+            fresh.update({"completed": True, "completed_at": now})
+        else:
+            # Non-final submissions leave the completion state as it was
+            del fresh["completed"], fresh["completed_at"]
+
+        async def write():
+            before = await contest_leaderboard_collection.find_one_and_update(
+                {"_id": _entry_id(contest_id, username)},
+                {"$set": fresh},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            return before, {**(before or {}), **fresh}
+
+        await self._update(contest_id, username, rules, write)
+
+    async def _update(self, contest_id: str, username: str, rules, write) -> None:
+        try:
+            if rules is None:
+                rules = await self._contest_rules(contest_id)
+            before, after = await write()
+            await contest_leaderboard_collection.update_one(
+                {"_id": _entry_id(contest_id, username)},
+                {"$set": _tie_break_values(after, tie_breakers(rules))}
+            )
+            (count_before, time_before), (count_after, time_after) = _average_contribution(before), _average_contribution(after)
+            # Clearing the generation tells a concurrent rebuild its entries may be stale
+            stats_update = {"$unset": {"rebuild": ""}}
+            if (count_before, time_before) != (count_after, time_after):
+                stats_update["$inc"] = {"completed_count": count_after - count_before, "completed_time_sum": time_after - time_before}
+            await contest_leaderboard_stats_collection.update_one({"_id": contest_id}, stats_update)
+            self.updates += 1
+        except Exception as e:
+            # The participant record is the source of truth: drop the stats so the next read rebuilds
+            self.update_failures += 1
+            logger.warning(f"Leaderboard update failed for {contest_id}/{username}, scheduling rebuild: {e}")
+            try:
+                await contest_leaderboard_stats_collection.delete_one({"_id": contest_id})
+            except Exception as e:
+                logger.error(f"Could not invalidate leaderboard stats for {contest_id}: {e}")
+
+    async def _contest_rules(self, contest_id: str) -> List[str]:
+        contest = await contests_collection.find_one(
+            {"_id": ObjectId(contest_id)}, {"scoring_config.tie_breaker_rules": 1}
+        )
+        return ((contest or {}).get("scoring_config") or {}).get("tie_breaker_rules") or []
+
+    # --- Building ---
+    async def rebuild(self, contest_id: str, breakers: Optional[List[str]] = None) -> dict:
+        """Recomputes a contest's entries and stats from participants; concurrent calls share one rebuild."""
+        task = self._rebuilds.get(contest_id)
+        if task is None:
+            if breakers is None:
+                breakers = tie_breakers(await self._contest_rules(contest_id))
+            task = asyncio.ensure_future(self._rebuild(contest_id, breakers))
+            self._rebuilds[contest_id] = task
+            task.add_done_callback(lambda _: self._rebuilds.pop(contest_id, None))
+        return await asyncio.shield(task)
+
+    async def _rebuild(self, contest_id: str, breakers: List[str]) -> dict:
+        # Taken before reading participants; also invalidates the stats until the rebuild commits
+        generation = ObjectId()
+        await contest_leaderboard_stats_collection.update_one(
+            {"_id": contest_id},
+            {"$set": {"rebuild": generation}, "$unset": {"tie_breakers": ""}},
+            upsert=True
+        )
+        participations = await participants_collection.aggregate([
+            {"$match": {"participations.contest_id": contest_id}},
+            {"$unwind": "$participations"},
+            {"$match": {"participations.contest_id": contest_id}},
+            {"$project": {
+                "username": 1,
+                "participations.total_score": 1,
+                "participations.round_scores": 1,
+                "participations.contest_completed": 1,
+                "participations.contest_completed_at": 1,
+            }},
+        ]).to_list(length=None)
+
+        now = datetime.now(timezone.utc)
+        operations, usernames = [], []
+        completed_count, completed_time_sum = 0, 0.0
+        for doc in participations:
+            username = doc.get("username")
+            if not username:
+                continue
+            entry = _entry_from_participation(contest_id, username, doc["participations"])
+            entry.update(_tie_break_values(entry, breakers))
+            entry["updated_at"] = now
+            count, total_time = _average_contribution(entry)
+            completed_count += count
+            completed_time_sum += total_time
+            usernames.append(username)
+            operations.append(ReplaceOne({"_id": _entry_id(contest_id, username)}, entry, upsert=True))
+
+        for start in range(0, len(operations), 1000):
+            await contest_leaderboard_collection.bulk_write(operations[start:start + 1000], ordered=False)
+        await contest_leaderboard_collection.delete_many({"contest_id": contest_id, "username": {"$nin": usernames}})
+
+        stats = {
+            "completed_count": completed_count,
+            "completed_time_sum": completed_time_sum,
+            "tie_breakers": breakers,
+            "built_at": now,
+        }
+        result = await contest_leaderboard_stats_collection.replace_one({"_id": contest_id, "rebuild": generation}, stats)
+        if result.matched_count:
+            self.rebuilds += 1
+            logger.info(f"Leaderboard for contest {contest_id} rebuilt with {len(operations)} entries")
+        else:
+            # A score write landed during the rebuild: leave the stats invalid so the next read rebuilds
+            self.rebuilds_discarded += 1
+            logger.info(f"Leaderboard for contest {contest_id} changed while rebuilding; rebuilding on next read")
+        return stats
+
+    def stats(self) -> dict:
+        return {
+            "reads": self.reads,
+            "updates": self.updates,
+            "rebuilds": self.rebuilds,
+            "rebuilds_discarded": self.rebuilds_discarded,
+            "update_failures": self.update_failures,
+        }
+
+
+contest_leaderboards = ContestLeaderboard()
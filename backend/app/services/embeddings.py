@@ -0,0 +1,247 @@
+import os
+import re
+import math
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.database import embedding_cache_collection
+from app.indexes import apply_indexes
+from app.services.translation_memo import normalize_text
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# --- Embedding configuration ---
+# "gemini" (default) or "local" (offline feature hashing, for tests and air-gapped setups)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "gemini").strip().lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/gemini-embedding-001")
+EMBEDDING_LOCAL_DIMENSIONS = int(os.getenv("EMBEDDING_LOCAL_DIMENSIONS", 768))
+EMBEDDING_MAX_WORKERS = int(os.getenv("EMBEDDING_MAX_WORKERS", 4))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 2000))
+# Cached vectors are deterministic per model; the TTL only keeps the collection from growing forever
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", 90 * 24 * 3600))
+
+embedding_executor = ThreadPoolExecutor(max_workers=EMBEDDING_MAX_WORKERS, thread_name_prefix="embedding")
+
+
+class EmbeddingProvider:
+    """Turns texts into vectors. `model` identifies the vector space and is part of the cache key."""
+
+    model: str = ""
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        raise NotImplementedError
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """
+    Gemini embed_content. The SDK call is blocking, so it runs on the bounded
+    embedding_executor instead of the event loop.
+    """
+
+    def __init__(self, model: str = EMBEDDING_MODEL, api_key: Optional[str] = None):
+        import google.generativeai as genai
+
+        self.model = model
+        self._genai = genai
+        api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.available = bool(api_key)
+        if api_key:
+            genai.configure(api_key=api_key)
+        else:
+            logger.warning("GEMINI_API_KEY not found in environment variables")
+
+    def _embed_sync(self, texts: List[str]) -> List[Optional[List[float]]]:
+        resp = self._genai.embed_content(model=self.model, content=texts)
+        return list(resp.get("embedding") or [None] * len(texts))
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        if not self.available:
+            return [None] * len(texts)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(embedding_executor, self._embed_sync, texts)
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Offline provider: signed feature hashing of word unigrams and character trigrams,
+    L2-normalized. Deterministic and dependency-free, so vector search works in tests and
+    CI as long as the stored translation vectors were produced by the same provider.
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_LOCAL_DIMENSIONS):
+        self.dimensions = dimensions
+        self.model = f"local-hashing-{dimensions}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN_RE.findall(text.casefold())
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed_one(self, text: str) -> Optional[List[float]]:
+        vector = [0.0] * self.dimensions
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if not norm:
+            return None
+        return [v / norm for v in vector]
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        return [self.embed_one(text) for text in texts]
+
+
+def create_provider(name: str = EMBEDDING_PROVIDER) -> EmbeddingProvider:
+    if name == "local":
+        return HashingEmbeddingProvider()
+    if name != "gemini":
+        logger.warning(f"Unknown EMBEDDING_PROVIDER '{name}', using gemini")
+    return GeminiEmbeddingProvider()
+
+
+def _cache_id(model: str, normalized: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class QueryEmbeddings:
+    """
+    Query embeddings through the configured provider, cached by (model, normalized text).
+
+    Level 1 is an in-process LRU, level 2 the embedding_cache collection shared by all
+    workers. Concurrent requests for the same text (e.g. every participant of a contest
+    searching the same areas_of_interest) share a single lookup, run in its own task so a
+    cancelled request never cancels the others.
+    """
+
+    def __init__(self, provider: Optional[EmbeddingProvider] = None, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self._provider = provider
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.local_hits = 0
+        self.store_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.provider_errors = 0
+
+    @property
+    def provider(self) -> EmbeddingProvider:
+        if self._provider is None:
+            self._provider = create_provider()
+        return self._provider
+
+    @property
+    def model(self) -> str:
+        return self.provider.model
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """Embedding of one query text, or None when the provider cannot produce one."""
+        normalized = normalize_text(text or "")
+        if not normalized:
+            return None
+        cache_id = _cache_id(self.model, normalized)
+
+        vector = self._entries.get(cache_id)
+        if vector is not None:
+            self._entries.move_to_end(cache_id)
+            self.local_hits += 1
+            return vector
+
+        task = self._inflight.get(cache_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(cache_id, text))
+            self._inflight[cache_id] = task
+            task.add_done_callback(lambda done: self._load_finished(cache_id, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _load_finished(self, cache_id: str, task: asyncio.Task) -> None:
+        if self._inflight.get(cache_id) is task:
+            del self._inflight[cache_id]
+        # Mark retrieved so a failure nobody else waited on isn't logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, cache_id: str, text: str) -> Optional[List[float]]:
+        try:
+            doc = await embedding_cache_collection.find_one({"_id": cache_id}, {"vector": 1})
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            doc = None
+        if doc and doc.get("vector"):
+            self.store_hits += 1
+            self._remember(cache_id, doc["vector"])
+            return doc["vector"]
+
+        self.misses += 1
+        try:
+            # The normalized text only keys the cache; the provider sees the query as typed
+            vector = (await self.provider.embed([text]))[0]
+        except Exception as e:
+            self.provider_errors += 1
+            logger.error(f"❌ Embedding generation failed: {e}")
+            return None
+        if not vector:
+            return None
+
+        self._remember(cache_id, vector)
+        now = datetime.now(timezone.utc)
+        try:
+            await embedding_cache_collection.update_one(
+                {"_id": cache_id},
+                {"$set": {
+                    "model": self.model,
+                    "text": text,
+                    "vector": vector,
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=EMBEDDING_CACHE_TTL_SECONDS),
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+        return vector
+
+    def _remember(self, cache_id: str, vector: List[float]) -> None:
+        self._entries[cache_id] = vector
+        self._entries.move_to_end(cache_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def ensure_indexes(self) -> None:
+        await apply_indexes("embedding_cache")
+
+    def stats(self) -> dict:
+        hits = self.local_hits + self.store_hits + self.coalesced
+        lookups = hits + self.misses
+        return {
+            "model": self._provider.model if self._provider else None,
+            "local_hits": self.local_hits,
+            "store_hits": self.store_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "provider_errors": self.provider_errors,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+query_embeddings = QueryEmbeddings()
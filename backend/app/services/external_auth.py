@@ -0,0 +1,61 @@
+import os
+import logging
+
+import httpx
+from dotenv import load_dotenv
+
+from app.utils.http_clients import get_http_client
+from app.utils.circuit_breaker import CircuitBreaker
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+EXTERNAL_LOGIN_URL = os.getenv("EXTERNAL_LOGIN_URL", "http://localhost:8000/auth/login")
+EXTERNAL_CREATE_USER_URL = os.getenv("EXTERNAL_CREATE_USER_URL", "http://localhost:8000/auth/create-user")
+
+# Upper bound on a single call to the external auth service
+AUTH_TIMEOUT_SECONDS = float(os.getenv("AUTH_TIMEOUT_SECONDS", 10))
+AUTH_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("AUTH_CIRCUIT_FAILURE_THRESHOLD", 5))
+AUTH_CIRCUIT_RESET_SECONDS = float(os.getenv("AUTH_CIRCUIT_RESET_SECONDS", 30))
+
+auth_circuit = CircuitBreaker(
+    "external-auth",
+    failure_threshold=AUTH_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=AUTH_CIRCUIT_RESET_SECONDS,
+)
+
+
+async def _call_auth_service(url: str, **kwargs) -> httpx.Response:
+    """
+    POSTs to the external auth service through the shared client.
+    Transport errors, timeouts and 5xx responses count as failures for the circuit;
+    4xx responses (e.g. wrong password) are normal answers.
+    Raises httpx.HTTPError (CircuitOpenError when the circuit is open).
+    """
+    auth_circuit.before_call()
+    try:
+        response = await get_http_client("auth").post(url, timeout=AUTH_TIMEOUT_SECONDS, **kwargs)
+    except httpx.HTTPError:
+        auth_circuit.record_failure()
+        raise
+    except BaseException:
+        # Cancelled or unexpected: neither a success nor an upstream failure
+        auth_circuit.release_trial()
+        raise
+
+    if response.status_code >= 500:
+        auth_circuit.record_failure()
+    else:
+        auth_circuit.record_success()
+    return response
+
+
+async def external_login(payload: dict) -> httpx.Response:
+    """Form-encoded login against EXTERNAL_LOGIN_URL."""
+    return await _call_auth_service(EXTERNAL_LOGIN_URL, data=payload)
+
+
+async def external_create_user(payload: dict) -> httpx.Response:
+    """JSON user creation against EXTERNAL_CREATE_USER_URL."""
+    return await _call_auth_service(EXTERNAL_CREATE_USER_URL, json=payload)
@@ -0,0 +1,315 @@
+import os
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from pymongo import InsertOne, UpdateOne
+
+from app.database import translation_collection, objects_collection, facets_collection, facet_members_collection
+from app.indexes import apply_indexes
+from app.services.taxonomy import object_id_variants, taxonomy_index
+
+logger = logging.getLogger(__name__)
+
+# Without change streams, built partitions are rebuilt this often instead
+FACETS_REBUILD_SECONDS = float(os.getenv("FACETS_REBUILD_SECONDS", 3600))
+_BATCH = 1000
+
+
+def _org_key(org_id) -> str:
+    """Public content (org_id missing, None or "") shares the "" org."""
+    return str(org_id) if org_id else ""
+
+
+def _partition_id(org_key: str, language: str) -> str:
+    return f"{org_key}|{language}"
+
+
+def _facet_id(org_key: str, language: str, term_id: str) -> str:
+    return f"{org_key}|{language}|{term_id}"
+
+
+def _translation_org_filter(org_key: str) -> dict:
+    if org_key:
+        return {"org_id": org_key}
+    return {"$or": [{"org_id": {"$exists": False}}, {"org_id": None}, {"org_id": ""}]}
+
+
+async def _approved_objects(object_ids: Iterable) -> Set[str]:
+    """String ids of the given objects whose image_status is Approved."""
+    variants = [oid for value in set(object_ids) if value for oid in object_id_variants(value)]
+    if not variants:
+        return set()
+    docs = await objects_collection.find(
+        {"_id": {"$in": variants}, "image_status": "Approved"}, {"_id": 1}
+    ).to_list(length=None)
+    return {str(doc["_id"]) for doc in docs}
+
+
+class FacetIndex:
+    """
+    Category / field-of-study facets with item counts per (org, language).
+
+    catalog_facets holds one document per taxonomy id (see app.services.taxonomy) with the
+    number of approved translations of image-approved objects carrying it, plus one marker
+    document per built partition, all indexed on (org_key, language): reading a partition
+    is one indexed query. catalog_facet_members records which facets each approved
+    translation currently counts towards (none while its object's image is not approved),
+    so a change (approval, removal, new metadata, image review) is applied as $inc deltas.
+    Partitions are only served once the taxonomy backfill has completed.
+
+    Kept current from the translations and objects change streams; where change streams
+    are unavailable, built partitions are rebuilt every FACETS_REBUILD_SECONDS.
+    """
+
+    def __init__(self):
+        self._watch_task: Optional[asyncio.Task] = None
+        self.reads = 0
+        self.fallbacks = 0
+        self.changes_applied = 0
+
+    async def ensure_indexes(self) -> None:
+        await apply_indexes("catalog_facets", "catalog_facet_members")
+
+    # --- Reading ---
+    async def read(self, org_id: Optional[str], language: str) -> Optional[Dict[str, List[dict]]]:
+        """
+        {kind: [{"taxonomy_id", "count"}]} for the partition, or None if it is not built
+        and the caller should fall back to scanning translations.
+        """
+        # Counts come from taxonomy_ids, which are partial until the backfill completes
+        if not await taxonomy_index.ready():
+            self.fallbacks += 1
+            return None
+        docs = await facets_collection.find(
+            {"org_key": _org_key(org_id), "language": language}, {"_id": 0, "kind": 1, "taxonomy_id": 1, "count": 1}
+        ).to_list(length=None)
+        if not any("kind" not in doc for doc in docs):
+            self.fallbacks += 1
+            return None
+        self.reads += 1
+        facets: Dict[str, List[dict]] = {}
+        for doc in docs:
+            if doc.get("kind") and doc.get("count", 0) > 0:
+                facets.setdefault(doc["kind"], []).append({"taxonomy_id": doc["taxonomy_id"], "count": doc["count"]})
+        return facets
+
+    # --- Building ---
+    async def rebuild_partition(self, org_key: str, language: str) -> int:
+        """Regenerates one (org, language) partition from the translations collection."""
+        partition = {"org_key": org_key, "language": language}
+        # Dropping the marker first sends concurrent reads to the fallback while regenerating
+        await facets_collection.delete_many(partition)
+        await facet_members_collection.delete_many(partition)
+
+        counts = Counter()
+
+        async def add_members(docs: List[dict]) -> None:
+            approved_objects = await _approved_objects(doc.get("object_id") for doc in docs)
+            members = []
+            for doc in docs:
+                counted = str(doc.get("object_id")) in approved_objects
+                term_ids = sorted(set(doc.get("taxonomy_ids") or [])) if counted else []
+                counts.update(term_ids)
+                members.append(InsertOne({"_id": doc["_id"], **partition, "taxonomy_ids": term_ids}))
+            await facet_members_collection.bulk_write(members, ordered=False)
+
+        batch = []
+        async for doc in translation_collection.find(
+            {"translation_status": "Approved", "requested_language": language, **_translation_org_filter(org_key)},
+            {"_id": 1, "object_id": 1, "taxonomy_ids": 1},
+            batch_size=_BATCH
+        ):
+            batch.append(doc)
+            if len(batch) >= _BATCH:
+                await add_members(batch)
+                batch = []
+        if batch:
+            await add_members(batch)
+
+        facets = [
+            InsertOne({
+                "_id": _facet_id(org_key, language, term_id),
+                **partition,
+                "kind": term_id.split(":", 1)[0],
+                "taxonomy_id": term_id,
+                "count": count,
+            })
+            for term_id, count in counts.items()
+        ]
+        facets.append(InsertOne({"_id": _partition_id(org_key, language), **partition, "built_at": datetime.now(timezone.utc)}))
+        await facets_collection.bulk_write(facets, ordered=False)
+        logger.info(f"Facet partition ({org_key or 'public'}, {language}) built with {len(counts)} facets")
+        return len(counts)
+
+    async def rebuild_all(self) -> int:
+        """Builds every (org, language) partition that has approved translations."""
+        pairs = await translation_collection.aggregate([
+            {"$match": {"translation_status": "Approved", "requested_language": {"$nin": [None, ""]}}},
+            {"$group": {"_id": {"org_id": "$org_id", "language": "$requested_language"}}},
+        ]).to_list(length=None)
+        partitions = {(_org_key(pair["_id"].get("org_id")), pair["_id"]["language"]) for pair in pairs}
+        for org_key, language in sorted(partitions):
+            await self.rebuild_partition(org_key, language)
+        return len(partitions)
+
+    async def _rebuild_built(self) -> None:
+        markers = await facets_collection.find(
+            {"built_at": {"$exists": True}}, {"org_key": 1, "language": 1}
+        ).to_list(length=None)
+        for marker in markers:
+            await self.rebuild_partition(marker["org_key"], marker["language"])
+
+    # --- Incremental maintenance ---
+    async def apply_change(self, translation_id, doc: Optional[dict]) -> None:
+        """Moves one translation's contribution to its current state (None if deleted)."""
+        approved = bool(doc) and doc.get("translation_status") == "Approved" and bool(doc.get("requested_language"))
+        new = None
+        if approved:
+            # Approved translations of objects whose image is not approved are members counting towards nothing
+            counted = str(doc.get("object_id")) in await _approved_objects([doc.get("object_id")])
+            term_ids = sorted(set(doc.get("taxonomy_ids") or [])) if counted else []
+            new = (_org_key(doc.get("org_id")), doc["requested_language"], term_ids)
+
+        current = await facet_members_collection.find_one({"_id": translation_id})
+        old = (current["org_key"], current["language"], current["taxonomy_ids"]) if current else None
+        if old == new:
+            return
+
+        operations = []
+        if old:
+            operations += [
+                UpdateOne({"_id": _facet_id(old[0], old[1], term_id)}, {"$inc": {"count": -1}})
+                for term_id in old[2]
+            ]
+        if new:
+            operations += [
+                UpdateOne(
+                    {"_id": _facet_id(new[0], new[1], term_id)},
+                    {
+                        "$inc": {"count": 1},
+                        "$setOnInsert": {
+                            "org_key": new[0], "language": new[1],
+                            "kind": term_id.split(":", 1)[0], "taxonomy_id": term_id,
+                        },
+                    },
+                    upsert=True
+                )
+                for term_id in new[2]
+            ]
+        if operations:
+            await facets_collection.bulk_write(operations, ordered=False)
+        if new:
+            await facet_members_collection.replace_one(
+                {"_id": translation_id},
+                {"org_key": new[0], "language": new[1], "taxonomy_ids": new[2]},
+                upsert=True
+            )
+        else:
+            await facet_members_collection.delete_one({"_id": translation_id})
+        self.changes_applied += 1
+
+    async def start(self) -> None:
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._maintain())
+
+    async def stop(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+
+    async def _maintain(self) -> None:
+        try:
+            await self.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Facet index creation failed: {e}")
+        watchers = [asyncio.create_task(self._watch_changes()), asyncio.create_task(self._watch_objects())]
+        try:
+            for finished in asyncio.as_completed(watchers):
+                if not await finished:
+                    break
+            else:
+                return
+            # Either stream being unavailable means changes can be missed: rebuild periodically
+            while True:
+                await asyncio.sleep(FACETS_REBUILD_SECONDS)
+                try:
+                    await self._rebuild_built()
+                except Exception as e:
+                    logger.warning(f"Facet partition rebuild failed: {e}")
+        finally:
+            for watcher in watchers:
+                watcher.cancel()
+            await asyncio.gather(*watchers, return_exceptions=True)
+
+    async def _watch_changes(self) -> bool:
+        pipeline = [
+            {"$match": {"$or": [
+                {"operationType": {"$in": ["insert", "replace", "delete"]}},
+                {"updateDescription.updatedFields.translation_status": {"$exists": True}},
+                {"updateDescription.updatedFields.requested_language": {"$exists": True}},
+                {"updateDescription.updatedFields.org_id": {"$exists": True}},
+                {"updateDescription.updatedFields.object_id": {"$exists": True}},
+                # Set by the taxonomy service once the object's metadata is known
+                {"updateDescription.updatedFields.taxonomy_ids": {"$exists": True}},
+            ]}},
+            {"$project": {
+                "operationType": 1, "documentKey": 1,
+                "fullDocument.org_id": 1, "fullDocument.requested_language": 1, "fullDocument.object_id": 1,
+                "fullDocument.translation_status": 1, "fullDocument.taxonomy_ids": 1,
+            }},
+        ]
+        try:
+            async with translation_collection.watch(pipeline, full_document="updateLookup") as stream:
+                async for change in stream:
+                    try:
+                        await self.apply_change(change["documentKey"]["_id"], change.get("fullDocument"))
+                    except Exception as e:
+                        logger.warning(f"Facet update failed for {change['documentKey']['_id']}: {e}")
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Facet change notifications unavailable, using periodic rebuilds: {e}")
+            return False
+
+    async def _watch_objects(self) -> bool:
+        # Image review moves an object's approved translations in or out of the counts
+        pipeline = [
+            {"$match": {"$or": [
+                {"operationType": {"$in": ["insert", "replace", "delete"]}},
+                {"updateDescription.updatedFields.image_status": {"$exists": True}},
+            ]}},
+            {"$project": {"operationType": 1, "documentKey": 1}},
+        ]
+        try:
+            async with objects_collection.watch(pipeline) as stream:
+                async for change in stream:
+                    object_id = change["documentKey"]["_id"]
+                    try:
+                        async for doc in translation_collection.find(
+                            {"object_id": {"$in": object_id_variants(object_id)}},
+                            {"org_id": 1, "requested_language": 1, "object_id": 1, "translation_status": 1, "taxonomy_ids": 1}
+                        ):
+                            await self.apply_change(doc["_id"], doc)
+                    except Exception as e:
+                        logger.warning(f"Facet update failed for object {object_id}: {e}")
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Facet object notifications unavailable, using periodic rebuilds: {e}")
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "reads": self.reads,
+            "fallbacks": self.fallbacks,
+            "changes_applied": self.changes_applied,
+        }
+
+
+catalog_facets = FacetIndex()
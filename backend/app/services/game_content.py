@@ -1,6 +1,8 @@
 from app.database import translation_collection, objects_collection
-from app.services.randompicdetails import get_random_picture_details
+from app.services.randompicdetails import get_random_picture_details, hydrate_translations
+from app.services.catalog import TRANSLATION_CATALOG_ENABLED, translation_catalog
 from app.routers.languages import translate_text
+from app.storage.imagestore import deliver_images
 import logging
 from typing import Optional, List, Dict, Any
 from app.contest_config import RoundStructure
@@ -12,6 +14,7 @@ import re
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_NO_IMAGE = {"image_base64": None, "image_url": None, "image_url_expires_at": None}
 
 
 async def fetch_level_content(
@@ -22,7 +25,9 @@ async def fetch_level_content(
     category: Optional[str] = None,
     field_of_study: Optional[str] = None,
     assigned_object_ids: Optional[List[str]] = None,
-    areas_of_interest: Optional[List[str]] = None
+    areas_of_interest: Optional[List[str]] = None,
+    image_delivery: str = "base64",
+    image_size: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     print(f"[DEBUG-Backend] fetch_level_content: type={level_game_type}, lang={language}, org={org_id}, cat={category}, fos={field_of_study}")
     """
@@ -41,7 +46,9 @@ async def fetch_level_content(
             category=category,
             field_of_study=field_of_study,
             assigned_object_ids=assigned_object_ids,
-            areas_of_interest=areas_of_interest
+            areas_of_interest=areas_of_interest,
+            image_delivery=image_delivery,
+            image_size=image_size
         )
     
     elif level_game_type == "quiz":
@@ -52,7 +59,9 @@ async def fetch_level_content(
             category=category,
             field_of_study=field_of_study,
             assigned_object_ids=assigned_object_ids,
-            areas_of_interest=areas_of_interest
+            areas_of_interest=areas_of_interest,
+            image_delivery=image_delivery,
+            image_size=image_size
         )
     
     else:
@@ -138,6 +147,33 @@ async def fetch_level_content(
     
 #     return final_ids
 
+async def _fetch_object_images(
+    results_details: List[Dict[str, Any]],
+    image_delivery: str = "base64",
+    image_size: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns {object_id: image payload} for the objects referenced by results_details.
+    The payload holds image_base64 / image_url / image_url_expires_at depending on the
+    delivery mode (and the image_size rendition, if any); all images are resolved concurrently.
+    """
+    object_ids = []
+    for r in results_details:
+        oid = r.get("object_id")
+        if isinstance(oid, str):
+            object_ids.append(ObjectId(oid))
+        elif oid is not None:
+            object_ids.append(oid)
+
+    objects = await objects_collection.find(
+        {"_id": {"$in": object_ids}},
+        {"image_store": 1, "image_hash": 1, "image_base64": 1}
+    ).to_list(length=None)
+
+    images = await deliver_images(objects, image_delivery, size=image_size)
+
+    return {str(obj["_id"]): image for obj, image in zip(objects, images)}
+
 async def _fetch_matching_objects(
     round_structure: RoundStructure,
     language: str,
@@ -145,7 +181,9 @@ async def _fetch_matching_objects(
     category: Optional[str] = None,
     field_of_study: Optional[str] = None,
     assigned_object_ids: Optional[List[str]] = None,
-    areas_of_interest: Optional[List[str]] = None
+    areas_of_interest: Optional[List[str]] = None,
+    image_delivery: str = "base64",
+    image_size: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Fetches objects for matching game.
@@ -157,7 +195,12 @@ async def _fetch_matching_objects(
     count = round_structure.question_count
     hints_used = round_structure.hints_used
     
-    if assigned_object_ids:
+    partition = translation_catalog.partition(org_id, language) if assigned_object_ids and TRANSLATION_CATALOG_ENABLED else None
+    if partition is not None:
+        # Random distinct object names among the assigned objects, picked in memory
+        picked = partition.pick_objects(count, assigned_object_ids, dedupe_by_name=True)
+        results_details = await hydrate_translations([entry.translation_id for entry in picked])
+    elif assigned_object_ids:
         # For assigned object IDs, we still need to fetch their translation details
         valid_object_ids = [ObjectId(oid) if isinstance(oid, str) else oid for oid in assigned_object_ids]
         
@@ -227,35 +270,9 @@ async def _fetch_matching_objects(
         # else: keep original fields as-is (normal mode)
 
     # Enrich results with image data from objects collection
-    from app.storage.imagestore import retrieve_image
-    
-    # Extract object IDs for image lookup
-    object_ids = []
-    for r in results_details:
-        oid = r.get("object_id")
-        if isinstance(oid, str):
-            object_ids.append(ObjectId(oid))
-        elif oid is not None:
-            object_ids.append(oid)
+    objects_map = await _fetch_object_images(results_details, image_delivery, image_size)
     
-    objects_cursor = objects_collection.find({"_id": {"$in": object_ids}})
-    
-    objects_map = {}
-    async for obj in objects_cursor:
-        image_store = obj.get("image_store")
-        image_base64 = None
-        if image_store:
-            try:
-                image_base64 = await retrieve_image(image_store)
-            except Exception as e:
-                logger.error(f"Error retrieving image for object {obj.get('_id')}: {e}")
-        
-        if not image_base64:
-            image_base64 = obj.get("image_base64")
-        
-        objects_map[str(obj["_id"])] = image_base64
-    
-    # Add image_base64 to each result and convert ObjectIds to strings
+    # Add image payload to each result and convert ObjectIds to strings
     final_results = []
     for result in results_details:
         # Convert ObjectId fields to strings for JSON serialization
@@ -266,7 +283,7 @@ async def _fetch_matching_objects(
         result["translation_id"] = str(tid) if tid else ""
         
         # Add image
-        result["image_base64"] = objects_map.get(result["object_id"])
+        result.update(objects_map.get(result["object_id"], _NO_IMAGE))
         final_results.append(result)
     
     logger.info(f"[_fetch_matching_objects] Returning {len(final_results)} results for language: {language}")
@@ -280,7 +297,9 @@ async def _fetch_quiz_questions(
     category: Optional[str] = None,
     field_of_study: Optional[str] = None,
     assigned_object_ids: Optional[List[str]] = None,
-    areas_of_interest: Optional[List[str]] = None
+    areas_of_interest: Optional[List[str]] = None,
+    image_delivery: str = "base64",
+    image_size: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Fetches questions for quiz game based on difficulty distribution.
@@ -316,33 +335,8 @@ async def _fetch_quiz_questions(
     
     logger.info(f"[_fetch_quiz_questions] Got {len(results_details)} results from get_random_picture_details")
 
-    # Extract object IDs for image fetching
-    object_ids = []
-    for r in results_details:
-        oid = r.get("object_id")
-        if isinstance(oid, str):
-            object_ids.append(ObjectId(oid))
-        elif oid is not None:
-            object_ids.append(oid)
-
     # Fetch Object Images
-    from app.storage.imagestore import retrieve_image
-    
-    objects_cursor = objects_collection.find({"_id": {"$in": object_ids}})
-    objects_map = {}
-    async for obj in objects_cursor:
-        image_store = obj.get("image_store")
-        image_base64 = None
-        if image_store:
-            try:
-                image_base64 = await retrieve_image(image_store)
-            except Exception as e:
-                logger.error(f"Error retrieving image for object {obj.get('_id')}: {e}")
-        
-        if not image_base64:
-            image_base64 = obj.get("image_base64")
-            
-        objects_map[str(obj["_id"])] = image_base64
+    objects_map = await _fetch_object_images(results_details, image_delivery, image_size)
     
     logger.info(f"Fetched images for {len(objects_map)} objects")
 
@@ -421,7 +415,7 @@ async def _fetch_quiz_questions(
         item = {
             "object_id": oid_str,
             "translation_id": str(tid) if tid else "",
-            "image_base64": objects_map.get(oid_str),
+            **objects_map.get(oid_str, _NO_IMAGE),
             "imageName": translation_data.get("object_name", "Unknown"),
             "object_description": translation_data.get("object_description"),
             "questions": selected_qa,
@@ -0,0 +1,221 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+from pymongo import UpdateOne
+
+from app.database import translation_collection, language_availability_collection
+from app.indexes import apply_indexes
+
+logger = logging.getLogger(__name__)
+
+# Full recount interval; also how removals are picked up where change streams are unavailable
+LANGUAGE_AVAILABILITY_REBUILD_SECONDS = float(os.getenv("LANGUAGE_AVAILABILITY_REBUILD_SECONDS", 900))
+_REBUILD_DELAY_SECONDS = 5
+
+
+def _org_key(org_id) -> str:
+    """Public content (org_id missing, None or "") shares the "" org."""
+    return str(org_id) if org_id else ""
+
+
+def _translation_org_filter(org_key: str) -> dict:
+    if org_key:
+        return {"org_id": org_key}
+    return {"$or": [{"org_id": {"$exists": False}}, {"org_id": None}, {"org_id": ""}]}
+
+
+class LanguageAvailability:
+    """
+    Languages with approved translations, per org and for public content.
+
+    The language_availability collection holds one document per (org, language) with its
+    approved-translation count; this process keeps the whole table in memory, so
+    /active/languages never queries translations. A translation approved, moved or
+    unapproved recounts its own (org, language) with one indexed count; deletions and
+    moves, whose previous (org, language) the change does not carry, schedule a full
+    rebuild. The table is also rebuilt every LANGUAGE_AVAILABILITY_REBUILD_SECONDS.
+    """
+
+    def __init__(self):
+        self._by_org: Dict[str, Dict[str, int]] = {}
+        self._loaded = False
+        self._rebuild_lock = asyncio.Lock()
+        self._pending_rebuild: Optional[asyncio.Task] = None
+        self._tasks = []
+
+        self.reads = 0
+        self.fallbacks = 0
+        self.recounts = 0
+        self.rebuilds = 0
+
+    async def languages(self, org_id: Optional[str]) -> Set[str]:
+        """Language names with approved translations for the org (None: public content)."""
+        if self._loaded:
+            self.reads += 1
+            return set(self._by_org.get(_org_key(org_id), {}))
+        # Before the first load completes, answer from the translations collection
+        self.fallbacks += 1
+        return set(await translation_collection.distinct(
+            "requested_language",
+            {"translation_status": "Approved", **_translation_org_filter(_org_key(org_id))}
+        ))
+
+    # --- Maintenance ---
+    async def ensure_indexes(self) -> None:
+        await apply_indexes("language_availability")
+
+    async def load(self) -> None:
+        """Loads the stored table; reads keep the distinct fallback if it is empty."""
+        by_org: Dict[str, Dict[str, int]] = {}
+        async for doc in language_availability_collection.find({}, {"org_key": 1, "language": 1, "count": 1}):
+            if doc.get("count", 0) > 0:
+                by_org.setdefault(doc["org_key"], {})[doc["language"]] = doc["count"]
+        # An empty table was never built: keep falling back until rebuild() completes
+        if by_org:
+            self._set(by_org)
+
+    async def rebuild(self) -> int:
+        """Recounts every (org, language) from the translations collection; returns the number of pairs."""
+        async with self._rebuild_lock:
+            groups = await translation_collection.aggregate([
+                {"$match": {"translation_status": "Approved", "requested_language": {"$nin": [None, ""]}}},
+                {"$group": {"_id": {"org_id": "$org_id", "language": "$requested_language"}, "count": {"$sum": 1}}},
+            ]).to_list(length=None)
+            by_org: Dict[str, Dict[str, int]] = {}
+            for group in groups:
+                languages = by_org.setdefault(_org_key(group["_id"].get("org_id")), {})
+                languages[group["_id"]["language"]] = languages.get(group["_id"]["language"], 0) + group["count"]
+
+            now = datetime.now(timezone.utc)
+            operations = [
+                UpdateOne(
+                    {"org_key": org_key, "language": language},
+                    {"$set": {"count": count, "updated_at": now}},
+                    upsert=True
+                )
+                for org_key, languages in by_org.items()
+                for language, count in languages.items()
+            ]
+            if operations:
+                await language_availability_collection.bulk_write(operations, ordered=False)
+            stale = [
+                doc["_id"]
+                async for doc in language_availability_collection.find({}, {"org_key": 1, "language": 1})
+                if doc["language"] not in by_org.get(doc["org_key"], {})
+            ]
+            if stale:
+                await language_availability_collection.delete_many({"_id": {"$in": stale}})
+            self._set(by_org)
+            self.rebuilds += 1
+            return len(operations)
+
+    async def recount(self, org_id: Optional[str], language: str) -> int:
+        """Recounts one (org, language) with an indexed count."""
+        org_key = _org_key(org_id)
+        count = await translation_collection.count_documents(
+            {"requested_language": language, "translation_status": "Approved", **_translation_org_filter(org_key)}
+        )
+        await language_availability_collection.update_one(
+            {"org_key": org_key, "language": language},
+            {"$set": {"count": count, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        if count > 0:
+            self._by_org.setdefault(org_key, {})[language] = count
+        else:
+            self._by_org.get(org_key, {}).pop(language, None)
+        self.recounts += 1
+        return count
+
+    def _set(self, by_org: Dict[str, Dict[str, int]]) -> None:
+        self._by_org = by_org
+        self._loaded = True
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._rebuild_loop()),
+                asyncio.create_task(self._watch_changes()),
+            ]
+
+    async def stop(self) -> None:
+        tasks = self._tasks + ([self._pending_rebuild] if self._pending_rebuild else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks, self._pending_rebuild = [], None
+
+    async def _rebuild_loop(self) -> None:
+        try:
+            await self.ensure_indexes()
+            await self.load()
+        except Exception as e:
+            logger.warning(f"Language availability load failed: {e}")
+        # An empty table means it was never built (or there is no approved content yet)
+        delay = 0 if not self._by_org else LANGUAGE_AVAILABILITY_REBUILD_SECONDS
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.warning(f"Language availability rebuild failed: {e}")
+            delay = LANGUAGE_AVAILABILITY_REBUILD_SECONDS
+
+    async def _watch_changes(self) -> None:
+        pipeline = [
+            {"$match": {"$or": [
+                {"operationType": {"$in": ["insert", "replace", "delete"]}},
+                {"updateDescription.updatedFields.translation_status": {"$exists": True}},
+                {"updateDescription.updatedFields.requested_language": {"$exists": True}},
+                {"updateDescription.updatedFields.org_id": {"$exists": True}},
+            ]}},
+            {"$project": {
+                "operationType": 1, "updateDescription.updatedFields": 1,
+                "fullDocument.org_id": 1, "fullDocument.requested_language": 1,
+            }},
+        ]
+        try:
+            async with translation_collection.watch(pipeline, full_document="updateLookup") as stream:
+                async for change in stream:
+                    try:
+                        doc = change.get("fullDocument")
+                        moved = set(change.get("updateDescription", {}).get("updatedFields", {})) & {"org_id", "requested_language"}
+                        if doc and doc.get("requested_language"):
+                            await self.recount(doc.get("org_id"), doc["requested_language"])
+                        if change["operationType"] in ("delete", "replace") or moved or doc is None:
+                            # The previous (org, language) is unknown: recount everything shortly
+                            self._schedule_rebuild()
+                    except Exception as e:
+                        logger.warning(f"Language availability update failed: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Language availability change notifications unavailable, using periodic rebuilds: {e}")
+
+    def _schedule_rebuild(self) -> None:
+        # Coalesces bursts (bulk deletes, re-imports) into one rebuild
+        if self._pending_rebuild is None or self._pending_rebuild.done():
+            self._pending_rebuild = asyncio.create_task(self._delayed_rebuild())
+
+    async def _delayed_rebuild(self) -> None:
+        await asyncio.sleep(_REBUILD_DELAY_SECONDS)
+        try:
+            await self.rebuild()
+        except Exception as e:
+            logger.warning(f"Language availability rebuild failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "orgs": len(self._by_org),
+            "reads": self.reads,
+            "fallbacks": self.fallbacks,
+            "recounts": self.recounts,
+            "rebuilds": self.rebuilds,
+        }
+
+
+language_availability = LanguageAvailability()
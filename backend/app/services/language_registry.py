@@ -0,0 +1,146 @@
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from app.database import languages_collection
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_REGISTRY_REFRESH_SECONDS = float(os.getenv("LANGUAGE_REGISTRY_REFRESH_SECONDS", 300))
+# After a failed load, requests retry the load at most this often
+_RETRY_AFTER_FAILURE_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class Language:
+    name: str
+    iso_code: Optional[str]
+    bcp47: Optional[str]
+    image_url: Optional[str]
+
+
+def _fold(value: Optional[str]) -> str:
+    return value.strip().casefold() if value else ""
+
+
+class LanguageRegistry:
+    """
+    Immutable snapshot of the languages collection with case-folded lookup maps.
+    A refresh builds a new snapshot and swaps it in, so readers never see a partial update.
+    """
+
+    def __init__(self, languages: Tuple[Language, ...] = ()):
+        self.languages = languages
+        by_name, by_iso, by_bcp47 = {}, {}, {}
+        for lang in languages:
+            by_name.setdefault(_fold(lang.name), lang)
+            if lang.iso_code:
+                by_iso.setdefault(_fold(lang.iso_code), lang)
+            if lang.bcp47:
+                by_bcp47.setdefault(_fold(lang.bcp47), lang)
+        self.by_name: Mapping[str, Language] = MappingProxyType(by_name)
+        self.by_iso: Mapping[str, Language] = MappingProxyType(by_iso)
+        self.by_bcp47: Mapping[str, Language] = MappingProxyType(by_bcp47)
+
+    def by_language_name(self, name: Optional[str]) -> Optional[Language]:
+        """Case-insensitive lookup by language_name."""
+        return self.by_name.get(_fold(name))
+
+    def lookup(self, value: Optional[str]) -> Optional[Language]:
+        """Resolves a language name, isoCode or bcp47 tag (case-insensitive)."""
+        key = _fold(value)
+        return self.by_name.get(key) or self.by_iso.get(key) or self.by_bcp47.get(key)
+
+
+class LanguageRegistryManager:
+    """
+    Holds the current LanguageRegistry. Loaded on first use, then refreshed every
+    LANGUAGE_REGISTRY_REFRESH_SECONDS and, where the deployment supports change
+    streams (replica sets / Atlas), immediately after any change to the collection.
+    """
+
+    def __init__(self):
+        self._registry: Optional[LanguageRegistry] = None
+        self._failed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._tasks = []
+
+    async def get(self) -> LanguageRegistry:
+        if self._needs_load():
+            async with self._lock:
+                if self._needs_load():
+                    await self.refresh()
+        return self._registry
+
+    def _needs_load(self) -> bool:
+        if self._registry is None:
+            return True
+        return self._failed_at is not None and time.monotonic() - self._failed_at > _RETRY_AFTER_FAILURE_SECONDS
+
+    async def refresh(self) -> LanguageRegistry:
+        try:
+            docs = await languages_collection.find(
+                {},
+                {"_id": 0, "language_name": 1, "isoCode": 1, "bcp47": 1, "imageURL": 1}
+            ).to_list(length=None)
+        except Exception as e:
+            logger.warning(f"Language registry refresh failed: {e}")
+            if self._registry is None or self._failed_at is not None:
+                self._failed_at = time.monotonic()
+            if self._registry is None:
+                # Serve an empty registry (callers fall back) rather than failing requests
+                self._registry = LanguageRegistry()
+            return self._registry
+
+        self._failed_at = None
+        self._registry = LanguageRegistry(tuple(
+            Language(
+                name=doc["language_name"],
+                iso_code=doc.get("isoCode"),
+                bcp47=doc.get("bcp47"),
+                image_url=doc.get("imageURL"),
+            )
+            for doc in docs if doc.get("language_name")
+        ))
+        logger.info(f"Language registry loaded {len(self._registry.languages)} languages")
+        return self._registry
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._refresh_loop()),
+                asyncio.create_task(self._watch_changes()),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(LANGUAGE_REGISTRY_REFRESH_SECONDS)
+
+    async def _watch_changes(self) -> None:
+        try:
+            async with languages_collection.watch() as stream:
+                async for _ in stream:
+                    await self.refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Standalone servers have no change streams; the interval refresh still applies
+            logger.info(f"Language registry change notifications unavailable, using interval refresh only: {e}")
+
+
+language_registry = LanguageRegistryManager()
+
+
+async def get_language_registry() -> LanguageRegistry:
+    return await language_registry.get()
@@ -0,0 +1,177 @@
+import os
+import re
+import time
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from app.database import organisations_collection
+
+logger = logging.getLogger(__name__)
+
+ORG_CACHE_TTL_SECONDS = float(os.getenv("ORG_CACHE_TTL_SECONDS", 300))
+# Unknown ids/codes are remembered for a shorter time so a newly created org shows up quickly
+ORG_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("ORG_CACHE_NEGATIVE_TTL_SECONDS", 30))
+_NEGATIVE_MAX_ENTRIES = 10000
+
+
+def _doc_version(doc: dict):
+    """Monotonic version of an org document, when the document carries one."""
+    return doc.get("version") or doc.get("updated_at")
+
+
+class OrgCache:
+    """
+    In-process cache of organisation documents, indexed by org_id, exact org_code
+    and case-folded org_code, with negative caching for unknown keys.
+
+    Entries expire after ORG_CACHE_TTL_SECONDS. The cache is version-aware in two ways:
+    a load that started before an invalidation is never stored (generation check), and
+    a document older than the cached one (by its version / updated_at field) never
+    replaces it. Where change streams are available, any change to the organisations
+    collection invalidates the cache immediately.
+    Callers receive shallow copies, so they may add top-level keys freely.
+    """
+
+    def __init__(self, ttl: float = ORG_CACHE_TTL_SECONDS, negative_ttl: float = ORG_CACHE_NEGATIVE_TTL_SECONDS):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._by_id: Dict[str, Tuple[dict, float]] = {}
+        self._id_by_code: Dict[str, str] = {}
+        self._id_by_folded_code: Dict[str, str] = {}
+        self._negative: Dict[Tuple[str, str], float] = {}
+        self._generation = 0
+        self._watch_task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.db_lookups = 0
+        self.invalidations = 0
+
+    # --- Lookups ---
+    async def get_by_id(self, org_id: str) -> Optional[dict]:
+        if not org_id:
+            return None
+        return await self._lookup(("id", org_id), org_id, {"org_id": org_id})
+
+    async def get_by_code(self, org_code: str, case_insensitive: bool = False) -> Optional[dict]:
+        if not org_code:
+            return None
+        if case_insensitive:
+            folded = org_code.casefold()
+            return await self._lookup(
+                ("folded_code", folded),
+                self._id_by_folded_code.get(folded),
+                {"org_code": {"$regex": f"^{re.escape(org_code)}$", "$options": "i"}}
+            )
+        return await self._lookup(("code", org_code), self._id_by_code.get(org_code), {"org_code": org_code})
+
+    async def _lookup(self, key: Tuple[str, str], org_id: Optional[str], query: dict) -> Optional[dict]:
+        now = time.monotonic()
+        if org_id:
+            entry = self._by_id.get(org_id)
+            if entry and entry[1] > now:
+                self.hits += 1
+                return dict(entry[0])
+
+        negative_until = self._negative.get(key)
+        if negative_until:
+            if negative_until > now:
+                self.negative_hits += 1
+                return None
+            del self._negative[key]
+
+        self.misses += 1
+        self.db_lookups += 1
+        generation = self._generation
+        doc = await organisations_collection.find_one(query)
+        if generation != self._generation:
+            # Invalidated while loading: answer this caller, but don't cache what may be stale
+            return doc
+
+        if doc is None:
+            if len(self._negative) >= _NEGATIVE_MAX_ENTRIES:
+                self._negative.clear()
+            self._negative[key] = now + self.negative_ttl
+            return None
+        return dict(self._store(doc, now))
+
+    def _store(self, doc: dict, now: float) -> dict:
+        org_id = doc.get("org_id")
+        if not org_id:
+            return doc
+        cached = self._by_id.get(org_id)
+        if cached:
+            cached_version, new_version = _doc_version(cached[0]), _doc_version(doc)
+            if cached_version and new_version and new_version < cached_version:
+                doc = cached[0]
+            old_code = cached[0].get("org_code")
+            if old_code and old_code != doc.get("org_code"):
+                self._id_by_code.pop(old_code, None)
+                self._id_by_folded_code.pop(old_code.casefold(), None)
+
+        self._by_id[org_id] = (doc, now + self.ttl)
+        org_code = doc.get("org_code")
+        if org_code:
+            self._id_by_code[org_code] = org_id
+            self._id_by_folded_code[org_code.casefold()] = org_id
+        # A now-known org must not stay negatively cached under any of its keys
+        for key in (("id", org_id), ("code", org_code or ""), ("folded_code", (org_code or "").casefold())):
+            self._negative.pop(key, None)
+        return doc
+
+    # --- Invalidation ---
+    def invalidate(self, org_id: Optional[str] = None) -> None:
+        """Drops one org (or everything when org_id is None), including negative entries."""
+        self._generation += 1
+        self.invalidations += 1
+        if org_id is None:
+            self._by_id.clear()
+            self._id_by_code.clear()
+            self._id_by_folded_code.clear()
+            self._negative.clear()
+            return
+        entry = self._by_id.pop(org_id, None)
+        if entry and entry[0].get("org_code"):
+            self._id_by_code.pop(entry[0]["org_code"], None)
+            self._id_by_folded_code.pop(entry[0]["org_code"].casefold(), None)
+        self._negative.clear()
+
+    async def start(self) -> None:
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_changes())
+
+    async def stop(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+
+    async def _watch_changes(self) -> None:
+        try:
+            async with organisations_collection.watch() as stream:
+                async for _ in stream:
+                    # The collection is tiny; dropping everything is simpler than mapping _id to org_id
+                    self.invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Org cache change notifications unavailable, relying on TTL expiry: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            "db_lookups": self.db_lookups,
+            "invalidations": self.invalidations,
+            "entries": len(self._by_id),
+            "negative_entries": len(self._negative),
+            "ttl_seconds": self.ttl,
+        }
+
+
+org_cache = OrgCache()
@@ -1,5 +1,4 @@
 from app.database import objects_collection, translation_collection, books_collection
-import requests
 import os
 import logging
 from fastapi import HTTPException, Request
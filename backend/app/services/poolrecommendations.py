@@ -1,10 +1,11 @@
 from app.database import objects_collection, translation_collection
-import requests
+import httpx
 import os
 import logging
 import random
 from fastapi import HTTPException, Request
 from typing import Optional
+from app.utils.http_clients import get_http_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -47,14 +48,14 @@ async def get_pool_recommendations(
         
         logger.info(f"Fetching pool recommendations from: {url} with params: {params}")
         
-        response = requests.post(url, params=params, headers=headers)
+        response = await get_http_client("pool_search").post(url, params=params, headers=headers)
         
         if response.status_code != 200:
             logger.error(f"External API error: {response.text}")
             raise HTTPException(status_code=response.status_code, detail=f"External API error: {response.text}")
         
         pool_data = response.json()
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Service unavailable: {str(e)}")
         raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
 
@@ -0,0 +1,210 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Iterable, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+from app.database import quiz_qa_jobs_collection, translation_collection, counters_collection
+from app.indexes import apply_indexes
+from app.utils.http_clients import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# --- Backfill configuration ---
+EXTERNAL_QUIZ_QA_URL = os.getenv("EXTERNAL_QUIZ_QA_URL", "http://localhost:8000/translations/update_quiz_qa")
+QUIZ_QA_MIN_QUESTIONS = int(os.getenv("QUIZ_QA_MIN_QUESTIONS", 15))
+QUIZ_QA_WORKER_ENABLED = os.getenv("QUIZ_QA_WORKER_ENABLED", "true").lower() == "true"
+QUIZ_QA_CONCURRENCY = int(os.getenv("QUIZ_QA_CONCURRENCY", 2))  # jobs in flight per process
+QUIZ_QA_TIMEOUT_SECONDS = float(os.getenv("QUIZ_QA_TIMEOUT_SECONDS", 120))
+QUIZ_QA_MAX_ATTEMPTS = int(os.getenv("QUIZ_QA_MAX_ATTEMPTS", 5))
+QUIZ_QA_RETRY_BACKOFF_SECONDS = float(os.getenv("QUIZ_QA_RETRY_BACKOFF_SECONDS", 60))
+QUIZ_QA_POLL_INTERVAL_SECONDS = float(os.getenv("QUIZ_QA_POLL_INTERVAL_SECONDS", 10))
+QUIZ_QA_SWEEP_INTERVAL_SECONDS = float(os.getenv("QUIZ_QA_SWEEP_INTERVAL_SECONDS", 900))
+QUIZ_QA_SWEEP_BATCH = int(os.getenv("QUIZ_QA_SWEEP_BATCH", 500))
+
+# counters document holding the last translation _id the sweep reached
+_SWEEP_CURSOR_ID = "quiz_qa_sweep"
+
+# A job whose worker died is picked up again once its lease runs out
+_LEASE_SECONDS = QUIZ_QA_TIMEOUT_SECONDS + 60
+
+
+def needs_quiz_qa_backfill(doc: dict) -> bool:
+    """True when a translation has fewer than QUIZ_QA_MIN_QUESTIONS quiz questions."""
+    return len(doc.get("quiz_qa") or []) < QUIZ_QA_MIN_QUESTIONS
+
+
+async def enqueue_quiz_qa_backfill(translation_ids: Iterable, source: str = "request") -> int:
+    """
+    Adds a backfill job per translation_id. Translations that already have a job
+    (pending, running, or recently finished) are left alone.
+    Returns the number of new jobs.
+    """
+    now = datetime.now(timezone.utc)
+    operations = [
+        UpdateOne(
+            {"_id": translation_id},
+            {"$setOnInsert": {
+                "status": "pending",
+                "attempts": 0,
+                "source": source,
+                "created_at": now,
+                "next_attempt_at": now,
+            }},
+            upsert=True
+        )
+        for translation_id in dict.fromkeys(tid for tid in translation_ids if tid is not None)
+    ]
+    if not operations:
+        return 0
+    try:
+        result = await quiz_qa_jobs_collection.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error(f"Failed to enqueue quiz_qa backfill jobs: {e}")
+        return 0
+    if result.upserted_count:
+        logger.info(f"Enqueued {result.upserted_count} quiz_qa backfill job(s) from {source}")
+        quiz_qa_worker.notify()
+    return result.upserted_count
+
+
+class QuizQABackfillWorker:
+    """
+    Drains the quiz_qa_jobs collection by calling EXTERNAL_QUIZ_QA_URL, at most
+    QUIZ_QA_CONCURRENCY jobs at a time per process. Jobs are claimed atomically,
+    so several processes can share the queue. A periodic sweep enqueues
+    approved translations whose quiz_qa is still short, paging through them by
+    _id from a cursor kept in the counters collection and wrapping around at the end.
+    """
+
+    def __init__(self, concurrency: int = QUIZ_QA_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._work_loop(i)) for i in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._sweep_loop()))
+        logger.info(f"quiz_qa backfill worker started with concurrency {self.concurrency}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wakes idle workers after new jobs were enqueued."""
+        self._wakeup.set()
+
+    async def sweep(self) -> int:
+        """
+        Enqueues the next QUIZ_QA_SWEEP_BATCH approved translations, in _id order after the
+        stored cursor, whose quiz_qa has fewer than QUIZ_QA_MIN_QUESTIONS entries.
+        """
+        short_quiz = {
+            "translation_status": "Approved",
+            # quiz_qa.<n-1> is missing when quiz_qa is absent, empty or shorter than n
+            f"quiz_qa.{QUIZ_QA_MIN_QUESTIONS - 1}": {"$exists": False},
+        }
+        cursor = await counters_collection.find_one({"_id": _SWEEP_CURSOR_ID}, {"last_id": 1})
+        if cursor and cursor.get("last_id") is not None:
+            short_quiz["_id"] = {"$gt": cursor["last_id"]}
+        docs = await translation_collection.find(short_quiz, {"_id": 1}).sort("_id", ASCENDING).limit(
+            QUIZ_QA_SWEEP_BATCH
+        ).to_list(length=None)
+
+        # A short page means the end was reached: the next sweep starts over, picking up
+        # translations whose jobs have since expired from quiz_qa_jobs
+        last_id = docs[-1]["_id"] if len(docs) >= QUIZ_QA_SWEEP_BATCH else None
+        await counters_collection.update_one(
+            {"_id": _SWEEP_CURSOR_ID},
+            {"$set": {"last_id": last_id, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        return await enqueue_quiz_qa_backfill([doc["_id"] for doc in docs], source="sweep")
+
+    async def _ensure_indexes(self) -> None:
+        try:
+            await apply_indexes("quiz_qa_jobs")
+        except Exception as e:
+            logger.warning(f"Could not ensure quiz_qa_jobs indexes: {e}")
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await quiz_qa_jobs_collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": "running", "started_at": now, "lease_expires_at": now + timedelta(seconds=_LEASE_SECONDS)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _process(self, job: dict) -> None:
+        translation_id = job["_id"]
+        try:
+            response = await get_http_client("quiz_qa").post(EXTERNAL_QUIZ_QA_URL, data={"translation_id_str": str(translation_id)})
+            if response.status_code == 200:
+                logger.info(f"Successfully updated quiz_qa for translation {translation_id}")
+                await quiz_qa_jobs_collection.update_one(
+                    {"_id": translation_id},
+                    {"$set": {"status": "done", "finished_at": datetime.now(timezone.utc)},
+                     "$unset": {"lease_expires_at": "", "last_error": ""}}
+                )
+                return
+            error = f"HTTP {response.status_code}"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        attempts = job.get("attempts", 1)
+        now = datetime.now(timezone.utc)
+        if attempts >= QUIZ_QA_MAX_ATTEMPTS:
+            logger.error(f"Giving up on quiz_qa for translation {translation_id} after {attempts} attempts: {error}")
+            update = {"status": "failed", "finished_at": now, "last_error": error}
+        else:
+            delay = QUIZ_QA_RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1))
+            logger.warning(f"quiz_qa update for translation {translation_id} failed (attempt {attempts}), retrying in {delay}s: {error}")
+            update = {"status": "pending", "next_attempt_at": now + timedelta(seconds=delay), "last_error": error}
+        await quiz_qa_jobs_collection.update_one({"_id": translation_id}, {"$set": update, "$unset": {"lease_expires_at": ""}})
+
+    async def _work_loop(self, worker_id: int) -> None:
+        while True:
+            try:
+                job = await self._claim()
+                if job:
+                    await self._process(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"quiz_qa worker {worker_id} error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=QUIZ_QA_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _sweep_loop(self) -> None:
+        # Index setup happens here rather than in start() so a slow database never delays startup
+        await self._ensure_indexes()
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"quiz_qa sweep failed: {e}")
+            await asyncio.sleep(QUIZ_QA_SWEEP_INTERVAL_SECONDS)
+
+
+quiz_qa_worker = QuizQABackfillWorker()
@@ -0,0 +1,298 @@
+import os
+import random
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+
+from pymongo import ASCENDING, InsertOne, UpdateOne
+
+from app.database import translation_collection, translation_samples_collection, counters_collection
+from app.indexes import apply_indexes
+
+logger = logging.getLogger(__name__)
+
+# "aggregate" (default) keeps the $group/$sample pipeline; "random_key" samples the indexed
+# translation_samples collection, falling back to the pipeline for partitions not built yet.
+# random_key trades reads for writes: every sample (each game start) also issues one
+# unordered bulk write re-keying the picked entries, run in the background
+RANDOM_SAMPLING_ENGINE = os.getenv("RANDOM_SAMPLING_ENGINE", "aggregate").strip().lower()
+# Without change streams, built partitions are rebuilt this often instead
+SAMPLING_REBUILD_SECONDS = float(os.getenv("SAMPLING_REBUILD_SECONDS", 3600))
+# Pools up to this size are sampled from a single index-only read instead of per-item seeks
+_SMALL_POOL = 200
+_MAX_SEEK_ROUNDS = 4
+
+
+def _org_key(org_id) -> str:
+    """Public content (org_id missing, None or "") shares the "" org."""
+    return str(org_id) if org_id else ""
+
+
+def _counter_id(org_key: str, language: str) -> str:
+    return f"translation_samples|{org_key}|{language}"
+
+
+def _translation_org_filter(org_key: str) -> dict:
+    if org_key:
+        return {"org_id": org_key}
+    return {"$or": [{"org_id": {"$exists": False}}, {"org_id": None}, {"org_id": ""}]}
+
+
+class RandomKeySampler:
+    """
+    Random sampling of approved translations, deduplicated by object_name, through
+    translation_samples: one document per (org, language, object_name) holding a
+    representative translation_id and a random_key, indexed on
+    (org_key, language, random_key).
+
+    Each pick is one index seek to the first random_key >= r, so N items cost N
+    O(log n) seeks. The pool size of a partition is kept in the counters collection,
+    whose presence also marks the partition as built. Picked entries get a fresh
+    random_key, so gaps in the key space do not keep favouring the same items; that is
+    one background bulk write of `count` updates per sample.
+
+    Kept current from the translations change stream; where change streams are
+    unavailable, built partitions are rebuilt every SAMPLING_REBUILD_SECONDS.
+    """
+
+    def __init__(self):
+        self._watch_task: Optional[asyncio.Task] = None
+        # Referenced until done so pending re-keys are not garbage collected mid-flight
+        self._rekeys: Set[asyncio.Task] = set()
+        self.samples = 0
+        self.fallbacks = 0
+        self.seeks = 0
+        self.changes_applied = 0
+
+    async def ensure_indexes(self) -> None:
+        await apply_indexes("translation_samples", "translations")
+
+    # --- Sampling ---
+    async def pool_size(self, org_id: Optional[str], language: str) -> Optional[int]:
+        """Number of distinct object names available, or None if the partition is not built."""
+        counter = await counters_collection.find_one({"_id": _counter_id(_org_key(org_id), language)}, {"count": 1})
+        return max(counter.get("count", 0), 0) if counter else None
+
+    async def sample(self, org_id: Optional[str], language: Optional[str], count: int) -> Optional[List]:
+        """
+        translation_ids of up to `count` random distinct object names, or None when the
+        caller should fall back to the aggregation pipeline.
+        """
+        if not language:
+            # Without a language, dedupe spans languages; the pipeline handles that case
+            self.fallbacks += 1
+            return None
+        total = await self.pool_size(org_id, language)
+        if total is None:
+            self.fallbacks += 1
+            return None
+        self.samples += 1
+        count = min(count, total)
+        if count <= 0:
+            return []
+
+        partition = {"org_key": _org_key(org_id), "language": language}
+        if total <= _SMALL_POOL:
+            entries = await translation_samples_collection.find(
+                partition, {"_id": 1, "translation_id": 1}
+            ).to_list(length=None)
+            picked = random.sample(entries, min(count, len(entries)))
+        else:
+            picked = await self._seek(partition, count)
+
+        if picked:
+            task = asyncio.create_task(self._rekey([entry["_id"] for entry in picked]))
+            self._rekeys.add(task)
+            task.add_done_callback(self._rekeys.discard)
+        return [entry["translation_id"] for entry in picked]
+
+    async def _seek(self, partition: dict, count: int) -> List[dict]:
+        picked = {}
+        for _ in range(_MAX_SEEK_ROUNDS):
+            missing = count - len(picked)
+            if missing <= 0:
+                break
+            found = await asyncio.gather(*(self._seek_one(partition, random.random()) for _ in range(missing)))
+            for entry in found:
+                if entry is not None:
+                    picked.setdefault(entry["_id"], entry)
+        return list(picked.values())
+
+    async def _seek_one(self, partition: dict, r: float) -> Optional[dict]:
+        self.seeks += 1
+        entry = await translation_samples_collection.find_one(
+            {**partition, "random_key": {"$gte": r}}, {"_id": 1, "translation_id": 1}, sort=[("random_key", ASCENDING)]
+        )
+        if entry is None:
+            # Past the largest key: wrap around to the smallest
+            entry = await translation_samples_collection.find_one(
+                partition, {"_id": 1, "translation_id": 1}, sort=[("random_key", ASCENDING)]
+            )
+        return entry
+
+    async def _rekey(self, sample_ids: List) -> None:
+        try:
+            await translation_samples_collection.bulk_write(
+                [UpdateOne({"_id": sample_id}, {"$set": {"random_key": random.random()}}) for sample_id in sample_ids],
+                ordered=False
+            )
+        except Exception as e:
+            logger.warning(f"Sampling re-key failed: {e}")
+
+    # --- Building ---
+    async def rebuild_partition(self, org_key: str, language: str) -> int:
+        """Regenerates one (org, language) partition from the translations collection."""
+        counter_id = _counter_id(org_key, language)
+        # Unbuilt while regenerating: concurrent samples fall back to the pipeline
+        await counters_collection.delete_one({"_id": counter_id})
+        groups = await translation_collection.aggregate([
+            {"$match": {"translation_status": "Approved", "requested_language": language, **_translation_org_filter(org_key)}},
+            {"$group": {"_id": "$object_name", "translation_id": {"$min": "$_id"}}},
+        ]).to_list(length=None)
+
+        await translation_samples_collection.delete_many({"org_key": org_key, "language": language})
+        docs = [
+            InsertOne({
+                "org_key": org_key,
+                "language": language,
+                "object_name": group["_id"],
+                "translation_id": group["translation_id"],
+                "random_key": random.random(),
+            })
+            for group in groups if group["_id"]
+        ]
+        for start in range(0, len(docs), 1000):
+            await translation_samples_collection.bulk_write(docs[start:start + 1000], ordered=False)
+        await counters_collection.update_one(
+            {"_id": counter_id},
+            {"$set": {"count": len(docs), "built_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        logger.info(f"Sampling partition ({org_key or 'public'}, {language}) built with {len(docs)} entries")
+        return len(docs)
+
+    async def rebuild_all(self) -> int:
+        """Builds every (org, language) partition that has approved translations."""
+        pairs = await translation_collection.aggregate([
+            {"$match": {"translation_status": "Approved", "requested_language": {"$nin": [None, ""]}}},
+            {"$group": {"_id": {"org_id": "$org_id", "language": "$requested_language"}}},
+        ]).to_list(length=None)
+        partitions = {(_org_key(pair["_id"].get("org_id")), pair["_id"]["language"]) for pair in pairs}
+        for org_key, language in sorted(partitions):
+            await self.rebuild_partition(org_key, language)
+        return len(partitions)
+
+    async def _rebuild_built(self) -> None:
+        counters = await counters_collection.find(
+            {"_id": {"$regex": "^translation_samples\\|"}}, {"_id": 1}
+        ).to_list(length=None)
+        for counter in counters:
+            _, org_key, language = counter["_id"].split("|", 2)
+            await self.rebuild_partition(org_key, language)
+
+    # --- Incremental maintenance ---
+    async def apply_change(self, translation_id, doc: Optional[dict]) -> None:
+        """Brings translation_samples in line with one translation's current state (None if deleted)."""
+        approved = bool(doc) and doc.get("translation_status") == "Approved" \
+            and bool(doc.get("requested_language")) and bool(doc.get("object_name"))
+        key = (_org_key(doc.get("org_id")), doc.get("requested_language"), doc.get("object_name")) if approved else None
+
+        current = await translation_samples_collection.find_one({"translation_id": translation_id})
+        if current and (current["org_key"], current["language"], current["object_name"]) != key:
+            await self._reelect(current, exclude=translation_id)
+        if key:
+            result = await translation_samples_collection.update_one(
+                {"org_key": key[0], "language": key[1], "object_name": key[2]},
+                {"$setOnInsert": {"translation_id": translation_id, "random_key": random.random()}},
+                upsert=True
+            )
+            if result.upserted_id is not None:
+                # Only built partitions keep a counter; unbuilt ones stay on the pipeline fallback
+                await counters_collection.update_one({"_id": _counter_id(key[0], key[1])}, {"$inc": {"count": 1}})
+        self.changes_applied += 1
+
+    async def _reelect(self, entry: dict, exclude) -> None:
+        """Points a sample entry at another approved translation of its group, or drops it."""
+        replacement = await translation_collection.find_one(
+            {
+                "translation_status": "Approved",
+                "requested_language": entry["language"],
+                "object_name": entry["object_name"],
+                "_id": {"$ne": exclude},
+                **_translation_org_filter(entry["org_key"]),
+            },
+            {"_id": 1},
+            sort=[("_id", ASCENDING)]
+        )
+        if replacement:
+            await translation_samples_collection.update_one(
+                {"_id": entry["_id"]}, {"$set": {"translation_id": replacement["_id"]}}
+            )
+            return
+        result = await translation_samples_collection.delete_one({"_id": entry["_id"]})
+        if result.deleted_count:
+            await counters_collection.update_one(
+                {"_id": _counter_id(entry["org_key"], entry["language"])}, {"$inc": {"count": -1}}
+            )
+
+    async def start(self) -> None:
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._maintain())
+
+    async def stop(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+        # Let in-flight re-keys finish; they are single bulk writes
+        await asyncio.gather(*self._rekeys, return_exceptions=True)
+
+    async def _maintain(self) -> None:
+        try:
+            await self.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Sampling index creation failed: {e}")
+        if await self._watch_changes():
+            return
+        while True:
+            await asyncio.sleep(SAMPLING_REBUILD_SECONDS)
+            try:
+                await self._rebuild_built()
+            except Exception as e:
+                logger.warning(f"Sampling partition rebuild failed: {e}")
+
+    async def _watch_changes(self) -> bool:
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+            {"$project": {
+                "operationType": 1, "documentKey": 1,
+                "fullDocument.org_id": 1, "fullDocument.requested_language": 1,
+                "fullDocument.translation_status": 1, "fullDocument.object_name": 1,
+            }},
+        ]
+        try:
+            async with translation_collection.watch(pipeline, full_document="updateLookup") as stream:
+                async for change in stream:
+                    try:
+                        await self.apply_change(change["documentKey"]["_id"], change.get("fullDocument"))
+                    except Exception as e:
+                        logger.warning(f"Sampling update failed for {change['documentKey']['_id']}: {e}")
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Sampling change notifications unavailable, using periodic rebuilds: {e}")
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "engine": RANDOM_SAMPLING_ENGINE,
+            "samples": self.samples,
+            "fallbacks": self.fallbacks,
+            "seeks": self.seeks,
+            "changes_applied": self.changes_applied,
+        }
+
+
+random_sampler = RandomKeySampler()
@@ -1,4 +1,3 @@
-import google.generativeai as genai
 import os
 import re
 import logging
@@ -7,66 +6,45 @@ from typing import List, Optional
 from dotenv import load_dotenv
 from app.database import translation_collection
 from app.routers.languages import get_language_code, translate_text
+from app.services.embeddings import query_embeddings
+from app.services.vector_index import VECTOR_SEARCH_ENGINE, vector_index, to_object_id, sample_hits
+from app.services.candidate_pools import CandidatePool, candidate_pools, pool_key
+from app.services.random_sampling import RANDOM_SAMPLING_ENGINE, random_sampler
+from app.services.catalog import TRANSLATION_CATALOG_ENABLED, translation_catalog
+from app.services.taxonomy import taxonomy_index
 
 load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/gemini-embedding-001")
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    logger.warning("GEMINI_API_KEY not found in environment variables")
 
 
 
-
-
-def get_text_embedding(text: str) -> Optional[List[float]]:
-    """Fetch embedding vector from Gemini API."""
+async def get_text_embedding(text: str) -> Optional[List[float]]:
+    """Embedding vector for a search text, from the embedding cache or the configured provider."""
     if not text:
         return None
-    try:
-        resp = genai.embed_content(
-            model=EMBEDDING_MODEL,
-            content=text
-        )
-        return resp.get("embedding")
-    except Exception as e:
-        logger.error(f"❌ Embedding generation failed: {e}")
-        return None
+    return await query_embeddings.embed(text)
 
-async def get_vector_search_results(
-    count: int,
-    search_text: str,
-    language: Optional[str] = None,
-    org_id: Optional[str] = None
-) -> list:
-    """
-    Perform vector search using search_text on translation_collection.
-    Matches embedding_vector of translations.
-    """
-    logger.info(f"Performing vector search for '{search_text}' in language '{language}'")
-    
-    # Translate search text to requested language if language is provided
-    # Source language is unknown, so we ensure query and index match by translating.
-    if language:
-        logger.info(f"Translating search_text to {language}")
-        actual_search_text = await translate_text(search_text, language)
-    else:
-        actual_search_text = search_text
+# Same pool size as the pre-filtered $vectorSearch: only the best matches are sampled from
+LOCAL_VECTOR_POOL_SIZE = 5000
 
-    # 1. Generate embedding for the search text
-    query_vector = get_text_embedding(actual_search_text)
-    
-    if not query_vector:
-        logger.warning("Failed to generate embedding for search text. Returning empty list.")
-        return []
+VECTOR_RESULT_PROJECTION = {
+    "_id": 1,
+    "requested_language": 1,
+    "object_id": 1,
+    "object_name": 1,
+    "object_description": 1,
+    "object_hint": 1,
+    "object_short_hint": 1,
+    "quiz_qa": 1,
+    "up_votes": 1,
+    "down_votes": 1,
+}
 
-    # 2. Build Filter query
+
+def _vector_filter(language: Optional[str], org_id: Optional[str]) -> dict:
     # We want to filter by org_id (if present), language (if present), and approved status
     filter_query = {
         "translation_status": "Approved"
@@ -84,11 +62,11 @@ async def get_vector_search_results(
             {"org_id": None},
             {"org_id": ""}
         ]
+    return filter_query
 
-    # Get threshold from env
-    threshold = float(os.getenv("SIMILARITY_THRESHOLD", 0.7))
 
-    # 3. Vector Search Pipeline
+async def _atlas_candidate_pool(query_vector: List[float], filter_query: dict, threshold: float) -> Optional[CandidatePool]:
+    """Every (id, score) above threshold among the $vectorSearch candidates, best first."""
     # PRE-FILTERING (Preferred): Restores 'filter' inside $vectorSearch for better randomization.
     # FALLBACK: If the index isn't updated, we catch the "Path needs to be indexed as filter" error
     # and retry with post-filtering.
@@ -116,56 +94,88 @@ async def get_vector_search_results(
         if not use_pre_filter:
             stages.append({"$match": filter_query})
             
-        # Add filtering by score threshold and sampling
+        # Keep only ids and scores above the threshold; sampling happens in-process
         stages.extend([
-            {
-                 "$addFields": { 
-                     "score": {"$meta": "vectorSearchScore"} 
-                 }
-            },
-            {
-                "$match": { 
-                    "score": {"$gte": threshold} 
-                }
-            },
-            {
-                "$sample": {"size": count} # Pick random items from the candidate pool
-            },
-            {
-                "$project": {
-                    "_id": 0,
-                    "translation_id": "$_id",
-                    "requested_language": 1,
-                    "object_id": 1,
-                    "object_name": 1,
-                    "object_description": 1,
-                    "object_hint": 1,
-                    "object_short_hint": 1,
-                    "quiz_qa": 1,
-                    "up_votes": 1,
-                    "down_votes": 1,
-                    "score": 1
-                }
-            }
+            {"$project": {"_id": 1, "score": {"$meta": "vectorSearchScore"}}},
+            {"$match": {"score": {"$gte": threshold}}},
         ])
         return stages
 
     try:
         # Step A: Try with efficient Pre-Filtering
         pipeline = get_pipeline(use_pre_filter=True)
-        results = await translation_collection.aggregate(pipeline).to_list(length=count)
+        docs = await translation_collection.aggregate(pipeline).to_list(length=None)
     except Exception as e:
         error_msg = str(e)
         if "needs to be indexed as filter" in error_msg:
             logger.warning(f"⚠️ Pre-filtering failed (index not updated). Falling back to post-filtering. Error: {error_msg}")
             # Step B: Fallback to Post-Filtering
             pipeline = get_pipeline(use_pre_filter=False)
-            results = await translation_collection.aggregate(pipeline).to_list(length=count)
+            docs = await translation_collection.aggregate(pipeline).to_list(length=None)
         else:
             logger.error(f"❌ Vector search aggregation failed: {e}")
-            return []
+            return None
+    return [(str(doc["_id"]), doc["score"]) for doc in docs]
+
+
+async def _hydrate_hits(chosen: CandidatePool, filter_query: dict) -> list:
+    """Fetches the sampled translations in result shape, with their search score."""
+    scores = dict(chosen)
+    # Re-applying the filter drops anything that stopped qualifying since the pool was built
+    docs = await translation_collection.find(
+        {**filter_query, "_id": {"$in": [to_object_id(doc_id) for doc_id in scores]}},
+        VECTOR_RESULT_PROJECTION
+    ).to_list(length=len(scores))
+    for doc in docs:
+        doc["translation_id"] = doc.pop("_id")
+        doc["score"] = scores.get(str(doc["translation_id"]))
+    return docs
+
+
+async def get_vector_search_results(
+    count: int,
+    search_text: str,
+    language: Optional[str] = None,
+    org_id: Optional[str] = None
+) -> list:
+    """
+    Perform vector search using search_text on translation_collection.
+    Matches embedding_vector of translations.
+
+    The qualifying candidate pool is cached per (search text, language, org, threshold);
+    each request samples `count` ids from it and fetches only those documents.
+    """
+    logger.info(f"Performing vector search for '{search_text}' in language '{language}'")
+    filter_query = _vector_filter(language, org_id)
+
+    # Get threshold from env
+    threshold = float(os.getenv("SIMILARITY_THRESHOLD", 0.7))
+
+    async def load_pool() -> Optional[CandidatePool]:
+        # Translate search text to requested language if language is provided
+        # Source language is unknown, so we ensure query and index match by translating.
+        if language:
+            logger.info(f"Translating search_text to {language}")
+            actual_search_text = await translate_text(search_text, language)
+        else:
+            actual_search_text = search_text
+
+        # 1. Generate embedding for the search text
+        query_vector = await get_text_embedding(actual_search_text)
+        
+        if not query_vector:
+            logger.warning("Failed to generate embedding for search text. Returning empty list.")
+            return None
+
+        # 2. Score candidates with the configured engine
+        if VECTOR_SEARCH_ENGINE == "local":
+            return await vector_index.search(query_vector, org_id, language, threshold, LOCAL_VECTOR_POOL_SIZE)
+        return await _atlas_candidate_pool(query_vector, filter_query, threshold)
 
-    logger.info(f"Vector search returned {len(results)} results")
+    pool = await candidate_pools.get_or_load(pool_key(search_text, language, org_id, threshold), load_pool)
+    results = await _hydrate_hits(sample_hits(pool, count), filter_query) if pool else []
+
+    logger.info(f"Vector search returned {len(results)} results from a pool of {len(pool)}")
     
     # Shuffle the final sub-set to ensure random visual order
     random.shuffle(results)
@@ -173,6 +183,54 @@ async def get_vector_search_results(
     return results
 
 
+async def hydrate_translations(translation_ids: list) -> list:
+    """Fetches picked translations in result shape (translation_id instead of _id), shuffled."""
+    if not translation_ids:
+        return []
+    docs = await translation_collection.find(
+        {"_id": {"$in": translation_ids}, "translation_status": "Approved"},
+        VECTOR_RESULT_PROJECTION
+    ).to_list(length=len(translation_ids))
+    for doc in docs:
+        doc["translation_id"] = doc.pop("_id")
+    random.shuffle(docs)
+    return docs
+
+
+def _pick_from_catalog(
+    count: int,
+    language: Optional[str],
+    org_id: Optional[str],
+    category: Optional[str],
+    field_of_study: Optional[str],
+    object_ids: Optional[list]
+) -> Optional[list]:
+    """
+    translation_ids picked from the in-memory catalog with the same priorities and dedupe
+    as the database path, or None to use the database path.
+    """
+    partition = translation_catalog.partition(org_id, language)
+    if partition is None:
+        return None
+    if object_ids:
+        picked = partition.pick_objects(count, object_ids)
+    elif field_of_study or category:
+        # Catalog codes come from object metadata; names it doesn't know (e.g. free text
+        # matched against embedding_text) keep using the regex path
+        code = translation_catalog.code(field_of_study or category)
+        if code is None:
+            return None
+        if field_of_study:
+            picked = partition.pick_names(count, field_of_study=code)
+        else:
+            picked = partition.pick_names(count, category=code)
+        if not picked:
+            return None
+    else:
+        picked = partition.pick_names(count)
+    return [entry.translation_id for entry in picked]
+
+
 async def get_random_picture_details(
     count: int,
     language: Optional[str] = None,
@@ -193,6 +251,14 @@ async def get_random_picture_details(
     
     print(f"\n⏰ Inside get_random_picture_details: Requested language: {language}, Org ID: {org_id}")
 
+    # Read-heavy deployments pick from the in-memory catalog and fetch only the chosen documents
+    if TRANSLATION_CATALOG_ENABLED and (object_ids or field_of_study or category or not search_text):
+        translation_ids = _pick_from_catalog(count, language, org_id, category, field_of_study, object_ids)
+        if translation_ids is not None:
+            docs = await hydrate_translations(translation_ids)
+            logger.info(f"Picked {len(docs)} documents from the translation catalog")
+            return docs
+
     # Initialize base queries
     base_query = {"translation_status": "Approved"}
 
@@ -206,29 +272,39 @@ async def get_random_picture_details(
         logger.info(f"Priority 1: Filtering by explicit object_ids: {len(object_ids)} IDs")
     
 
-    # Priority 2: field_of_study (optimized fuzzy match)
+    # Priority 2: field_of_study (indexed taxonomy match, fuzzy match for unknown terms)
     elif field_of_study:
-        # Translate field_of_study to target language if provided
-        actual_fos = field_of_study
-        if language:
-            logger.info(f"Translating field_of_study '{field_of_study}' to {language}")
-            actual_fos = await translate_text(field_of_study, language)
-        
-        base_query["embedding_text"] = {"$regex": re.escape(actual_fos), "$options": "i"}
         group_key = "$object_name"
-        logger.info(f"Priority 3: Filtering by field_of_study '{actual_fos}' (translated from '{field_of_study}') in embedding_text")
+        fos_id = await taxonomy_index.resolve("field_of_study", field_of_study)
+        if fos_id:
+            base_query["taxonomy_ids"] = fos_id
+            logger.info(f"Priority 3: Filtering by field_of_study taxonomy id '{fos_id}'")
+        else:
+            # Translate field_of_study to target language if provided
+            actual_fos = field_of_study
+            if language:
+                logger.info(f"Translating field_of_study '{field_of_study}' to {language}")
+                actual_fos = await translate_text(field_of_study, language)
+            
+            base_query["embedding_text"] = {"$regex": re.escape(actual_fos), "$options": "i"}
+            logger.info(f"Priority 3: Filtering by field_of_study '{actual_fos}' (translated from '{field_of_study}') in embedding_text")
         
-    # Priority 3: category (optimized fuzzy match)
+    # Priority 3: category (indexed taxonomy match, fuzzy match for unknown terms)
     elif category:
-        # Translate category to target language if provided
-        actual_cat = category
-        if language:
-            logger.info(f"Translating category '{category}' to {language}")
-            actual_cat = await translate_text(category, language)
-            
-        base_query["embedding_text"] = {"$regex": re.escape(actual_cat), "$options": "i"}
         group_key = "$object_name"
-        logger.info(f"Priority 4: Filtering by category '{actual_cat}' (translated from '{category}') in embedding_text")
+        category_id = await taxonomy_index.resolve("category", category)
+        if category_id:
+            base_query["taxonomy_ids"] = category_id
+            logger.info(f"Priority 4: Filtering by category taxonomy id '{category_id}'")
+        else:
+            # Translate category to target language if provided
+            actual_cat = category
+            if language:
+                logger.info(f"Translating category '{category}' to {language}")
+                actual_cat = await translate_text(category, language)
+                
+            base_query["embedding_text"] = {"$regex": re.escape(actual_cat), "$options": "i"}
+            logger.info(f"Priority 4: Filtering by category '{actual_cat}' (translated from '{category}') in embedding_text")
     
     # Priority 4: search_text (Vector Search)
     elif search_text:
@@ -255,6 +331,13 @@ async def get_random_picture_details(
     
     print("\n^^^^^^^^^^base_query: ", base_query)
 
+    # Default (unfiltered) requests can be served by index seeks on translation_samples
+    if RANDOM_SAMPLING_ENGINE == "random_key" and not (object_ids or field_of_study or category):
+        translation_ids = await random_sampler.sample(org_id, language, count)
+        if translation_ids is not None:
+            docs = await hydrate_translations(translation_ids)
+            logger.info(f"Sampled {len(docs)} random documents by random key")
+            return docs
 
     # 6) Count distinct items
     # Extract field name from group_key (strip leading $)
@@ -0,0 +1,324 @@
+import os
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateMany, UpdateOne
+
+from app.database import taxonomy_collection, translation_collection, objects_collection, counters_collection
+from app.indexes import apply_indexes
+from app.services.translation_memo import normalize_text
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_REFRESH_SECONDS = float(os.getenv("TAXONOMY_REFRESH_SECONDS", 300))
+# Without change streams, translations still missing taxonomy_ids are picked up this often
+TAXONOMY_SWEEP_SECONDS = float(os.getenv("TAXONOMY_SWEEP_SECONDS", 300))
+
+# Taxonomy kind -> source field in objects.metadata
+TAXONOMY_KINDS = {
+    "category": "object_category",
+    "field_of_study": "field_of_study",
+}
+_SWEEP_BATCH = 1000
+# counters document written once backfill() has tagged every translation
+TAXONOMY_BACKFILL_MARKER = "taxonomy_backfill"
+
+
+def taxonomy_id(kind: str, name: Optional[str]) -> Optional[str]:
+    """Canonical id of a category / field of study, e.g. "category:fruits"."""
+    key = normalize_text(name or "")
+    return f"{kind}:{key}" if key else None
+
+
+def taxonomy_ids_for(metadata: Optional[dict]) -> List[str]:
+    """The taxonomy_ids a translation of an object with this metadata carries."""
+    metadata = metadata or {}
+    ids = (taxonomy_id(kind, metadata.get(field)) for kind, field in TAXONOMY_KINDS.items())
+    return [term_id for term_id in ids if term_id]
+
+
+def object_id_variants(object_id) -> list:
+    # translations reference objects by ObjectId, older ones by its string form
+    if isinstance(object_id, ObjectId):
+        return [object_id, str(object_id)]
+    if ObjectId.is_valid(str(object_id)):
+        return [ObjectId(str(object_id)), str(object_id)]
+    return [object_id]
+
+
+class TaxonomyIndex:
+    """
+    Canonical category / field-of-study ids for translations.
+
+    Every translation carries `taxonomy_ids`, derived from its object's metadata, indexed
+    together with (org_id, requested_language, translation_status), so filtering by a
+    category is an indexed equality match. The taxonomy collection holds one document per
+    term with its English name and labels precomputed per language code; requests can name
+    a term either way without a translation call.
+
+    Terms are only resolved once backfill() has tagged every translation and recorded the
+    TAXONOMY_BACKFILL_MARKER counter; until then filtering by taxonomy_ids would only match
+    the translations tagged so far, so callers keep their regex path.
+    """
+
+    def __init__(self):
+        self._by_term: Dict[Tuple[str, str], str] = {}
+        self._terms: Dict[str, dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._backfilled = False
+        self._lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+
+        self.resolved = 0
+        self.unresolved = 0
+        self.not_backfilled = 0
+        self.translations_updated = 0
+
+    # --- Lookups ---
+    async def resolve(self, kind: str, term: Optional[str]) -> Optional[str]:
+        """
+        Taxonomy id for an English name or localized label of the given kind, or None if
+        unknown or the backfill has not completed yet.
+        """
+        if not term:
+            return None
+        await self._ensure_fresh()
+        if not self._backfilled:
+            self.not_backfilled += 1
+            return None
+        term_id = self._by_term.get((kind, normalize_text(term)))
+        if term_id:
+            self.resolved += 1
+        else:
+            self.unresolved += 1
+        return term_id
+
+    async def ready(self) -> bool:
+        """Whether every translation carries taxonomy_ids (the backfill has completed)."""
+        await self._ensure_fresh()
+        return self._backfilled
+
+    async def terms(self, kind: Optional[str] = None) -> List[dict]:
+        await self._ensure_fresh()
+        return [term for term in self._terms.values() if kind is None or term["kind"] == kind]
+
+    async def _ensure_fresh(self) -> None:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > TAXONOMY_REFRESH_SECONDS:
+            async with self._lock:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at > TAXONOMY_REFRESH_SECONDS:
+                    await self.refresh()
+
+    async def refresh(self) -> None:
+        try:
+            docs = await taxonomy_collection.find({}).to_list(length=None)
+            marker = await counters_collection.find_one({"_id": TAXONOMY_BACKFILL_MARKER}, {"_id": 1})
+        except Exception as e:
+            logger.warning(f"Taxonomy refresh failed: {e}")
+            docs = None
+        self._loaded_at = time.monotonic()
+        if docs is None:
+            return
+        self._backfilled = marker is not None
+        by_term = {}
+        for doc in docs:
+            for label in [doc["name"], *(doc.get("labels") or {}).values()]:
+                if label:
+                    by_term.setdefault((doc["kind"], normalize_text(label)), doc["_id"])
+        self._by_term, self._terms = by_term, {doc["_id"]: doc for doc in docs}
+
+    # --- Maintenance ---
+    async def ensure_indexes(self) -> None:
+        await apply_indexes("translations", "taxonomy")
+
+    async def _register_terms(self, metadata_docs: Iterable[Optional[dict]]) -> None:
+        operations = {}
+        for metadata in metadata_docs:
+            for kind, field in TAXONOMY_KINDS.items():
+                name = (metadata or {}).get(field)
+                term_id = taxonomy_id(kind, name)
+                if term_id and term_id not in self._terms and term_id not in operations:
+                    operations[term_id] = UpdateOne(
+                        {"_id": term_id},
+                        {"$setOnInsert": {"kind": kind, "name": name.strip(), "labels": {"en": name.strip()}}},
+                        upsert=True
+                    )
+        if operations:
+            await taxonomy_collection.bulk_write(list(operations.values()), ordered=False)
+
+    async def sync_objects(self, objects: List[dict]) -> int:
+        """Sets taxonomy_ids on the translations of the given objects ({_id, metadata}); returns docs changed."""
+        await self._register_terms(obj.get("metadata") for obj in objects)
+        operations = [
+            UpdateMany(
+                {"object_id": {"$in": object_id_variants(obj["_id"])}, "taxonomy_ids": {"$ne": ids}},
+                {"$set": {"taxonomy_ids": ids}}
+            )
+            for obj in objects
+            for ids in [taxonomy_ids_for(obj.get("metadata"))]
+        ]
+        if not operations:
+            return 0
+        result = await translation_collection.bulk_write(operations, ordered=False)
+        self.translations_updated += result.modified_count
+        return result.modified_count
+
+    async def backfill(self, only_missing: bool = False) -> int:
+        """
+        Recomputes taxonomy_ids for every translation (or only those without any), object by
+        object. Returns the number of translations changed.
+        """
+        if only_missing:
+            object_ids = await translation_collection.distinct("object_id", {"taxonomy_ids": {"$exists": False}})
+            query = {"_id": {"$in": [oid for value in object_ids for oid in object_id_variants(value)]}}
+        else:
+            query = {}
+        changed, batch = 0, []
+        async for obj in objects_collection.find(query, {"_id": 1, "metadata": 1}, batch_size=500):
+            batch.append(obj)
+            if len(batch) >= 200:
+                changed += await self.sync_objects(batch)
+                batch = []
+        if batch:
+            changed += await self.sync_objects(batch)
+        await counters_collection.update_one(
+            {"_id": TAXONOMY_BACKFILL_MARKER},
+            {"$set": {"completed_at": datetime.now(timezone.utc), "only_missing": only_missing}},
+            upsert=True
+        )
+        await self.refresh()
+        logger.info(f"Taxonomy backfill updated {changed} translations")
+        return changed
+
+    async def localize(self, languages: Iterable[Tuple[str, str]]) -> int:
+        """
+        Precomputes labels for (language_name, iso_code) pairs: one batched translation call
+        per language for the terms that have no label in it yet. Returns labels written.
+        """
+        # Imported here: the languages router imports services that import this module
+        from app.routers.languages import translate_texts
+
+        await self.refresh()
+        written = 0
+        for language_name, iso_code in languages:
+            if not iso_code:
+                continue
+            code = iso_code.lower()
+            missing = [term for term in self._terms.values() if code not in (term.get("labels") or {})]
+            if not missing:
+                continue
+            if code in ("en", "eng"):
+                labels = [term["name"] for term in missing]
+            else:
+                labels = await translate_texts([term["name"] for term in missing], language_name)
+            await taxonomy_collection.bulk_write([
+                UpdateOne({"_id": term["_id"]}, {"$set": {f"labels.{code}": label}})
+                for term, label in zip(missing, labels)
+            ], ordered=False)
+            written += len(missing)
+        await self.refresh()
+        logger.info(f"Taxonomy localized {written} labels")
+        return written
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._watch_objects()),
+                asyncio.create_task(self._watch_translations()),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _watch_objects(self) -> None:
+        try:
+            async with objects_collection.watch(
+                [
+                    {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+                    {"$project": {"documentKey": 1, "fullDocument.metadata": 1}},
+                ],
+                full_document="updateLookup"
+            ) as stream:
+                async for change in stream:
+                    doc = change.get("fullDocument")
+                    if doc is not None:
+                        await self._sync_safely([{"_id": change["documentKey"]["_id"], "metadata": doc.get("metadata")}])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Taxonomy object notifications unavailable; run the taxonomy backfill after metadata edits: {e}")
+
+    async def _watch_translations(self) -> None:
+        try:
+            async with translation_collection.watch(
+                [
+                    # New translations, or ones re-pointed at another object; our own
+                    # taxonomy_ids writes are updates without object_id and don't match
+                    {"$match": {"$or": [
+                        {"operationType": {"$in": ["insert", "replace"]}},
+                        {"updateDescription.updatedFields.object_id": {"$exists": True}},
+                    ]}},
+                    {"$project": {"documentKey": 1, "fullDocument.object_id": 1}},
+                ],
+                full_document="updateLookup"
+            ) as stream:
+                async for change in stream:
+                    object_id = (change.get("fullDocument") or {}).get("object_id")
+                    if object_id:
+                        obj = await objects_collection.find_one(
+                            {"_id": {"$in": object_id_variants(object_id)}}, {"_id": 1, "metadata": 1}
+                        )
+                        if obj:
+                            await self._sync_safely([obj])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Taxonomy translation notifications unavailable, sweeping periodically: {e}")
+            await self._sweep_loop()
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                object_ids = await translation_collection.find(
+                    {"taxonomy_ids": {"$exists": False}}, {"object_id": 1}
+                ).limit(_SWEEP_BATCH).to_list(length=None)
+                referenced = {str(doc["object_id"]): doc["object_id"] for doc in object_ids if doc.get("object_id")}
+                if referenced:
+                    ids = [oid for value in referenced.values() for oid in object_id_variants(value)]
+                    objects = await objects_collection.find({"_id": {"$in": ids}}, {"_id": 1, "metadata": 1}).to_list(length=None)
+                    found = {str(obj["_id"]) for obj in objects}
+                    # Translations of deleted objects get an empty list, so the sweep moves past them
+                    objects += [{"_id": value, "metadata": None} for key, value in referenced.items() if key not in found]
+                    await self._sync_safely(objects)
+            except Exception as e:
+                logger.warning(f"Taxonomy sweep failed: {e}")
+            await asyncio.sleep(TAXONOMY_SWEEP_SECONDS)
+
+    async def _sync_safely(self, objects: List[dict]) -> None:
+        try:
+            await self.sync_objects(objects)
+        except Exception as e:
+            logger.warning(f"Taxonomy sync failed for {len(objects)} object(s): {e}")
+
+    def stats(self) -> dict:
+        counts = defaultdict(int)
+        for term in self._terms.values():
+            counts[term["kind"]] += 1
+        return {
+            "terms": dict(counts),
+            "resolved": self.resolved,
+            "unresolved": self.unresolved,
+            "backfilled": self._backfilled,
+            "not_backfilled": self.not_backfilled,
+            "translations_updated": self.translations_updated,
+        }
+
+
+taxonomy_index = TaxonomyIndex()
@@ -0,0 +1,185 @@
+import os
+import csv
+import json
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.database import translation_memo_collection
+from app.indexes import apply_indexes
+
+logger = logging.getLogger(__name__)
+
+# --- Translation memo configuration ---
+TRANSLATION_MEMO_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMO_MAX_ENTRIES", 20000))
+TRANSLATION_MEMO_LOCAL_TTL_SECONDS = int(os.getenv("TRANSLATION_MEMO_LOCAL_TTL_SECONDS", 24 * 3600))
+# Machine translations expire from the durable store after this long; dictionary entries never do
+TRANSLATION_MEMO_TTL_SECONDS = int(os.getenv("TRANSLATION_MEMO_TTL_SECONDS", 30 * 24 * 3600))
+TRANSLATION_MEMO_PRELOAD_LIMIT = int(os.getenv("TRANSLATION_MEMO_PRELOAD_LIMIT", 10000))
+
+
+def normalize_text(text: str) -> str:
+    """Memo key form of a source string: whitespace collapsed and case-folded."""
+    return " ".join(text.split()).casefold()
+
+
+def _memo_id(text: str, lang_code: str) -> str:
+    return f"{lang_code.strip().lower()}:{normalize_text(text)}"
+
+
+class TranslationMemo:
+    """
+    Two-level cache of translations keyed by (normalized text, target language code).
+
+    Level 1 is an in-process LRU with a per-entry TTL. Level 2 is the translation_memo
+    collection, shared by all workers and surviving restarts; machine translations
+    expire there through a TTL index, dictionary-seeded entries are permanent.
+    """
+
+    def __init__(self, max_entries: int = TRANSLATION_MEMO_MAX_ENTRIES, local_ttl: int = TRANSLATION_MEMO_LOCAL_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+        self.local_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Lookups ---
+    async def get(self, text: str, lang_code: str) -> Optional[str]:
+        return (await self.get_many([text], lang_code)).get(text)
+
+    async def get_many(self, texts: Iterable[str], lang_code: str) -> Dict[str, str]:
+        """
+        Returns {text: translation} for the texts that are memoised; misses are absent.
+        Local misses are looked up in the durable store with a single query.
+        """
+        found: Dict[str, str] = {}
+        pending: Dict[str, List[str]] = {}
+        now = time.monotonic()
+        for text in texts:
+            if not text:
+                continue
+            memo_id = _memo_id(text, lang_code)
+            entry = self._entries.get(memo_id)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(memo_id)
+                self.local_hits += 1
+                found[text] = entry[0]
+            else:
+                pending.setdefault(memo_id, []).append(text)
+
+        if pending:
+            try:
+                docs = await translation_memo_collection.find(
+                    {"_id": {"$in": list(pending)}},
+                    {"translated": 1}
+                ).to_list(length=None)
+            except Exception as e:
+                logger.warning(f"Translation memo store lookup failed: {e}")
+                docs = []
+            for doc in docs:
+                self._remember(doc["_id"], doc["translated"])
+                for text in pending.pop(doc["_id"], []):
+                    self.store_hits += 1
+                    found[text] = doc["translated"]
+            self.misses += sum(len(texts) for texts in pending.values())
+        return found
+
+    # --- Writes ---
+    async def put(self, text: str, lang_code: str, translated: str, source: str = "google") -> None:
+        await self.put_many({text: translated}, lang_code, source)
+
+    async def put_many(self, translations: Dict[str, str], lang_code: str, source: str = "google") -> None:
+        """Stores {text: translation} in both levels. Dictionary entries do not expire."""
+        now = datetime.now(timezone.utc)
+        operations = []
+        for text, translated in translations.items():
+            if not text or translated is None:
+                continue
+            memo_id = _memo_id(text, lang_code)
+            self._remember(memo_id, translated)
+            fields = {
+                "text": normalize_text(text),
+                "lang_code": lang_code.strip().lower(),
+                "translated": translated,
+                "source": source,
+                "updated_at": now,
+            }
+            if source == "dictionary":
+                update = {"$set": fields, "$unset": {"expires_at": ""}}
+            else:
+                fields["expires_at"] = now + timedelta(seconds=TRANSLATION_MEMO_TTL_SECONDS)
+                update = {"$set": fields}
+            operations.append(UpdateOne({"_id": memo_id}, update, upsert=True))
+        if not operations:
+            return
+        try:
+            await translation_memo_collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning(f"Translation memo store write failed: {e}")
+
+    # --- Bulk loading ---
+    async def preload(self, lang_codes: Optional[List[str]] = None, limit: int = TRANSLATION_MEMO_PRELOAD_LIMIT) -> int:
+        """Warms the local level from the durable store, most recently updated entries first."""
+        query = {"lang_code": {"$in": [code.lower() for code in lang_codes]}} if lang_codes else {}
+        docs = await translation_memo_collection.find(query, {"translated": 1}) \
+            .sort("updated_at", -1).limit(min(limit, self.max_entries)).to_list(length=None)
+        # Oldest first, so the most recent entries end up at the LRU's fresh end
+        for doc in reversed(docs):
+            self._remember(doc["_id"], doc["translated"])
+        logger.info(f"Translation memo preloaded {len(docs)} entries")
+        return len(docs)
+
+    async def seed_from_file(self, path: str) -> int:
+        """
+        Loads an offline dictionary into the memo as permanent entries.
+        Accepts JSON ({"<lang_code>": {"<text>": "<translation>", ...}, ...})
+        or CSV with the columns text, lang_code, translation.
+        """
+        by_lang: Dict[str, Dict[str, str]] = {}
+        if path.lower().endswith(".csv"):
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    by_lang.setdefault(row["lang_code"], {})[row["text"]] = row["translation"]
+        else:
+            with open(path, encoding="utf-8") as f:
+                by_lang = json.load(f)
+
+        count = 0
+        for lang_code, translations in by_lang.items():
+            await self.put_many(translations, lang_code, source="dictionary")
+            count += len(translations)
+        logger.info(f"Translation memo seeded {count} entries from {path}")
+        return count
+
+    async def ensure_indexes(self) -> None:
+        await apply_indexes("translation_memo")
+
+    def stats(self) -> dict:
+        hits = self.local_hits + self.store_hits
+        lookups = hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+    def _remember(self, memo_id: str, translated: str) -> None:
+        self._entries[memo_id] = (translated, time.monotonic() + self.local_ttl)
+        self._entries.move_to_end(memo_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+translation_memo = TranslationMemo()
@@ -0,0 +1,471 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from bson import ObjectId, json_util
+
+from app.database import translation_collection
+
+logger = logging.getLogger(__name__)
+
+# --- Vector search configuration ---
+# "atlas" (default) uses the $vectorSearch stage; "local" answers from the in-process index below
+VECTOR_SEARCH_ENGINE = os.getenv("VECTOR_SEARCH_ENGINE", "atlas").strip().lower()
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "./vector_index")
+VECTOR_INDEX_FLUSH_SECONDS = float(os.getenv("VECTOR_INDEX_FLUSH_SECONDS", 60))
+# Full reloads keep the index current where change streams are unavailable (standalone servers)
+VECTOR_INDEX_REFRESH_SECONDS = float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", 600))
+VECTOR_SEARCH_MAX_WORKERS = int(os.getenv("VECTOR_SEARCH_MAX_WORKERS", 2))
+
+vector_search_executor = ThreadPoolExecutor(max_workers=VECTOR_SEARCH_MAX_WORKERS, thread_name_prefix="vector-search")
+# Snapshot writes are large sequential I/O; one worker keeps them off the event loop and in order
+vector_snapshot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-snapshot")
+
+_LOAD_QUERY = {"translation_status": "Approved", "embedding_vector": {"$exists": True}}
+_LOAD_PROJECTION = {"_id": 1, "org_id": 1, "requested_language": 1, "translation_status": 1, "embedding_vector": 1}
+_MIN_CAPACITY = 64
+
+PartitionKey = Tuple[str, str]
+
+
+def partition_key(org_id: Optional[str], language: Optional[str]) -> PartitionKey:
+    """(org_id, language); public content (org_id missing, None or "") shares the "" org."""
+    return (str(org_id) if org_id else "", language or "")
+
+
+def _write_partition(path: str, matrix: np.ndarray, keep: np.ndarray, ids: List[str]) -> None:
+    """Writes rows `keep` of matrix to <path>.npy / <path>.ids.json, replacing any previous snapshot atomically."""
+    out = np.lib.format.open_memmap(f"{path}.npy.tmp", mode="w+", dtype=np.float32, shape=(len(keep), matrix.shape[1]))
+    out[:] = matrix[keep]
+    out.flush()
+    del out
+    with open(f"{path}.ids.json.tmp", "w") as f:
+        json.dump(ids, f)
+    os.replace(f"{path}.npy.tmp", f"{path}.npy")
+    os.replace(f"{path}.ids.json.tmp", f"{path}.ids.json")
+
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(json_util.dumps(manifest))
+    os.replace(tmp_path, path)
+
+
+def _unit(vector: Sequence[float]) -> Optional[np.ndarray]:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    if array.ndim != 1 or not norm or not np.isfinite(norm):
+        return None
+    return array / norm
+
+
+class VectorPartition:
+    """
+    Unit-normalized float32 vectors of one (org, language) partition, stored row-wise in
+    a contiguous matrix. Scores follow Atlas' cosine vectorSearchScore: (1 + cos) / 2.
+
+    Searches run on a worker thread while the event loop applies updates, so updates
+    never rearrange rows in place: removals are tombstones, growth and compaction build
+    new arrays and swap the references.
+    """
+
+    def __init__(self, dimensions: int, ids: Optional[List[str]] = None, matrix: Optional[np.ndarray] = None):
+        self.dimensions = dimensions
+        self._ids: List[Optional[str]] = list(ids or [])
+        # A snapshot loaded from disk is a read-only memmap until the first update copies it
+        self._matrix = matrix if matrix is not None else np.zeros((_MIN_CAPACITY, dimensions), dtype=np.float32)
+        self._valid = np.ones(len(self._matrix), dtype=bool)
+        self._rows: Dict[str, int] = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self.size = len(self._ids)
+        self.deleted = 0
+
+    def __len__(self) -> int:
+        return self.size - self.deleted
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def _writable(self, min_rows: int) -> None:
+        capacity = len(self._matrix)
+        if min_rows <= capacity and not isinstance(self._matrix, np.memmap):
+            return
+        new_capacity = max(_MIN_CAPACITY, capacity)
+        while new_capacity < min_rows:
+            new_capacity *= 2
+        matrix = np.zeros((new_capacity, self.dimensions), dtype=np.float32)
+        matrix[:self.size] = self._matrix[:self.size]
+        valid = np.zeros(new_capacity, dtype=bool)
+        valid[:self.size] = self._valid[:self.size]
+        self._matrix, self._valid = matrix, valid
+
+    def upsert(self, doc_id: str, vector: np.ndarray) -> None:
+        row = self._rows.get(doc_id)
+        if row is None:
+            self._writable(self.size + 1)
+            row = self.size
+            self._matrix[row] = vector
+            self._ids.append(doc_id)
+            self._rows[doc_id] = row
+            self._valid[row] = True
+            self.size += 1
+        else:
+            self._writable(self.size)
+            self._matrix[row] = vector
+
+    def remove(self, doc_id: str) -> bool:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._valid[row] = False
+        self._ids[row] = None
+        self.deleted += 1
+        if self.deleted > 1024 and self.deleted > self.size // 4:
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        keep = np.flatnonzero(self._valid[:self.size])
+        ids = [self._ids[row] for row in keep]
+        matrix = np.zeros((max(_MIN_CAPACITY, len(ids)), self.dimensions), dtype=np.float32)
+        matrix[:len(ids)] = self._matrix[keep]
+        valid = np.zeros(len(matrix), dtype=bool)
+        valid[:len(ids)] = True
+        self._ids, self._matrix, self._valid = ids, matrix, valid
+        self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        self.size, self.deleted = len(ids), 0
+
+    def search(self, query: np.ndarray, threshold: Optional[float], limit: Optional[int]) -> List[Tuple[str, float]]:
+        """(id, score) pairs with score >= threshold, best first, at most `limit` of them."""
+        size, matrix, valid, ids = self.size, self._matrix, self._valid, self._ids
+        if not size:
+            return []
+        scores = (matrix[:size] @ query + 1.0) * 0.5
+        scores[~valid[:size]] = -1.0
+        candidates = np.flatnonzero(scores >= threshold) if threshold is not None else np.flatnonzero(valid[:size])
+        if limit is not None and len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(ids[row], float(scores[row])) for row in candidates if ids[row] is not None]
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        (matrix, live rows, their ids) for _write_partition. Only the row map is copied:
+        growth and compaction swap in new matrices, so the referenced one keeps its rows.
+        A row overwritten in place meanwhile is re-applied from the saved resume token.
+        """
+        keep = np.flatnonzero(self._valid[:self.size])
+        return self._matrix, keep, [self._ids[row] for row in keep]
+
+    def save(self, path: str) -> None:
+        """Writes the live rows to <path>.npy / <path>.ids.json, replacing any previous snapshot atomically."""
+        _write_partition(path, *self.snapshot())
+
+    @classmethod
+    def load(cls, path: str) -> "VectorPartition":
+        matrix = np.load(f"{path}.npy", mmap_mode="r")
+        with open(f"{path}.ids.json") as f:
+            ids = json.load(f)
+        if len(ids) != len(matrix):
+            raise ValueError(f"Vector index snapshot {path} is inconsistent")
+        return cls(matrix.shape[1], ids, matrix)
+
+
+class LocalVectorIndex:
+    """
+    In-process vector index over the embedding_vector of approved translations,
+    partitioned by (org_id, requested_language).
+
+    Loaded from the translations collection (or from the memory-mapped snapshot in
+    VECTOR_INDEX_DIR, resuming the change stream from the token saved with it) and kept
+    current from the translations change stream. Where change streams are unavailable,
+    it is reloaded every VECTOR_INDEX_REFRESH_SECONDS instead.
+    """
+
+    def __init__(self, directory: str = VECTOR_INDEX_DIR):
+        self.directory = directory
+        self.dimensions: Optional[int] = None
+        self._partitions: Dict[PartitionKey, VectorPartition] = {}
+        self._located: Dict[str, PartitionKey] = {}
+        self._resume_token = None
+        # Partitions changed since the last snapshot
+        self._dirty: Set[PartitionKey] = set()
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+
+        self.searches = 0
+        self.updates = 0
+        self.skipped = 0
+        self.loaded_at: Optional[float] = None
+
+    # --- Queries ---
+    async def search(
+        self,
+        query_vector: Sequence[float],
+        org_id: Optional[str],
+        language: Optional[str],
+        threshold: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Threshold / top-k search within one org (public content when org_id is empty),
+        restricted to `language` when given. Returns (translation id, score), best first.
+        """
+        await self.ensure_loaded()
+        query = _unit(query_vector)
+        if query is None or self.dimensions is None or len(query) != self.dimensions:
+            return []
+        org = partition_key(org_id, None)[0]
+        partitions = [
+            partition for (p_org, p_lang), partition in self._partitions.items()
+            if p_org == org and (not language or p_lang == language)
+        ]
+        self.searches += 1
+        if not partitions:
+            return []
+
+        def run():
+            hits = [hit for partition in partitions for hit in partition.search(query, threshold, limit)]
+            if len(partitions) > 1:
+                hits.sort(key=lambda hit: hit[1], reverse=True)
+            return hits[:limit] if limit is not None else hits
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(vector_search_executor, run)
+
+    # --- Updates ---
+    def apply(self, doc: dict) -> None:
+        """Indexes, moves or drops one translation document according to its current state."""
+        doc_id = str(doc["_id"])
+        vector = doc.get("embedding_vector")
+        if doc.get("translation_status") != "Approved" or not vector:
+            self.discard(doc_id)
+            return
+        unit = _unit(vector)
+        if unit is None or (self.dimensions is not None and len(unit) != self.dimensions):
+            self.skipped += 1
+            self.discard(doc_id)
+            return
+        if self.dimensions is None:
+            self.dimensions = len(unit)
+
+        key = partition_key(doc.get("org_id"), doc.get("requested_language"))
+        previous = self._located.get(doc_id)
+        if previous is not None and previous != key:
+            self._partitions[previous].remove(doc_id)
+            self._dirty.add(previous)
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = self._partitions[key] = VectorPartition(self.dimensions)
+        partition.upsert(doc_id, unit)
+        self._located[doc_id] = key
+        self._dirty.add(key)
+        self.updates += 1
+
+    def discard(self, doc_id: str) -> None:
+        key = self._located.pop(doc_id, None)
+        if key is not None:
+            self._partitions[key].remove(doc_id)
+            self._dirty.add(key)
+            self.updates += 1
+
+    # --- Loading ---
+    async def ensure_loaded(self) -> None:
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    if not self._load_snapshot():
+                        await self.rebuild()
+
+    async def rebuild(self) -> None:
+        """Reloads every approved vector from the translations collection and swaps it in."""
+        started = time.monotonic()
+        fresh = LocalVectorIndex(self.directory)
+        async for doc in translation_collection.find(_LOAD_QUERY, _LOAD_PROJECTION, batch_size=2000):
+            fresh.apply(doc)
+        self.dimensions = fresh.dimensions
+        self._partitions, self._located = fresh._partitions, fresh._located
+        self.skipped = fresh.skipped
+        self._dirty, self._loaded = set(self._partitions), True
+        self.loaded_at = time.time()
+        logger.info(
+            f"Vector index loaded {len(self._located)} vectors in {len(self._partitions)} partitions "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def _partition_path(self, key: PartitionKey) -> str:
+        name = hashlib.sha1("\x00".join(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, name)
+
+    def _load_snapshot(self) -> bool:
+        try:
+            with open(self._manifest_path()) as f:
+                manifest = json_util.loads(f.read())
+            partitions = {
+                (entry["org_id"], entry["language"]): VectorPartition.load(os.path.join(self.directory, entry["file"]))
+                for entry in manifest["partitions"]
+            }
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Vector index snapshot unreadable, rebuilding: {e}")
+            return False
+        if not manifest.get("resume_token"):
+            # Without a change stream position the snapshot may have missed updates
+            return False
+
+        self.dimensions = manifest.get("dimensions")
+        self._partitions = partitions
+        self._located = {doc_id: key for key, partition in partitions.items() for doc_id in partition._rows}
+        self._resume_token = manifest["resume_token"]
+        self._loaded = True
+        self.loaded_at = manifest.get("saved_at")
+        logger.info(f"Vector index loaded {len(self._located)} vectors from snapshot {self.directory}")
+        return True
+
+    async def flush(self) -> None:
+        """
+        Persists the partitions changed since the last snapshot as memory-mapped .npy files,
+        plus a manifest, on vector_snapshot_executor. Skipped without a change stream
+        position, since _load_snapshot would reject the snapshot anyway.
+        """
+        if not self._dirty or self._resume_token is None:
+            return
+        async with self._lock:
+            # Captured together on the event loop, so the files match the resume token
+            dirty, self._dirty = self._dirty, set()
+            writes, entries = [], []
+            for key, partition in self._partitions.items():
+                if not len(partition):
+                    continue
+                path = self._partition_path(key)
+                if key in dirty:
+                    writes.append((path, *partition.snapshot()))
+                entries.append({"org_id": key[0], "language": key[1], "file": os.path.basename(path)})
+            manifest = {
+                "dimensions": self.dimensions,
+                "resume_token": self._resume_token,
+                "saved_at": time.time(),
+                "partitions": entries,
+            }
+
+        def write():
+            os.makedirs(self.directory, exist_ok=True)
+            for path, matrix, keep, ids in writes:
+                _write_partition(path, matrix, keep, ids)
+            _write_manifest(self._manifest_path(), manifest)
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(vector_snapshot_executor, write)
+        except BaseException:
+            # Rewritten by the next flush
+            self._dirty |= dirty
+            raise
+
+    # --- Background maintenance ---
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._maintain()),
+                asyncio.create_task(self._flush_loop()),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Vector index flush failed: {e}")
+
+    async def _maintain(self) -> None:
+        async with self._lock:
+            if not self._loaded:
+                self._load_snapshot()
+        while True:
+            if await self._watch_changes():
+                continue
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.warning(f"Vector index reload failed: {e}")
+            await asyncio.sleep(VECTOR_INDEX_REFRESH_SECONDS)
+
+    async def _watch_changes(self) -> bool:
+        """Applies translation changes until the stream ends. Returns False if streams are unavailable."""
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        try:
+            async with translation_collection.watch(
+                pipeline, full_document="updateLookup", resume_after=self._resume_token, max_await_time_ms=1000
+            ) as stream:
+                if self._resume_token is None:
+                    # Changes made while loading queue up on the already-open stream
+                    async with self._lock:
+                        await self.rebuild()
+                while True:
+                    change = await stream.try_next()
+                    # Tracks the stream position even while idle, so snapshots stay resumable
+                    self._resume_token = stream.resume_token
+                    if change is None:
+                        continue
+                    if change["operationType"] != "delete" and change.get("fullDocument"):
+                        self.apply(change["fullDocument"])
+                    else:
+                        # Deletes, and updates whose document was deleted before the lookup
+                        self.discard(str(change["documentKey"]["_id"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self._resume_token is not None:
+                # The saved position may have aged out of the oplog: watch from now and reload
+                logger.info(f"Vector index could not resume change stream, reloading: {e}")
+                self._resume_token = None
+                return True
+            logger.info(f"Vector index change notifications unavailable, using periodic reload: {e}")
+            return False
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(VECTOR_INDEX_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Vector index flush failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "engine": VECTOR_SEARCH_ENGINE,
+            "loaded": self._loaded,
+            "vectors": len(self._located),
+            "partitions": len(self._partitions),
+            "dimensions": self.dimensions,
+            "searches": self.searches,
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "change_stream": self._resume_token is not None,
+        }
+
+
+vector_index = LocalVectorIndex()
+
+
+def to_object_id(doc_id: str):
+    """Index ids are strings; translations use ObjectId keys."""
+    return ObjectId(doc_id) if ObjectId.is_valid(doc_id) else doc_id
+
+
+def sample_hits(hits: List[Tuple[str, float]], count: int) -> List[Tuple[str, float]]:
+    return random.sample(hits, count) if len(hits) > count else list(hits)
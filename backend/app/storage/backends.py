@@ -0,0 +1,264 @@
+import asyncio
+import logging
+from datetime import timedelta
+from functools import partial
+from typing import Dict, Callable, Any, AsyncIterator
+
+from botocore.exceptions import ClientError, BotoCoreError
+from google.api_core import exceptions as gcs_exceptions
+
+from app.storage import storage_config
+from app.storage.storage_config import (
+    BUCKET_NAME,
+    STORAGE_TIMEOUT_SECONDS,
+    STORAGE_MAX_RETRIES,
+    STORAGE_RETRY_BACKOFF_SECONDS,
+    STORAGE_STREAM_CHUNK_BYTES,
+    storage_executor,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StorageError(Exception):
+    """Raised when an object could not be read from the storage provider."""
+
+
+class StorageNotFoundError(StorageError):
+    """Raised when the requested object key does not exist in the bucket."""
+
+
+class StorageTimeoutError(StorageError):
+    """Raised when every attempt exceeded STORAGE_TIMEOUT_SECONDS."""
+
+
+class _RangeReader:
+    """Reads at most `length` bytes from a blocking file-like object."""
+
+    def __init__(self, raw, length: int):
+        self.raw = raw
+        self.remaining = length
+
+    def read(self, size: int) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        chunk = self.raw.read(min(size, self.remaining))
+        self.remaining -= len(chunk)
+        return chunk
+
+    def close(self) -> None:
+        self.raw.close()
+
+
+class StorageBackend:
+    """
+    Async facade over a blocking storage SDK.
+
+    Every SDK call runs on the shared bounded storage executor with a per-attempt
+    timeout; transient failures are retried with exponential backoff.
+    """
+    provider = None
+
+    def __init__(self, bucket_name: str = BUCKET_NAME):
+        self.bucket_name = bucket_name
+
+    async def get_bytes(self, object_key: str) -> bytes:
+        """Download the full object stored under object_key."""
+        return await self._run(self._get_bytes, object_key)
+
+    async def generate_url(self, object_key: str, expires_in: int) -> str:
+        """Signed GET URL for object_key, valid for expires_in seconds."""
+        # Signing may resolve credentials over the network, so it also runs off the loop
+        return await self._run(self._generate_url, object_key, expires_in)
+
+    async def put_bytes(self, object_key: str, data: bytes, content_type: str) -> None:
+        """Upload data under object_key, replacing any existing object."""
+        await self._run(self._put_bytes, object_key, data, content_type)
+
+    async def stat(self, object_key: str) -> dict:
+        """Returns {"size", "content_type"} for object_key without downloading it."""
+        return await self._run(self._stat, object_key)
+
+    async def iter_bytes(self, object_key: str, start: int, length: int) -> AsyncIterator[bytes]:
+        """
+        Streams `length` bytes of object_key starting at offset `start`, in chunks of
+        STORAGE_STREAM_CHUNK_BYTES. Only one chunk is held in memory at a time.
+        """
+        reader = _RangeReader(await self._run(self._open, object_key, start, length), length)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                chunk = await asyncio.wait_for(
+                    loop.run_in_executor(storage_executor, reader.read, STORAGE_STREAM_CHUNK_BYTES),
+                    timeout=STORAGE_TIMEOUT_SECONDS,
+                )
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await loop.run_in_executor(storage_executor, reader.close)
+
+    # --- Provider hooks (blocking, executed on the storage executor) ---
+    def _get_bytes(self, object_key: str) -> bytes:
+        raise NotImplementedError
+
+    def _put_bytes(self, object_key: str, data: bytes, content_type: str) -> None:
+        raise NotImplementedError
+
+    def _stat(self, object_key: str) -> dict:
+        raise NotImplementedError
+
+    def _open(self, object_key: str, start: int, length: int):
+        """Returns a blocking reader positioned at `start`."""
+        raise NotImplementedError
+
+    def _generate_url(self, object_key: str, expires_in: int) -> str:
+        raise NotImplementedError
+
+    def _is_not_found(self, exc: Exception) -> bool:
+        return False
+
+    def _is_retryable(self, exc: Exception) -> bool:
+        return False
+
+    async def _run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        attempts = STORAGE_MAX_RETRIES + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(storage_executor, partial(func, *args, **kwargs)),
+                    timeout=STORAGE_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                if attempt == attempts:
+                    raise StorageTimeoutError(
+                        f"{self.provider} call timed out after {attempts} attempt(s) of {STORAGE_TIMEOUT_SECONDS}s"
+                    )
+                logger.warning(f"{self.provider} call timed out (attempt {attempt}/{attempts}), retrying")
+            except Exception as e:
+                if self._is_not_found(e):
+                    raise StorageNotFoundError(str(e)) from e
+                if attempt == attempts or not self._is_retryable(e):
+                    raise
+                logger.warning(f"{self.provider} call failed (attempt {attempt}/{attempts}), retrying: {e}")
+            await asyncio.sleep(STORAGE_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+
+
+class S3StorageBackend(StorageBackend):
+    provider = "aws_s3"
+
+    def __init__(self, bucket_name: str = BUCKET_NAME):
+        super().__init__(bucket_name)
+        self.client = storage_config.s3_client or storage_config.create_s3_client()
+
+    def _get_bytes(self, object_key: str) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket_name, Key=object_key)
+        return response["Body"].read()
+
+    def _put_bytes(self, object_key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(Bucket=self.bucket_name, Key=object_key, Body=data, ContentType=content_type)
+
+    def _stat(self, object_key: str) -> dict:
+        response = self.client.head_object(Bucket=self.bucket_name, Key=object_key)
+        return {"size": response["ContentLength"], "content_type": response.get("ContentType")}
+
+    def _open(self, object_key: str, start: int, length: int):
+        response = self.client.get_object(
+            Bucket=self.bucket_name,
+            Key=object_key,
+            Range=f"bytes={start}-{start + length - 1}",
+        )
+        return response["Body"]
+
+    def _generate_url(self, object_key: str, expires_in: int) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket_name, "Key": object_key},
+            ExpiresIn=expires_in,
+        )
+
+    def _is_not_found(self, exc: Exception) -> bool:
+        if isinstance(exc, ClientError):
+            return exc.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound")
+        return False
+
+    def _is_retryable(self, exc: Exception) -> bool:
+        if isinstance(exc, ClientError):
+            error = exc.response.get("Error", {})
+            status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+            return status >= 500 or error.get("Code") in ("SlowDown", "Throttling", "RequestTimeout")
+        # Connection resets, read timeouts and similar transport errors
+        return isinstance(exc, BotoCoreError)
+
+
+class GCSStorageBackend(StorageBackend):
+    provider = "gcs"
+
+    def __init__(self, bucket_name: str = BUCKET_NAME):
+        super().__init__(bucket_name)
+        client = storage_config.gcs_client or storage_config.create_gcs_client()
+        self.bucket = client.bucket(self.bucket_name)
+
+    def _get_bytes(self, object_key: str) -> bytes:
+        # The SDK's own retry is disabled; StorageBackend._run owns the retry policy
+        return self.bucket.blob(object_key).download_as_bytes(timeout=STORAGE_TIMEOUT_SECONDS, retry=None)
+
+    def _put_bytes(self, object_key: str, data: bytes, content_type: str) -> None:
+        self.bucket.blob(object_key).upload_from_string(
+            data, content_type=content_type, timeout=STORAGE_TIMEOUT_SECONDS, retry=None
+        )
+
+    def _stat(self, object_key: str) -> dict:
+        blob = self.bucket.get_blob(object_key, timeout=STORAGE_TIMEOUT_SECONDS, retry=None)
+        if blob is None:
+            raise gcs_exceptions.NotFound(f"{object_key} not found in {self.bucket_name}")
+        return {"size": blob.size, "content_type": blob.content_type}
+
+    def _open(self, object_key: str, start: int, length: int):
+        reader = self.bucket.blob(object_key).open("rb", chunk_size=STORAGE_STREAM_CHUNK_BYTES)
+        reader.seek(start)
+        return reader
+
+    def _generate_url(self, object_key: str, expires_in: int) -> str:
+        return self.bucket.blob(object_key).generate_signed_url(
+            version="v4",
+            expiration=timedelta(seconds=expires_in),
+            method="GET",
+        )
+
+    def _is_not_found(self, exc: Exception) -> bool:
+        return isinstance(exc, gcs_exceptions.NotFound)
+
+    def _is_retryable(self, exc: Exception) -> bool:
+        return isinstance(exc, (
+            gcs_exceptions.TooManyRequests,
+            gcs_exceptions.InternalServerError,
+            gcs_exceptions.BadGateway,
+            gcs_exceptions.ServiceUnavailable,
+            gcs_exceptions.GatewayTimeout,
+            ConnectionError,
+        ))
+
+
+_BACKEND_CLASSES = {
+    "aws_s3": S3StorageBackend,
+    "gcs": GCSStorageBackend,
+}
+
+_backends: Dict[str, StorageBackend] = {}
+
+
+def get_storage_backend(storage_provider: str) -> StorageBackend:
+    """
+    Returns the (cached) async backend for a storage provider.
+    Raises ValueError for unknown providers.
+    """
+    backend = _backends.get(storage_provider)
+    if backend is None:
+        backend_class = _BACKEND_CLASSES.get(storage_provider)
+        if backend_class is None:
+            raise ValueError(f"Unsupported storage provider: {storage_provider}")
+        backend = backend_class()
+        _backends[storage_provider] = backend
+    return backend
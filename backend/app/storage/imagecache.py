@@ -0,0 +1,223 @@
+import os
+import re
+import mmap
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Callable, Awaitable
+
+from app.storage.storage_config import storage_executor
+
+logger = logging.getLogger(__name__)
+
+# --- Cache configuration ---
+IMAGE_CACHE_MEMORY_BYTES = int(os.getenv("IMAGE_CACHE_MEMORY_BYTES", 256 * 1024 * 1024))
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR")  # disk tier is disabled when unset
+IMAGE_CACHE_DISK_BYTES = int(os.getenv("IMAGE_CACHE_DISK_BYTES", 2 * 1024 * 1024 * 1024))
+
+_SAFE_KEY = re.compile(r"^[A-Za-z0-9_.@-]{1,128}$")
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:]
+
+
+def _write_file(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ImageCache:
+    """
+    Content-addressed cache for raw image bytes, keyed by image_hash.
+
+    Tier 1 is an in-process LRU bounded by total bytes. Tier 2 (optional) is a local
+    directory bounded by total bytes, read back through memory-mapped files.
+    Stored images are immutable per hash, so entries never need invalidation, only eviction.
+    Concurrent misses for the same key share a single load, run in its own task so a
+    cancelled caller (client disconnect) never cancels the others.
+    """
+
+    def __init__(self, memory_budget_bytes: int, disk_dir: Optional[str] = None, disk_budget_bytes: int = 0):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_dir = disk_dir
+        self.disk_budget_bytes = disk_budget_bytes
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if self.disk_dir:
+            self._load_disk_index()
+
+    # --- Public API ---
+    async def get(self, key: str) -> Optional[bytes]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return data
+
+        name = self._disk_name(key) if self.disk_dir else None
+        if name in self._disk:
+            try:
+                data = await self._run(_read_file, os.path.join(self.disk_dir, name))
+            except OSError as e:
+                logger.warning(f"Image cache disk read failed for {key}: {e}")
+                self._forget_disk(name)
+            else:
+                self._disk.move_to_end(name)
+                self.disk_hits += 1
+                self._put_memory(key, data)
+                return data
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, data: bytes) -> None:
+        self._put_memory(key, data)
+        await self._put_disk(key, data)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Returns the cached bytes for key, calling loader() once on a miss."""
+        data = await self.get(key)
+        if data is not None:
+            return data
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._load_finished(key, done))
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[bytes]]) -> bytes:
+        data = await loader()
+        await self.put(key, data)
+        return data
+
+    def _load_finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved so a load whose callers all went away doesn't log a warning
+        if not task.cancelled():
+            task.exception()
+
+    async def clear(self) -> None:
+        """Drops every entry from both tiers (counters are kept)."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        names = list(self._disk)
+        self._disk.clear()
+        self._disk_bytes = 0
+        for name in names:
+            await self._run(_remove_file, os.path.join(self.disk_dir, name))
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "disk_enabled": bool(self.disk_dir),
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+            "disk_budget_bytes": self.disk_budget_bytes if self.disk_dir else 0,
+        }
+
+    # --- Memory tier ---
+    def _put_memory(self, key: str, data: bytes) -> None:
+        size = len(data)
+        if size > self.memory_budget_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_budget_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.memory_evictions += 1
+
+    # --- Disk tier ---
+    @staticmethod
+    def _disk_name(key: str) -> str:
+        return key if _SAFE_KEY.match(key) else hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _load_disk_index(self) -> None:
+        os.makedirs(self.disk_dir, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        # Oldest first so the LRU order roughly survives restarts
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_bytes += size
+        logger.info(f"Image cache disk tier loaded {len(self._disk)} entries ({self._disk_bytes} bytes) from {self.disk_dir}")
+
+    async def _put_disk(self, key: str, data: bytes) -> None:
+        if not self.disk_dir or len(data) > self.disk_budget_bytes:
+            return
+        name = self._disk_name(key)
+        if name in self._disk:
+            return
+        try:
+            await self._run(_write_file, os.path.join(self.disk_dir, name), data)
+        except OSError as e:
+            logger.warning(f"Image cache disk write failed for {key}: {e}")
+            return
+        self._disk[name] = len(data)
+        self._disk_bytes += len(data)
+        while self._disk_bytes > self.disk_budget_bytes:
+            evicted_name = next(iter(self._disk))
+            self._forget_disk(evicted_name)
+            self.disk_evictions += 1
+            await self._run(_remove_file, os.path.join(self.disk_dir, evicted_name))
+
+    def _forget_disk(self, name: str) -> None:
+        size = self._disk.pop(name, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    @staticmethod
+    async def _run(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(storage_executor, func, *args)
+
+
+image_cache = ImageCache(
+    memory_budget_bytes=IMAGE_CACHE_MEMORY_BYTES,
+    disk_dir=IMAGE_CACHE_DIR,
+    disk_budget_bytes=IMAGE_CACHE_DISK_BYTES,
+)
@@ -1,16 +1,36 @@
 
 from PIL import Image
 import io
+import os
+import asyncio
+import logging
 from fastapi import UploadFile, HTTPException
 import base64
-from datetime import datetime, timezone
-from typing import Union, Any
+from datetime import datetime, timezone, timedelta
+from typing import Union, Any, List, Optional, Dict, Tuple
 
 # --- Storage clients ---
-from app.storage.storage_config import STORAGE_PROVIDER, BUCKET_NAME, CDN_BASE_URL, s3_client, gcs_client
+from app.storage.storage_config import (
+    STORAGE_PROVIDER, CDN_BASE_URL, IMAGE_DELIVERY_MODE, IMAGE_URL_EXPIRY_SECONDS
+)
+from app.storage.backends import get_storage_backend, StorageNotFoundError, StorageTimeoutError
+from app.storage.imagecache import image_cache
+from app.storage.renditions import get_rendition, ensure_rendition
 
 from botocore.exceptions import ClientError
 
+logger = logging.getLogger(__name__)
+
+# Maximum number of image downloads in flight for a single batched retrieval
+IMAGE_FETCH_CONCURRENCY = int(os.getenv("IMAGE_FETCH_CONCURRENCY", 8))
+
+IMAGE_DELIVERY_MODES = ("base64", "presigned", "cdn")
+
+# Signed URLs are reused until half their lifetime has passed, so repeated requests
+# hand out identical URLs and browsers can cache the image.
+_signed_urls: Dict[Tuple[str, str], Tuple[str, datetime]] = {}
+_SIGNED_URL_CACHE_MAX_ENTRIES = 10000
+
 
 async def image_to_base64(image: Union[UploadFile, bytes, str, Image.Image]) -> str:
     """
@@ -37,10 +57,12 @@ async def image_to_base64(image: Union[UploadFile, bytes, str, Image.Image]) ->
     
  
 
-async def retrieve_image (image_store: dict) -> str:
+async def retrieve_image (image_store: dict, image_hash: Optional[str] = None, size: Optional[int] = None) -> str:
     # To be called whenever a real image has to be retrieved from storage. E.g.in Worklists, Thumbnail, Hints game...
     # Returns stored image as a file based on search on image_hash
     # extract the image_store attributes from  object colletion and calls get function to retrieve image from bucket.
+    # When image_hash is given, the bytes are served from / stored into the content-addressed image cache.
+    # When size is given, the size-px rendition is returned instead of the original upload.
     storage_provider = image_store.get("storage_provider")
     object_key = image_store.get("object_key")
 
@@ -48,32 +70,173 @@ async def retrieve_image (image_store: dict) -> str:
         raise HTTPException(status_code=400, detail="Invalid image_store dict")
 
     try:
-        if storage_provider == "aws_s3":
-            # Fetch from AWS S3
-            response = s3_client.get_object(Bucket=BUCKET_NAME, Key=object_key)
-            image_data = response["Body"].read()
-
-        elif storage_provider == "gcs":
-            # Fetch from Google Cloud Storage
-            client = gcs_client.Client()
-            bucket = client.bucket(BUCKET_NAME)
-            blob = bucket.blob(object_key)
-            image_data = blob.download_as_bytes()
+        backend = get_storage_backend(storage_provider)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unsupported storage provider: {storage_provider}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Storage provider {storage_provider} unavailable: {str(e)}")
 
+    try:
+        # Download runs on the bounded storage executor, never on the event loop
+        if size:
+            image_data = await get_rendition(backend, object_key, image_hash, size)
+        elif image_hash:
+            image_data = await image_cache.get_or_load(image_hash, lambda: backend.get_bytes(object_key))
         else:
-            raise HTTPException(status_code=400, detail=f"Unsupported storage provider: {storage_provider}")
+            image_data = await backend.get_bytes(object_key)
 
         # Convert to base64
         image_base64 = await image_to_base64(image_data)
         return image_base64
 
-    except ClientError as e:
+    except (StorageNotFoundError, ClientError) as e:
         raise HTTPException(
             status_code=404,
             detail=f"Unable to retrieve {object_key} from {storage_provider}: {str(e)}"
         )
+    except StorageTimeoutError as e:
+        raise HTTPException(
+            status_code=504,
+            detail=f"Timed out retrieving {object_key} from {storage_provider}: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Unexpected error retrieving image: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+async def retrieve_images(
+    image_stores: List[Optional[dict]],
+    image_hashes: Optional[List[Optional[str]]] = None,
+    max_concurrency: Optional[int] = None,
+    size: Optional[int] = None
+) -> List[Optional[str]]:
+    """
+    Retrieve many images concurrently.
+
+    Returns a list aligned with `image_stores`. Each entry is the base64 image, or None
+    when the entry was empty or its retrieval failed, so one bad object never fails the batch.
+    `image_hashes`, aligned with `image_stores`, enables the image cache per entry.
+    At most `max_concurrency` (default IMAGE_FETCH_CONCURRENCY) downloads run at once.
+    `size` selects a rendition instead of the original upload.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or IMAGE_FETCH_CONCURRENCY))
+    if image_hashes is None:
+        image_hashes = [None] * len(image_stores)
+
+    async def _fetch(image_store: Optional[dict], image_hash: Optional[str]) -> Optional[str]:
+        if not image_store:
+            return None
+        async with semaphore:
+            try:
+                return await retrieve_image(image_store, image_hash, size)
+            except Exception as e:
+                logger.error(f"Error retrieving image {image_store.get('object_key')}: {e}")
+                return None
+
+    return await asyncio.gather(*(
+        _fetch(image_store, image_hash) for image_store, image_hash in zip(image_stores, image_hashes)
+    ))
+
+
+def resolve_delivery_mode(requested: Optional[str] = None) -> str:
+    """
+    Returns the image delivery mode for a request: the requested one if given,
+    otherwise the deployment default (IMAGE_DELIVERY_MODE).
+    """
+    mode = (requested or IMAGE_DELIVERY_MODE or "base64").strip().lower()
+    if mode not in IMAGE_DELIVERY_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported image delivery mode '{mode}'. Use one of: {', '.join(IMAGE_DELIVERY_MODES)}"
+        )
+    return mode
+
+
+async def get_image_url(
+    image_store: dict,
+    delivery_mode: str,
+    size: Optional[int] = None,
+    image_hash: Optional[str] = None
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Returns (url, expires_at) for a stored image, or for its size-px rendition when size is given.
+    CDN URLs are stable and never expire; presigned URLs expire after IMAGE_URL_EXPIRY_SECONDS.
+    """
+    storage_provider = image_store.get("storage_provider")
+    object_key = image_store.get("object_key")
+    if not storage_provider or not object_key:
+        raise HTTPException(status_code=400, detail="Invalid image_store dict")
+
+    try:
+        backend = get_storage_backend(storage_provider)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unsupported storage provider: {storage_provider}")
+
+    if size:
+        # The rendition must exist in the bucket before a URL to it is handed out
+        object_key = await ensure_rendition(backend, object_key, image_hash, size)
+
+    if delivery_mode == "cdn":
+        return f"{CDN_BASE_URL.rstrip('/')}/{object_key.lstrip('/')}", None
+
+    cache_key = (storage_provider, object_key)
+    now = datetime.now(timezone.utc)
+    cached = _signed_urls.get(cache_key)
+    if cached and cached[1] - now > timedelta(seconds=IMAGE_URL_EXPIRY_SECONDS / 2):
+        return cached
+
+    url = await backend.generate_url(object_key, IMAGE_URL_EXPIRY_SECONDS)
+    expires_at = now + timedelta(seconds=IMAGE_URL_EXPIRY_SECONDS)
+    if len(_signed_urls) >= _SIGNED_URL_CACHE_MAX_ENTRIES:
+        _signed_urls.clear()
+    _signed_urls[cache_key] = (url, expires_at)
+    return url, expires_at
+
+
+async def deliver_images(
+    objects: List[dict],
+    delivery_mode: str = "base64",
+    max_concurrency: Optional[int] = None,
+    size: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Resolves the image payload for each object document, aligned with `objects`.
+
+    Each entry has image_base64, image_url and image_url_expires_at. In "base64" mode only
+    image_base64 is set; in URL modes only the URL fields are set. An object whose URL
+    could not be generated falls back to base64, and objects without an image_store
+    fall back to their inline image_base64. `size` selects a rendition for stored images.
+    """
+    if delivery_mode == "base64":
+        images = await retrieve_images(
+            [obj.get("image_store") for obj in objects],
+            [obj.get("image_hash") for obj in objects],
+            max_concurrency,
+            size
+        )
+        return [
+            {"image_base64": image or obj.get("image_base64"), "image_url": None, "image_url_expires_at": None}
+            for obj, image in zip(objects, images)
+        ]
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or IMAGE_FETCH_CONCURRENCY))
+
+    async def _deliver(obj: dict) -> Dict[str, Any]:
+        image_store = obj.get("image_store")
+        if image_store:
+            async with semaphore:
+                try:
+                    url, expires_at = await get_image_url(image_store, delivery_mode, size, obj.get("image_hash"))
+                    return {"image_base64": None, "image_url": url, "image_url_expires_at": expires_at}
+                except Exception as e:
+                    logger.error(f"Error generating image URL for {image_store.get('object_key')}, falling back to base64: {e}")
+                try:
+                    image = await retrieve_image(image_store, obj.get("image_hash"), size)
+                    return {"image_base64": image, "image_url": None, "image_url_expires_at": None}
+                except Exception as e:
+                    logger.error(f"Error retrieving image {image_store.get('object_key')}: {e}")
+        return {"image_base64": obj.get("image_base64"), "image_url": None, "image_url_expires_at": None}
+
+    return await asyncio.gather(*(_deliver(obj) for obj in objects))
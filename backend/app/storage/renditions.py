@@ -0,0 +1,153 @@
+import io
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set
+
+from fastapi import HTTPException
+from PIL import Image, ImageOps
+
+from app.storage.storage_config import (
+    IMAGE_RENDITION_SIZES,
+    IMAGE_RENDITION_FORMAT,
+    IMAGE_RENDITION_QUALITY,
+    IMAGE_RENDITION_PREFIX,
+    IMAGE_RENDITION_WORKERS,
+)
+from app.storage.backends import StorageBackend, StorageError, StorageNotFoundError
+from app.storage.imagecache import image_cache
+
+logger = logging.getLogger(__name__)
+
+# format name -> (Pillow format, file extension, content type)
+_FORMATS = {
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+    "jpg": ("JPEG", "jpg", "image/jpeg"),
+}
+if IMAGE_RENDITION_FORMAT not in _FORMATS:
+    logger.warning(f"Unsupported IMAGE_RENDITION_FORMAT '{IMAGE_RENDITION_FORMAT}', using webp")
+PIL_FORMAT, RENDITION_EXTENSION, RENDITION_CONTENT_TYPE = _FORMATS.get(IMAGE_RENDITION_FORMAT, _FORMATS["webp"])
+
+# Resizing is CPU bound, so it gets its own small pool instead of competing with storage I/O
+rendition_executor = ThreadPoolExecutor(max_workers=IMAGE_RENDITION_WORKERS, thread_name_prefix="rendition")
+
+# Rendition keys known to exist in the bucket, so URL delivery skips the existence check
+_persisted_keys: Set[str] = set()
+_PERSISTED_KEYS_MAX_ENTRIES = 50000
+
+
+def resolve_rendition_size(size: Optional[int]) -> Optional[int]:
+    """
+    Validates a requested rendition size. None (or 0) selects the original upload.
+    """
+    if not size:
+        return None
+    if size not in IMAGE_RENDITION_SIZES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported image size {size}. Use one of: {', '.join(str(s) for s in IMAGE_RENDITION_SIZES)}"
+        )
+    return size
+
+
+def rendition_key(object_key: str, size: int) -> str:
+    """
+    Derived bucket key for a rendition, e.g. images/cat.png -> renditions/256/images/cat.png.webp.
+    The full source key is kept so that images/cat.png and images/cat.jpg never share a rendition.
+    """
+    return f"{IMAGE_RENDITION_PREFIX}/{size}/{object_key.lstrip('/')}.{RENDITION_EXTENSION}"
+
+
+def render_rendition(data: bytes, size: int) -> bytes:
+    """
+    Resizes an image to fit within size x size (never upscaling) and encodes it in the
+    rendition format. Blocking; run it on rendition_executor.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        img = ImageOps.exif_transpose(source)
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if PIL_FORMAT == "JPEG":
+            if has_alpha:
+                rgba = img.convert("RGBA")
+                flattened = Image.new("RGB", rgba.size, (255, 255, 255))
+                flattened.paste(rgba, mask=rgba.getchannel("A"))
+                img = flattened
+            elif img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            save_options = {"quality": IMAGE_RENDITION_QUALITY, "optimize": True, "progressive": True}
+        else:
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            save_options = {"quality": IMAGE_RENDITION_QUALITY, "method": 4}
+
+        buffer = io.BytesIO()
+        img.save(buffer, format=PIL_FORMAT, **save_options)
+        return buffer.getvalue()
+
+
+def _remember_persisted(key: str) -> None:
+    if len(_persisted_keys) >= _PERSISTED_KEYS_MAX_ENTRIES:
+        _persisted_keys.clear()
+    _persisted_keys.add(key)
+
+
+async def _load_rendition(backend: StorageBackend, object_key: str, image_hash: Optional[str], size: int) -> bytes:
+    key = rendition_key(object_key, size)
+    try:
+        data = await backend.get_bytes(key)
+        _remember_persisted(key)
+        return data
+    except StorageNotFoundError:
+        pass
+
+    if image_hash:
+        original = await image_cache.get_or_load(image_hash, lambda: backend.get_bytes(object_key))
+    else:
+        original = await backend.get_bytes(object_key)
+
+    loop = asyncio.get_running_loop()
+    data = await loop.run_in_executor(rendition_executor, render_rendition, original, size)
+    logger.info(f"Generated {size}px rendition of {object_key} ({len(original)} -> {len(data)} bytes)")
+
+    # Persisting is best effort: the rendition is still served if the upload fails
+    try:
+        await backend.put_bytes(key, data, RENDITION_CONTENT_TYPE)
+        _remember_persisted(key)
+    except Exception as e:
+        logger.warning(f"Could not persist rendition {key}: {e}")
+    return data
+
+
+async def get_rendition(backend: StorageBackend, object_key: str, image_hash: Optional[str], size: int) -> bytes:
+    """
+    Returns the bytes of the size-px rendition of object_key. The rendition is read
+    from the bucket, or generated from the original and persisted on first request.
+    """
+    if not image_hash:
+        return await _load_rendition(backend, object_key, image_hash, size)
+    cache_key = f"{image_hash}@{size}.{RENDITION_EXTENSION}"
+    return await image_cache.get_or_load(cache_key, lambda: _load_rendition(backend, object_key, image_hash, size))
+
+
+async def ensure_rendition(backend: StorageBackend, object_key: str, image_hash: Optional[str], size: int) -> str:
+    """
+    Makes sure the size-px rendition exists in the bucket and returns its key,
+    so it can be handed out as a URL.
+    """
+    key = rendition_key(object_key, size)
+    if key in _persisted_keys:
+        return key
+    try:
+        await backend.stat(key)
+        _remember_persisted(key)
+        return key
+    except StorageNotFoundError:
+        pass
+
+    await get_rendition(backend, object_key, image_hash, size)
+    if key not in _persisted_keys:
+        raise StorageError(f"Rendition {key} could not be stored")
+    return key
@@ -1,5 +1,7 @@
 import os
 import boto3
+from botocore.config import Config as BotoConfig
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import storage as gcs_storage
 
 # --- Storage provider ---
@@ -7,12 +9,55 @@ STORAGE_PROVIDER = os.getenv("STORAGE_PROVIDER", "aws_s3")  # "aws_s3" or "gcs"
 BUCKET_NAME = os.getenv("STORAGE_BUCKET", "my-bucket")
 CDN_BASE_URL = os.getenv("CDN_DOMAIN", f"https://{BUCKET_NAME}.s3.amazonaws.com")
 
+# --- Image delivery ---
+# "base64": images are inlined in API responses (default)
+# "presigned": short-lived signed bucket URLs, valid for IMAGE_URL_EXPIRY_SECONDS
+# "cdn": stable URLs under CDN_BASE_URL
+IMAGE_DELIVERY_MODE = os.getenv("IMAGE_DELIVERY_MODE", "base64")
+IMAGE_URL_EXPIRY_SECONDS = int(os.getenv("IMAGE_URL_EXPIRY_SECONDS", 3600))
+
+# --- Image renditions ---
+# Resized variants are generated on first request and persisted under RENDITION_PREFIX
+IMAGE_RENDITION_SIZES = tuple(
+    int(size) for size in os.getenv("IMAGE_RENDITION_SIZES", "256,512").split(",") if size.strip()
+)
+IMAGE_RENDITION_FORMAT = os.getenv("IMAGE_RENDITION_FORMAT", "webp").lower()  # "webp" or "jpeg"
+IMAGE_RENDITION_QUALITY = int(os.getenv("IMAGE_RENDITION_QUALITY", 80))
+IMAGE_RENDITION_PREFIX = os.getenv("IMAGE_RENDITION_PREFIX", "renditions")
+IMAGE_RENDITION_WORKERS = int(os.getenv("IMAGE_RENDITION_WORKERS", 4))
+
+# --- Storage I/O limits ---
+# Blocking SDK calls run on a dedicated, bounded pool so they never stall the event loop
+STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", 16))
+STORAGE_TIMEOUT_SECONDS = float(os.getenv("STORAGE_TIMEOUT_SECONDS", 15))
+STORAGE_MAX_RETRIES = int(os.getenv("STORAGE_MAX_RETRIES", 2))
+STORAGE_RETRY_BACKOFF_SECONDS = float(os.getenv("STORAGE_RETRY_BACKOFF_SECONDS", 0.2))
+STORAGE_STREAM_CHUNK_BYTES = int(os.getenv("STORAGE_STREAM_CHUNK_BYTES", 256 * 1024))
+
+storage_executor = ThreadPoolExecutor(max_workers=STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+
+
+def create_s3_client():
+    # Retries are handled by the async backend layer, so botocore makes a single attempt
+    return boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION"),
+        config=BotoConfig(
+            connect_timeout=STORAGE_TIMEOUT_SECONDS,
+            read_timeout=STORAGE_TIMEOUT_SECONDS,
+            retries={"max_attempts": 1, "mode": "standard"},
+            max_pool_connections=STORAGE_MAX_WORKERS,
+        ),
+    )
+
+
+def create_gcs_client():
+    return gcs_storage.Client()
+
+
 # Initialize clients
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("AWS_REGION")
-) if STORAGE_PROVIDER == "aws_s3" else None
-
-gcs_client = gcs_storage.Client() if STORAGE_PROVIDER == "gcs" else None
\ No newline at end of file
+s3_client = create_s3_client() if STORAGE_PROVIDER == "aws_s3" else None
+
+gcs_client = create_gcs_client() if STORAGE_PROVIDER == "gcs" else None
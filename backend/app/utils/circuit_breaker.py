@@ -0,0 +1,85 @@
+import time
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """
+    Raised instead of calling an upstream whose circuit is open.
+    Subclasses httpx.HTTPError so existing "service unavailable" handlers apply unchanged.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for an upstream service.
+
+    closed:    calls go through; failure_threshold consecutive failures open the circuit.
+    open:      calls fail fast with CircuitOpenError for reset_timeout seconds.
+    half-open: one trial call is let through; success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError when the call must not be attempted."""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self.total_rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit is open; upstream marked unavailable")
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"{self.name} circuit closed")
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        was_trial = self._trial_in_flight
+        self._trial_in_flight = False
+        if was_trial or (self.opened_at is None and self.consecutive_failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(f"{self.name} circuit opened after {self.consecutive_failures} consecutive failure(s)")
+
+    def release_trial(self) -> None:
+        """Frees the half-open trial slot when a call ended without a verdict (e.g. cancelled)."""
+        self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+            "times_opened": self.times_opened,
+        }
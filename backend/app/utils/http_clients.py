@@ -0,0 +1,80 @@
+import os
+import logging
+from typing import Dict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# --- Outbound HTTP configuration ---
+HTTP_CLIENT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CLIENT_TIMEOUT_SECONDS", 15))
+HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS", 5))
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", 100))
+HTTP_CLIENT_MAX_KEEPALIVE = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", 20))
+HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS", 30))
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Per-upstream read timeouts that differ from HTTP_CLIENT_TIMEOUT_SECONDS
+UPSTREAM_TIMEOUTS = {
+    "embeddings": 10.0,
+    "quiz_qa": float(os.getenv("QUIZ_QA_TIMEOUT_SECONDS", 120)),
+}
+
+
+class HTTPClientRegistry:
+    """
+    One pooled httpx.AsyncClient per upstream service, created on first use and
+    reused for the lifetime of the process, so keep-alive connections (and TLS
+    sessions) survive across requests. Closed from the application lifespan.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get(self, upstream: str) -> httpx.AsyncClient:
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._create(upstream)
+            self._clients[upstream] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for upstream, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client for {upstream}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "upstreams": sorted(self._clients),
+        }
+
+    @staticmethod
+    def _create(upstream: str) -> httpx.AsyncClient:
+        read_timeout = UPSTREAM_TIMEOUTS.get(upstream, HTTP_CLIENT_TIMEOUT_SECONDS)
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(read_timeout, connect=HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_CLIENT_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+
+
+http_clients = HTTPClientRegistry()
+
+
+def get_http_client(upstream: str) -> httpx.AsyncClient:
+    """Shared client for an upstream: "auth", "curriculum", "embeddings", "quiz_qa", "pool_search"."""
+    return http_clients.get(upstream)
@@ -15,11 +15,86 @@ from app.routers import contest
 from app.routers import game_play
 from app.routers import curriculum
 from app.routers import event_analytics
+from app.routers import metrics
+from app.routers import images
+from app.services.quiz_backfill import quiz_qa_worker, QUIZ_QA_WORKER_ENABLED
+from app.utils.http_clients import http_clients
+from app.services.translation_memo import translation_memo
+from app.services.language_registry import language_registry
+from app.services.org_cache import org_cache
+from app.services.embeddings import query_embeddings
+from app.services.vector_index import vector_index, VECTOR_SEARCH_ENGINE
+from app.services.candidate_pools import candidate_pools
+from app.services.random_sampling import random_sampler, RANDOM_SAMPLING_ENGINE
+from app.services.catalog import translation_catalog, TRANSLATION_CATALOG_ENABLED
+from app.services.taxonomy import taxonomy_index
+from app.services.facets import catalog_facets
+from app.services.language_availability import language_availability
+from app.indexes import apply_indexes, INDEX_PROVISIONING_ON_STARTUP
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import uvicorn
 
-
-
-app = FastAPI(title="Hint and Match API")
+logger = logging.getLogger(__name__)
+
+
+async def _provision_indexes():
+    try:
+        results = await apply_indexes()
+        conflicts = [f"{r['collection']}.{r['index']}" for r in results if r["status"] != "ok"]
+        logger.info(f"Index registry applied: {len(results)} indexes, conflicts: {conflicts or 'none'}")
+    except Exception as e:
+        logger.warning(f"Index provisioning failed: {e}")
+
+
+async def _warm_translation_memo():
+    try:
+        await translation_memo.ensure_indexes()
+        await query_embeddings.ensure_indexes()
+        await translation_memo.preload()
+    except Exception as e:
+        logger.warning(f"Translation memo warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background workers run for the lifetime of the process
+    if QUIZ_QA_WORKER_ENABLED:
+        await quiz_qa_worker.start()
+    await language_registry.start()
+    await org_cache.start()
+    if VECTOR_SEARCH_ENGINE == "local":
+        await vector_index.start()
+    await candidate_pools.start()
+    if RANDOM_SAMPLING_ENGINE == "random_key":
+        await random_sampler.start()
+    if TRANSLATION_CATALOG_ENABLED:
+        await translation_catalog.start()
+    await taxonomy_index.start()
+    await catalog_facets.start()
+    await language_availability.start()
+    # Warm-up runs in the background so a slow database never delays startup
+    warmup = asyncio.create_task(_warm_translation_memo())
+    provisioning = asyncio.create_task(_provision_indexes()) if INDEX_PROVISIONING_ON_STARTUP else None
+    yield
+    warmup.cancel()
+    if provisioning:
+        provisioning.cancel()
+    await language_registry.stop()
+    await org_cache.stop()
+    await vector_index.stop()
+    await candidate_pools.stop()
+    await random_sampler.stop()
+    await translation_catalog.stop()
+    await taxonomy_index.stop()
+    await catalog_facets.stop()
+    await language_availability.stop()
+    await quiz_qa_worker.stop()
+    await http_clients.aclose()
+
+
+app = FastAPI(title="Hint and Match API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,6 +120,8 @@ app.include_router(curriculum.router)
 app.include_router(analytics.router)
 app.include_router(game_play.router, tags=["game_play"])
 app.include_router(event_analytics.router)
+app.include_router(metrics.router)
+app.include_router(images.router)
 
 @app.get("/health")
 async def health():
@@ -660,7 +660,7 @@ export const useGame = (
                             objectId: item.object_id,
                             description: item.object_hint,
                             short_hint: item.object_short_hint,
-                            imageUrl: `data:image/png;base64,${item.image_base64}`,
+                            imageUrl: item.image_url || `data:image/png;base64,${item.image_base64}`,
                             imageName: item.object_name,
                             object_description: item.object_description,
                             upvotes: 0,
@@ -729,7 +729,7 @@ export const useGame = (
                         return {
                             pictureId: item.object_id,
                             imageName: item.imageName,
-                            imageUrl: item.image_base64 ? `data:image/png;base64,${item.image_base64}` : '', // Handle base64
+                            imageUrl: item.image_url || (item.image_base64 ? `data:image/png;base64,${item.image_base64}` : ''), // Handle URL or base64
                             questions: questions,
                             answers: shuffleArray([...questions]), // Answers are the same set, shuffled
                             matchedQuestions: new Set(),
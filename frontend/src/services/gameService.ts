@@ -196,7 +196,7 @@ export const fetchGameData = async (
       objectId: item.object.object_id,
       description: item.translations.object_hint,
       short_hint: item.translations.object_short_hint,
-      imageUrl: `data:image/png;base64,${item.object.image_base64}`,
+      imageUrl: item.object.image_url || `data:image/png;base64,${item.object.image_base64}`,
       imageName: item.translations.object_name,
       object_description: item.translations.object_description,
       upvotes: item.voting?.up_votes || 0,
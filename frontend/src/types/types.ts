@@ -28,7 +28,9 @@ export interface ApiPicture {
 
   object: {
     object_id: string;
-    image_base64: string;
+    image_base64: string | null;
+    image_url?: string | null; // set when the backend delivers presigned/CDN URLs
+    image_url_expires_at?: string | null;
     image_hash: string;
     object_category: string;
   }